@@ -0,0 +1,131 @@
+"""
+Catalogue Cache - Precomputed responses for endpoints that only change with the ruleset
+Rule listings, constants, profiles' scenarios and stats are serialized
+once per ruleset version, exactly as FastAPI would encode them, and kept
+as bytes with a gzip copy and strong ETags. Requests are answered from
+those bytes, or with 304 Not Modified when If-None-Match carries the
+current ETag. The cache empties itself when the ruleset version changes.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+# Smaller bodies are not worth the gzip header and the client's inflate
+GZIP_MIN_BYTES = 512
+
+
+@dataclass
+class CachedBody:
+    """One catalogue payload, serialized and compressed"""
+    body: bytes
+    etag: str
+    gzip_body: Optional[bytes] = None
+    gzip_etag: Optional[str] = None
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 excludes it)"""
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        name, _, value = params.partition('=')
+        if name.strip().lower() != 'q':
+            return True
+        try:
+            return float(value) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def if_none_match(header: str, *etags: Optional[str]) -> bool:
+    """Weak comparison of If-None-Match against the representation's ETags"""
+    if header.strip() == '*':
+        return True
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class CatalogueCache:
+    """Serialized catalogue payloads of the current ruleset version, by key"""
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self.version = ""
+        self._entries: Dict[str, CachedBody] = {}
+
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def entry(self, version: str, key: str, build: Callable[[], Any]) -> CachedBody:
+        """The cached body for key, building it if this version has none yet"""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        # Same bytes as FastAPI sends for an endpoint without a response_model
+        body = JSONResponse(jsonable_encoder(build())).body
+        entry = CachedBody(body, _etag(body))
+        if len(body) >= GZIP_MIN_BYTES:
+            # mtime=0 keeps the compressed bytes, and so their ETag, reproducible
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                entry.gzip_body = compressed
+                entry.gzip_etag = _etag(compressed)
+        self._entries[key] = entry
+        self.builds += 1
+        return entry
+
+    def respond(self, request: Request, version: str, key: str, build: Callable[[], Any]) -> Response:
+        """Serve the payload as JSON (gzipped if accepted), or 304 if the client has it"""
+        entry = self.entry(version, key, build)
+        use_gzip = entry.gzip_body is not None and accepts_gzip(request.headers.get('accept-encoding', ''))
+        headers = {
+            'ETag': entry.gzip_etag if use_gzip else entry.etag,
+            'Cache-Control': f"public, max-age={self.max_age}",
+            'Vary': 'Accept-Encoding',
+        }
+
+        match = request.headers.get('if-none-match')
+        if match and if_none_match(match, entry.etag, entry.gzip_etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return Response(content=entry.gzip_body, media_type='application/json', headers=headers)
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "bytes": sum(len(entry.body) for entry in self._entries.values()),
+            "gzip_bytes": sum(len(entry.gzip_body or entry.body) for entry in self._entries.values()),
+            "builds": self.builds,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,53 @@
+"""
+Fast JSON - Opt-in request decoding and response encoding (FAST_RESPONSES)
+Engine responses are built from already validated parts, so they are
+written with pydantic-core's JSON serializer straight into the response
+body. Going through response_model, they would be validated again and
+then encoded by json.dumps (or jsonable_encoder, without a response_model).
+The bytes are the same: compact separators and non-ASCII text as UTF-8.
+Request bodies are decoded with orjson when it is installed.
+"""
+
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # bodies are decoded by the standard json module
+    orjson = None
+
+
+def model_response(model: BaseModel) -> Response:
+    """A JSON response with the model serialized directly by pydantic-core"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+class FastJSONRequest(Request):
+    """
+    Request whose JSON body is decoded by orjson. Its JSONDecodeError
+    subclasses json.JSONDecodeError, so FastAPI still answers malformed
+    bodies with a 422. Unlike json.loads, orjson rejects NaN/Infinity
+    literals and does not keep integers beyond 64 bits exact.
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """Route that hands its endpoint a FastJSONRequest"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if orjson is None:
+            return handler
+
+        async def fast_json_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return fast_json_handler
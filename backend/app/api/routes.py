@@ -2,68 +2,190 @@
 API Routes for AgriAdvisor Rule-Based Advisory System
 """
 
-from fastapi import APIRouter, Request, HTTPException
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Request, Response, HTTPException, Header, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import hmac
 
 from app.models.schemas import (
     RecommendationRequest,
+    RecommendationInput,
     RecommendationResponse,
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    BatchItemResult,
     FarmProfileResponse,
     RulesListResponse,
     RuleInfo,
     ConstantsResponse,
     FarmType,
-    Region
+    Region,
+    WeatherData
 )
-from app.services.rule_engine import RuleEngine
-from app.services.weather_service import WeatherService
+from app.api.fast_json import FastJSONRoute, model_response
+from app.core.config import settings
+from app.core.gc_monitor import gc_monitor
+from app.services.weather_history import HISTORY_FIELDS
+from app.services.weather_refresher import RegionSnapshot
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute if settings.FAST_RESPONSES else APIRoute)
 
 
 # ============== RECOMMENDATIONS ==============
 
+async def _evaluate(request: Request, data: RecommendationRequest) -> RecommendationResponse:
+    """Evaluate with the engine built for the loaded ruleset, through the response cache if enabled"""
+    engine = request.app.state.engine
+    cache = request.app.state.response_cache
+    if cache is None:
+        return engine.evaluate(data)
+    return await cache.get_or_evaluate(engine, data)
+
+
+def _region_weather(request: Request, region: str) -> Optional[RegionSnapshot]:
+    """The region's background weather snapshot, None when off, missing or too stale"""
+    refresher = request.app.state.weather_refresher
+    return refresher.get(region) if refresher is not None else None
+
+
+def _snapshot_for(request: Request, region: str, fields: List[Tuple[str, str]]) -> RegionSnapshot:
+    """
+    The region's snapshot for a request that left out its weather (fields,
+    as (location, name)): without the refresher they are required as before
+    (422), with it but no recent snapshot the weather is unavailable (503)
+    """
+    if request.app.state.weather_refresher is None:
+        raise _missing(fields)
+    snapshot = _region_weather(request, region)
+    if snapshot is None:
+        raise _no_region_weather(region)
+    return snapshot
+
+
+def _missing(fields: List[Tuple[str, str]]) -> RequestValidationError:
+    """The 422 FastAPI gives for required fields left out"""
+    return RequestValidationError([
+        {'type': 'missing', 'loc': field, 'msg': 'Field required', 'input': None} for field in fields
+    ])
+
+
+def _no_region_weather(region: str) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"No recent weather for region '{region}'; send weather with the request"
+    )
+
+
+def _respond(response: Any) -> Any:
+    """Engine output as is, or already serialized when FAST_RESPONSES is on"""
+    if settings.FAST_RESPONSES:
+        return model_response(response)
+    return response
+
+
 @router.post("/recommendations", response_model=RecommendationResponse)
-async def get_recommendations(request: Request, data: RecommendationRequest):
+async def get_recommendations(request: Request, data: RecommendationInput):
     """
     Get personalized recommendations based on farm context.
+    Set top_k and/or min_urgency to get only the most urgent recommendations.
+    Leave out weather to use the region's latest background snapshot, history
+    aggregates included, when the weather refresher runs; weather sent with
+    the request is used as sent.
     
     Bu endpoint fermerin şərtlərinə əsaslanaraq tövsiyələr verir.
     """
-    # Get loaded rules and constants from app state
-    rules = request.app.state.rules
-    constants = request.app.state.constants
-    
-    # Create rule engine and evaluate
-    engine = RuleEngine(rules, constants)
-    response = engine.evaluate(data)
-    
-    return response
+    if data.weather is None:
+        snapshot = _snapshot_for(request, data.region.value, [('body', 'weather')])
+        data = data.model_copy(update={'weather': snapshot.weather_data})
+    return _respond(await _evaluate(request, data))
 
 
-@router.get("/recommendations/quick")
+@router.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+async def batch_recommendations(request: Request, data: BatchRecommendationRequest):
+    """
+    Get recommendations for many farms in one call.
+    
+    Each item follows the /recommendations request schema; an invalid or
+    failing item gets its own error slot instead of failing the batch.
+    When the weather refresher runs, items without weather get their region's
+    latest snapshot, if there is one.
+    Çoxlu fermer üçün tövsiyələr bir sorğuda.
+    """
+    if len(data.requests) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(data.requests)} items (max {settings.BATCH_MAX_ITEMS})"
+        )
+    
+    items = data.requests
+    if request.app.state.weather_refresher is not None:
+        regions = {region.value for region in Region}
+        items = []
+        for item in data.requests:
+            if isinstance(item, dict) and item.get('region') in regions and item.get('weather') is None:
+                snapshot = _region_weather(request, item['region'])
+                if snapshot is not None:
+                    item = {**item, 'weather': snapshot.weather}
+            items.append(item)
+    
+    # Evaluate with the engine built for the loaded ruleset
+    engine = request.app.state.engine
+    evaluator = request.app.state.batch_evaluator
+    chunk_size = data.chunk_size or evaluator.chunk_size
+    outcomes, executor = await evaluator.evaluate(engine, items, chunk_size)
+    
+    results = [
+        BatchItemResult(index=i, ok=error is None, response=response, error=error)
+        for i, (response, error) in enumerate(outcomes)
+    ]
+    failed = sum(1 for result in results if not result.ok)
+    
+    return _respond(BatchRecommendationResponse(
+        total=len(results),
+        succeeded=len(results) - failed,
+        failed=failed,
+        executor=executor,
+        chunk_size=chunk_size,
+        results=results
+    ))
+
+
+@router.get("/recommendations/quick", response_model=RecommendationResponse)
 async def quick_recommendations(
     request: Request,
     farm_type: FarmType,
     region: Region,
-    temperature: float,
-    humidity: float,
+    temperature: Optional[float] = None,
+    humidity: Optional[float] = None,
     crop_type: Optional[str] = None,
     stage: Optional[str] = None,
     days_since_irrigation: int = 0,
-    soil_moisture: float = 50
+    soil_moisture: float = 50,
+    top_k: Optional[int] = Query(None, ge=1, le=100),
+    min_urgency: Optional[int] = Query(None, ge=0, le=100)
 ):
     """
     Quick recommendation endpoint with minimal parameters.
+    top_k / min_urgency limit the response to the most urgent recommendations.
+    Leave out both temperature and humidity to use the region's latest
+    weather when the weather refresher runs.
     
     Sadə sorğu üçün - yalnız əsas parametrlərlə.
     """
-    from app.models.schemas import WeatherData, SoilData, CropContext
+    from app.models.schemas import SoilData, CropContext
     from datetime import date
     
     # Build request object
-    weather = WeatherData(temperature=temperature, humidity=humidity)
+    given = {'temperature': temperature, 'humidity': humidity}
+    if temperature is None and humidity is None:
+        weather = _snapshot_for(request, region.value, [('query', name) for name in given]).weather_data
+    elif temperature is None or humidity is None:
+        # One reading without the other is not a weather: both are required then
+        raise _missing([('query', name) for name, value in given.items() if value is None])
+    else:
+        weather = WeatherData(temperature=temperature, humidity=humidity)
     soil = SoilData(soil_moisture=soil_moisture)
     
     crop_context = None
@@ -80,18 +202,12 @@ async def quick_recommendations(
         request_date=date.today(),
         weather=weather,
         soil=soil,
-        crop_context=crop_context
+        crop_context=crop_context,
+        top_k=top_k,
+        min_urgency=min_urgency
     )
     
-    # Get loaded rules and constants from app state
-    rules = request.app.state.rules
-    constants = request.app.state.constants
-    
-    # Create rule engine and evaluate
-    engine = RuleEngine(rules, constants)
-    response = engine.evaluate(data)
-    
-    return response
+    return _respond(await _evaluate(request, data))
 
 
 # ============== WEATHER ==============
@@ -111,86 +227,123 @@ async def auto_fetch_weather(request: Request):
         - temperature: Current temperature (°C)
         - humidity: Relative humidity (%)
         - rainfall_last_24h: Rainfall in last 24h (mm)
+        - rainfall_last_7days: Rainfall in last 7 days (mm)
+        - rainfall_forecast_48h: Boolean, rain expected in the next 48h
+        - rainfall_forecast_amount_mm: Rain expected in the next 48h (mm)
         - wind_speed: Wind speed (km/h)
         - frost_warning: Boolean frost warning
+        - rainfall_last_30days, temperature_max_24h / _min_24h, temperature_max_7days /
+          _min_7days, wind_speed_max_24h, consecutive_hot_hours, consecutive_humid_hours:
+          Weather history aggregates of the located point, or its region's averages
+          (null until the history covers them)
         - location: Detected location (city, country, lat/lng)
         - region: Mapped Azerbaijan region code
         - fallback: Boolean indicating if default location was used
+        - weather_source: "region" (background snapshot of the region) or "location"
+        - weather_age_seconds: Age of the region snapshot (0 for location weather)
     """
-    weather_service = WeatherService()
+    weather_service = request.app.state.weather_service
 
     try:
-        # Get client IP from request (for production with proxy/load balancer)
+        # The server has already replaced a trusted proxy's address (FORWARDED_ALLOW_IPS)
+        # with the client's from X-Forwarded-For
         client_ip = request.client.host if request.client else None
 
-        # Auto-fetch weather and location (gracefully falls back to Baku if non-Azerbaijan location detected)
-        result = await weather_service.auto_fetch_weather(client_ip)
+        # Locate the client (gracefully falls back to Baku if non-Azerbaijan location detected)
+        location, used_fallback = await weather_service.locate_client(client_ip)
 
         # Map location to Azerbaijan region
         region = weather_service.map_location_to_region(
-            result["location"]["city"],
-            result["location"].get("region", "")
+            location["city"],
+            location.get("region", "")
         )
 
+        # The region's background snapshot if recent enough, else the location's own weather
+        snapshot = _region_weather(request, region)
+        history = None
+        if snapshot is not None:
+            weather, weather_age = snapshot.weather, round(snapshot.age())
+            # The located point's own history when its cell is kept, else the region's averages
+            if weather_service.history is not None:
+                history = weather_service.history.summary(
+                    float(location["latitude"]), float(location["longitude"])
+                )
+        else:
+            weather = await weather_service.fetch_weather_data(location["latitude"], location["longitude"])
+            weather_age = 0
+
         return {
-            "temperature": result["temperature"],
-            "humidity": result["humidity"],
-            "rainfall_last_24h": result["rainfall_last_24h"],
-            "wind_speed": result["wind_speed"],
-            "frost_warning": result["frost_warning"],
-            "location": result["location"],
+            "temperature": weather["temperature"],
+            "humidity": weather["humidity"],
+            "rainfall_last_24h": weather["rainfall_last_24h"],
+            "rainfall_last_7days": weather["rainfall_last_7days"],
+            "rainfall_forecast_48h": weather["rainfall_forecast_48h"],
+            "rainfall_forecast_amount_mm": weather["rainfall_forecast_amount_mm"],
+            "wind_speed": weather["wind_speed"],
+            "frost_warning": weather["frost_warning"],
+            **{field: (history or weather).get(field) for field in HISTORY_FIELDS},
+            "location": location,
             "region": region,
-            "fallback": result.get("used_fallback", False)  # True if VPN/foreign IP detected
+            "fallback": used_fallback,  # True if VPN/foreign IP detected
+            "weather_source": "region" if snapshot is not None else "location",
+            "weather_age_seconds": weather_age
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch weather data: {str(e)}")
-    finally:
-        await weather_service.close()
 
 
 # ============== FARMS & PROFILES ==============
 
+def _catalogue(request: Request, key: str, build: Callable[[], Any]) -> Response:
+    """Payload built once per ruleset version, served with an ETag and 304 support"""
+    catalogue_cache = request.app.state.catalogue_cache
+    return catalogue_cache.respond(request, request.app.state.engine.version, key, build)
+
+
 @router.get("/farms")
-async def list_farm_types():
+async def list_farm_types(request: Request):
     """
     List all available farm types.
     
     Bütün mövcud ferma tiplərinin siyahısı.
     """
-    return {
-        "farm_types": [
-            {
-                "id": "wheat",
-                "name_az": "Taxıl təsərrüfatı",
-                "name_en": "Wheat/Cereals Farm",
-                "description_az": "Buğda, arpa və digər dənli bitkilər"
-            },
-            {
-                "id": "livestock",
-                "name_az": "Heyvandarlıq",
-                "name_en": "Livestock Farm",
-                "description_az": "Mal-qara, qoyun, keçi, quşçuluq"
-            },
-            {
-                "id": "orchard",
-                "name_az": "Meyvə bağı",
-                "name_en": "Orchard",
-                "description_az": "Alma, üzüm, nar, əncir və digər meyvələr"
-            },
-            {
-                "id": "vegetable",
-                "name_az": "Tərəvəzçilik",
-                "name_en": "Vegetable Farm",
-                "description_az": "Pomidor, xiyar, kartof və digər tərəvəzlər"
-            },
-            {
-                "id": "mixed",
-                "name_az": "Qarışıq təsərrüfat",
-                "name_en": "Mixed Farm",
-                "description_az": "Bitkiçilik və heyvandarlıq birlikdə"
-            }
-        ]
-    }
+    def build():
+        return {
+            "farm_types": [
+                {
+                    "id": "wheat",
+                    "name_az": "Taxıl təsərrüfatı",
+                    "name_en": "Wheat/Cereals Farm",
+                    "description_az": "Buğda, arpa və digər dənli bitkilər"
+                },
+                {
+                    "id": "livestock",
+                    "name_az": "Heyvandarlıq",
+                    "name_en": "Livestock Farm",
+                    "description_az": "Mal-qara, qoyun, keçi, quşçuluq"
+                },
+                {
+                    "id": "orchard",
+                    "name_az": "Meyvə bağı",
+                    "name_en": "Orchard",
+                    "description_az": "Alma, üzüm, nar, əncir və digər meyvələr"
+                },
+                {
+                    "id": "vegetable",
+                    "name_az": "Tərəvəzçilik",
+                    "name_en": "Vegetable Farm",
+                    "description_az": "Pomidor, xiyar, kartof və digər tərəvəzlər"
+                },
+                {
+                    "id": "mixed",
+                    "name_az": "Qarışıq təsərrüfat",
+                    "name_en": "Mixed Farm",
+                    "description_az": "Bitkiçilik və heyvandarlıq birlikdə"
+                }
+            ]
+        }
+    
+    return _catalogue(request, "farms", build)
 
 
 @router.get("/farms/{farm_type}/profile", response_model=FarmProfileResponse)
@@ -217,18 +370,26 @@ async def get_farm_profile(request: Request, farm_type: FarmType):
 # ============== RULES ==============
 
 @router.get("/rules/search")
-async def search_rules(request: Request, q: str):
+async def search_rules(
+    request: Request,
+    q: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200)
+):
     """
-    Search rules by keyword.
+    Search rules by keyword, best matches first. Case, diacritics and
+    small typos are ignored; count is the number of matches before paging.
     
-    Qaydaları açar söz ilə axtarın.
+    Qaydaları açar söz ilə axtarın (böyük/kiçik hərf, diakritik işarələr və kiçik yazı səhvləri nəzərə alınmır).
     """
     rule_loader = request.app.state.rule_loader
-    results = rule_loader.search_rules(q)
+    count, results = rule_loader.search_rules(q, offset, limit)
     
     return {
         "query": q,
-        "count": len(results),
+        "count": count,
+        "offset": offset,
+        "limit": limit,
         "results": results
     }
 
@@ -240,34 +401,37 @@ async def list_all_rules(request: Request):
     
     Bütün qaydaların siyahısı.
     """
-    rules = request.app.state.rules
-    rule_loader = request.app.state.rule_loader
-    
-    counts = rule_loader.count_rules()
-    
-    rules_by_category = {}
-    
-    for farm_type, categories in rules.items():
-        rules_by_category[farm_type] = {}
-        for category, data in categories.items():
-            if data and 'rules' in data:
-                rules_by_category[farm_type][category] = [
-                    RuleInfo(
-                        rule_id=r.get('rule_id', ''),
-                        name_az=r.get('name_az', ''),
-                        name_en=r.get('name_en', ''),
-                        priority=r.get('priority', 'medium'),
-                        category=category,
-                        farm_type=farm_type
-                    )
-                    for r in data['rules']
-                ]
+    def build():
+        rules = request.app.state.rules
+        rule_loader = request.app.state.rule_loader
+        
+        counts = rule_loader.count_rules()
+        
+        rules_by_category = {}
+        
+        for farm_type, categories in rules.items():
+            rules_by_category[farm_type] = {}
+            for category, data in categories.items():
+                if data and 'rules' in data:
+                    rules_by_category[farm_type][category] = [
+                        RuleInfo(
+                            rule_id=r.get('rule_id', ''),
+                            name_az=r.get('name_az', ''),
+                            name_en=r.get('name_en', ''),
+                            priority=r.get('priority', 'medium'),
+                            category=category,
+                            farm_type=farm_type
+                        )
+                        for r in data['rules']
+                    ]
+        
+        return {
+            "total_rules": counts.get('_total', 0),
+            "counts_by_farm_type": {k: v for k, v in counts.items() if k != '_total'},
+            "rules_by_category": rules_by_category
+        }
     
-    return {
-        "total_rules": counts.get('_total', 0),
-        "counts_by_farm_type": {k: v for k, v in counts.items() if k != '_total'},
-        "rules_by_category": rules_by_category
-    }
+    return _catalogue(request, "rules", build)
 
 
 @router.get("/rules/{farm_type}")
@@ -277,17 +441,20 @@ async def get_rules_by_farm_type(request: Request, farm_type: FarmType):
     
     Xüsusi ferma tipi üçün qaydalar.
     """
-    rule_loader = request.app.state.rule_loader
-    farm_rules = rule_loader.get_rules_for_farm_type(farm_type.value)
-    
-    if not farm_rules:
-        raise HTTPException(status_code=404, detail=f"No rules found for {farm_type.value}")
+    def build():
+        rule_loader = request.app.state.rule_loader
+        farm_rules = rule_loader.get_rules_for_farm_type(farm_type.value)
+        
+        if not farm_rules:
+            raise HTTPException(status_code=404, detail=f"No rules found for {farm_type.value}")
+        
+        return {
+            "farm_type": farm_type.value,
+            "categories": list(farm_rules.keys()),
+            "rules": farm_rules
+        }
     
-    return {
-        "farm_type": farm_type.value,
-        "categories": list(farm_rules.keys()),
-        "rules": farm_rules
-    }
+    return _catalogue(request, f"rules/{farm_type.value}", build)
 
 
 @router.get("/rules/{farm_type}/{category}")
@@ -297,16 +464,19 @@ async def get_rules_by_category(request: Request, farm_type: FarmType, category:
     
     Xüsusi kateqoriya üçün qaydalar.
     """
-    rule_loader = request.app.state.rule_loader
-    farm_rules = rule_loader.get_rules_for_farm_type(farm_type.value)
-    
-    if not farm_rules or category not in farm_rules:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"No rules found for {farm_type.value}/{category}"
-        )
+    def build():
+        rule_loader = request.app.state.rule_loader
+        farm_rules = rule_loader.get_rules_for_farm_type(farm_type.value)
+        
+        if not farm_rules or category not in farm_rules:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"No rules found for {farm_type.value}/{category}"
+            )
+        
+        return farm_rules[category]
     
-    return farm_rules[category]
+    return _catalogue(request, f"rules/{farm_type.value}/{category}", build)
 
 
 # ============== CONSTANTS ==============
@@ -318,8 +488,10 @@ async def get_all_constants(request: Request):
     
     Bütün sabit dəyərləri əldə edin.
     """
-    constants = request.app.state.constants
-    return constants
+    def build():
+        return request.app.state.constants
+    
+    return _catalogue(request, "constants", build)
 
 
 @router.get("/constants/thresholds")
@@ -329,8 +501,11 @@ async def get_thresholds(request: Request):
     
     Hədd dəyərləri (temperatur, rütubət və s.).
     """
-    rule_loader = request.app.state.rule_loader
-    return rule_loader.get_thresholds()
+    def build():
+        rule_loader = request.app.state.rule_loader
+        return rule_loader.get_thresholds()
+    
+    return _catalogue(request, "constants/thresholds", build)
 
 
 @router.get("/constants/regions")
@@ -340,8 +515,11 @@ async def get_regions(request: Request):
     
     Azərbaycan regionları haqqında məlumat.
     """
-    rule_loader = request.app.state.rule_loader
-    return rule_loader.get_regions()
+    def build():
+        rule_loader = request.app.state.rule_loader
+        return rule_loader.get_regions()
+    
+    return _catalogue(request, "constants/regions", build)
 
 
 @router.get("/constants/stages")
@@ -351,8 +529,11 @@ async def get_stages(request: Request):
     
     Bitki və heyvan inkişaf mərhələləri.
     """
-    rule_loader = request.app.state.rule_loader
-    return rule_loader.get_stages()
+    def build():
+        rule_loader = request.app.state.rule_loader
+        return rule_loader.get_stages()
+    
+    return _catalogue(request, "constants/stages", build)
 
 
 # ============== SCENARIOS ==============
@@ -364,18 +545,21 @@ async def get_test_scenarios(request: Request, farm_type: FarmType):
     
     Test üçün hazır ssenarilər.
     """
-    profiles = request.app.state.profiles
-    profile = profiles.get(farm_type.value)
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail=f"Profile not found for {farm_type.value}")
-    
-    scenarios = profile.get('synthetic_scenarios', {})
+    def build():
+        profiles = request.app.state.profiles
+        profile = profiles.get(farm_type.value)
+        
+        if not profile:
+            raise HTTPException(status_code=404, detail=f"Profile not found for {farm_type.value}")
+        
+        scenarios = profile.get('synthetic_scenarios', {})
+        
+        return {
+            "farm_type": farm_type.value,
+            "scenarios": scenarios
+        }
     
-    return {
-        "farm_type": farm_type.value,
-        "scenarios": scenarios
-    }
+    return _catalogue(request, f"scenarios/{farm_type.value}", build)
 
 
 # ============== STATISTICS ==============
@@ -387,23 +571,133 @@ async def get_statistics(request: Request):
     
     Sistem statistikaları.
     """
-    rule_loader = request.app.state.rule_loader
-    counts = rule_loader.count_rules()
+    def build():
+        rule_loader = request.app.state.rule_loader
+        counts = rule_loader.count_rules()
+        
+        return {
+            "total_rules": counts.get('_total', 0),
+            "rules_by_farm_type": {
+                k: v.get('_total', 0) 
+                for k, v in counts.items() 
+                if k != '_total' and isinstance(v, dict)
+            },
+            "farm_types_count": 5,
+            "regions_count": 5,
+            "rule_categories": {
+                "wheat": ["irrigation", "fertilization", "pest_disease", "harvest"],
+                "livestock": ["disease_risk", "feeding", "veterinary"],
+                "orchard": ["irrigation", "fertilization", "pruning", "pest_disease"],
+                "vegetable": ["irrigation", "fertilization", "greenhouse", "pest_disease"],
+                "mixed": ["integration", "resource_allocation", "daily_coordination"]
+            }
+        }
     
+    return _catalogue(request, "stats", build)
+
+
+# ============== ADMIN ==============
+
+def _require_admin(token: Optional[str]):
+    """Allow admin calls only with a matching ADMIN_TOKEN; without one configured they are closed"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not token or not hmac.compare_digest(token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/admin/rules/reload")
+async def reload_rules(
+    request: Request,
+    force: bool = False,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Reload rule, constant and profile files without restarting.
+    
+    The new ruleset is validated and compiled in the background and swapped in
+    atomically; if it fails, the previous version keeps being served.
+    Under app.serve every worker is then replaced by one forked from the
+    reloaded master ("workers": "restarting"); under `uvicorn --workers` only
+    this worker reloads, and the others need the file watcher.
+    Qaydaları yenidən yükləyin.
+    """
+    _require_admin(x_admin_token)
+    result = await request.app.state.rule_reloader.reload(force=force, broadcast=True)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=422, detail=result)
+    return result
+
+
+@router.get("/admin/rules/status")
+async def rules_reload_status(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Current ruleset version and hot reload statistics.
+    
+    Qaydaların versiyası və yenidən yükləmə statistikası.
+    """
+    _require_admin(x_admin_token)
+    return request.app.state.rule_reloader.status()
+
+
+@router.get("/admin/gc")
+async def gc_pause_stats(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Garbage collector pause statistics of the worker serving this request.
+    
+    Zibil toplayıcı fasilələrinin statistikası.
+    """
+    _require_admin(x_admin_token)
+    return gc_monitor.stats()
+
+
+@router.get("/admin/conditions")
+async def condition_stats(
+    request: Request,
+    farm_type: Optional[FarmType] = None,
+    rule_id: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Sampled pass rate and cost of every rule condition, in the order the
+    engine currently evaluates them.
+    
+    Qayda şərtlərinin statistikası və qiymətləndirmə sırası.
+    """
+    _require_admin(x_admin_token)
+    optimizer = request.app.state.engine.optimizer
+    if optimizer is None:
+        return {"enabled": False}
+    return optimizer.stats(farm_type.value if farm_type else None, rule_id)
+
+
+@router.get("/admin/weather")
+async def weather_stats(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Weather API endpoints, the grid cell weather cache and the regional
+    refresher of this worker: snapshot ages, refresh lag and failures.
+    
+    Hava məlumatı keşinin statistikası.
+    """
+    _require_admin(x_admin_token)
+    refresher = request.app.state.weather_refresher
     return {
-        "total_rules": counts.get('_total', 0),
-        "rules_by_farm_type": {
-            k: v.get('_total', 0) 
-            for k, v in counts.items() 
-            if k != '_total' and isinstance(v, dict)
-        },
-        "farm_types_count": 5,
-        "regions_count": 5,
-        "rule_categories": {
-            "wheat": ["irrigation", "fertilization", "pest_disease", "harvest"],
-            "livestock": ["disease_risk", "feeding", "veterinary"],
-            "orchard": ["irrigation", "fertilization", "pruning", "pest_disease"],
-            "vegetable": ["irrigation", "fertilization", "greenhouse", "pest_disease"],
-            "mixed": ["integration", "resource_allocation", "daily_coordination"]
-        }
+        **request.app.state.weather_service.stats(),
+        "regions": refresher.stats() if refresher is not None else {"running": False},
     }
+
+
+@router.get("/admin/cache")
+async def response_cache_stats(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Response cache hit rate, evictions and memory use of this worker,
+    the precomputed catalogue responses and the rule search index.
+    
+    Cavab keşinin statistikası.
+    """
+    _require_admin(x_admin_token)
+    cache = request.app.state.response_cache
+    stats = cache.stats() if cache is not None else {"enabled": False}
+    stats["catalogue"] = request.app.state.catalogue_cache.stats()
+    stats["search"] = request.app.state.rule_loader.build_search_index().stats()
+    return stats
@@ -25,6 +25,109 @@ class Settings(BaseSettings):
     PROFILES_PATH: str = os.path.join(DATA_PATH, "profiles")
     RULES_PATH: str = os.path.join(DATA_PATH, "rules")
 
+    # Pickled snapshot of the parsed data files, keyed by their content hash,
+    # so startup skips JSON parsing when nothing changed ("" = no snapshots).
+    # Snapshots are unpickled, so whoever can write this directory can run
+    # code in the app: keep it outside the source tree and writable only by
+    # the user that builds snapshots. Defaults to the user's cache directory.
+    RULES_SNAPSHOT_DIR: str = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "agriadvisor",
+        "ruleset"
+    )
+
+    # Rule evaluation: "indexed" (candidate index + compiled predicates)
+    # or "bitset" (each distinct atom evaluated once into a mask)
+    RULE_EVALUATION_MODE: str = "indexed"
+
+    # Indexed mode: 1 in CONDITION_SAMPLE_EVERY evaluations records every
+    # condition's pass rate and cost (0 = off); every CONDITION_REORDER_EVERY
+    # samples a background thread recompiles AND/OR blocks cheapest-to-decide first
+    CONDITION_SAMPLE_EVERY: int = 64
+    CONDITION_REORDER_EVERY: int = 256
+
+    # Batch recommendations: executor is "auto" (threads on free-threaded
+    # builds, processes otherwise, inline on one core), "process", "thread",
+    # "inline" or "columnar" (NumPy, vectorized over the whole batch)
+    BATCH_EXECUTOR: str = "auto"
+    BATCH_WORKERS: int = 0  # 0 = os.cpu_count()
+    BATCH_CHUNK_SIZE: int = 64
+    BATCH_MAX_ITEMS: int = 10000
+
+    # Response cache for /recommendations and /recommendations/quick, keyed
+    # by the evaluation context (0 entries = off); emptied on rule reload
+    RESPONSE_CACHE_SIZE: int = 10000
+    RESPONSE_CACHE_TTL: float = 300
+
+    # Weather APIs behind /weather/auto (point the URLs at a local stand-in to
+    # run offline): one pooled keep-alive client per worker, and current
+    # weather cached per grid cell of WEATHER_GRID_DEGREES (TTL 0 = no cache)
+    WEATHER_API_URL: str = "https://api.open-meteo.com/v1/forecast"
+    WEATHER_HTTP_TIMEOUT: float = 10
+    WEATHER_MAX_CONNECTIONS: int = 20
+    WEATHER_CACHE_TTL: float = 600
+    WEATHER_GRID_DEGREES: float = 0.1
+    # Points per Open-Meteo request when fetching many (coordinate lists)
+    FORECAST_BATCH_SIZE: int = 50
+
+    # Client IP -> location for /weather/auto: a local range table built with
+    # `python -m app.services.ip_resolver` (empty = none), then the geolocation
+    # API ({ip} is the client address) unless the fallback is off, behind an
+    # LRU cache of IP_CACHE_SIZE addresses (0 = no cache)
+    IP_DATABASE_PATH: str = ""
+    IP_GEOLOCATION_URL: str = "https://ipapi.co/{ip}/json/"
+    IP_GEOLOCATION_FALLBACK: bool = True
+    IP_CACHE_SIZE: int = 10000
+
+    # Current weather of each region's representative points (points file),
+    # refreshed in the background every interval ± jitter (a fraction of it;
+    # 0 = off, the default; the Docker image turns it on). /weather/auto and
+    # recommendation requests without weather read it; past the interval it
+    # is served while refreshing, past the max staleness not at all
+    WEATHER_REFRESH_INTERVAL: float = 0
+    WEATHER_REFRESH_JITTER: float = 0.1
+    WEATHER_MAX_STALENESS: float = 1800
+    WEATHER_POINTS_PATH: str = os.path.join(DATA_PATH, "weather", "region_points.json")
+
+    # Hourly weather history per grid cell, written by every forecast fetch:
+    # ring buffers of WEATHER_HISTORY_DAYS (0 = off), in a memory-mapped file
+    # kept across restarts when WEATHER_HISTORY_PATH is set, else in memory.
+    # Rules read its rolling aggregates as weather.* fields of fetched and
+    # snapshot weather; hot and humid hours are those at or above the thresholds
+    WEATHER_HISTORY_DAYS: int = 0
+    WEATHER_HISTORY_PATH: str = ""
+    WEATHER_HISTORY_MAX_CELLS: int = 1024
+    WEATHER_HOT_TEMPERATURE: float = 30
+    WEATHER_HUMID_PERCENT: float = 80
+
+    # Rules, constants, scenarios and stats are served from bytes precomputed
+    # per ruleset version with ETags; browsers may reuse them for this long
+    CATALOGUE_MAX_AGE: int = 60
+
+    # Recommendation endpoints write engine responses with pydantic-core's
+    # JSON serializer instead of revalidating them through response_model,
+    # and decode request bodies with orjson when installed (same output bytes)
+    FAST_RESPONSES: bool = False
+
+    # Rule hot reload: poll the data files every N seconds (0 = watcher off).
+    # Admin endpoints need the X-Admin-Token header to match ADMIN_TOKEN, and
+    # are closed while it is not set (DEBUG does not open them).
+    RULES_RELOAD_INTERVAL: float = 0
+    ADMIN_TOKEN: str = ""
+
+    # Production server (python -m app.serve): gunicorn workers are recycled
+    # after SERVER_MAX_REQUESTS (+ up to the jitter) requests; 0 = never
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    # Proxies trusted to set X-Forwarded-For (comma-separated IPs, "*" = any).
+    # The server takes the client address from the header only for requests
+    # from these; /weather/auto locates that address. Same name as the
+    # uvicorn/gunicorn environment variable, so `uvicorn` honours it too.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
     # Debug
     DEBUG: bool = True
 
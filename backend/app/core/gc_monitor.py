@@ -0,0 +1,88 @@
+"""
+GC pause monitor - Times every cyclic garbage collection via gc.callbacks
+"""
+
+import gc
+import os
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class GCPauseMonitor:
+    """Collects per-generation pause statistics for the current process"""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._started: Optional[float] = None
+        self._running = False
+        self.reset()
+
+    def reset(self):
+        self.since = time.time()
+        self.collections = [0, 0, 0]
+        self.collected = [0, 0, 0]
+        self.total = [0.0, 0.0, 0.0]
+        self.max = [0.0, 0.0, 0.0]
+        # Most recent pauses per generation, for percentiles
+        self.recent = [deque(maxlen=self.window) for _ in range(3)]
+
+    def start(self):
+        """Start timing collections (statistics restart, e.g. in a freshly forked worker)"""
+        self.reset()
+        if not self._running:
+            gc.callbacks.append(self._callback)
+            self._running = True
+
+    def stop(self):
+        if self._running:
+            gc.callbacks.remove(self._callback)
+            self._running = False
+
+    def _callback(self, phase: str, info: Dict[str, int]):
+        if phase == 'start':
+            self._started = time.perf_counter()
+            return
+        if self._started is None:
+            return
+        pause = time.perf_counter() - self._started
+        self._started = None
+        generation = info['generation']
+        self.collections[generation] += 1
+        self.collected[generation] += info['collected']
+        self.total[generation] += pause
+        self.max[generation] = max(self.max[generation], pause)
+        self.recent[generation].append(pause)
+
+    @staticmethod
+    def _percentile(values, fraction: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        generations = {}
+        for generation in range(3):
+            count = self.collections[generation]
+            recent = self.recent[generation]
+            generations[f"gen{generation}"] = {
+                "collections": count,
+                "collected": self.collected[generation],
+                "total_ms": round(self.total[generation] * 1000, 3),
+                "mean_ms": round(self.total[generation] / count * 1000, 3) if count else 0.0,
+                "p50_ms": round(self._percentile(recent, 0.50) * 1000, 3),
+                "p99_ms": round(self._percentile(recent, 0.99) * 1000, 3),
+                "max_ms": round(self.max[generation] * 1000, 3),
+            }
+        return {
+            "pid": os.getpid(),
+            "running": self._running,
+            "seconds": round(time.time() - self.since, 1),
+            "frozen_objects": gc.get_freeze_count(),
+            "thresholds": gc.get_threshold(),
+            "generations": generations,
+        }
+
+
+gc_monitor = GCPauseMonitor()
@@ -3,33 +3,107 @@ AgriAdvisor Rule-Based Agricultural Advisory System
 FastAPI Backend Application
 """
 
+import os
+import time
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.api.routes import router as api_router
+from app.api.catalogue_cache import CatalogueCache
 from app.chatbot.routes import router as chatbot_router
 from app.core.config import settings
 from app.services.rule_loader import RuleLoader
+from app.services.rule_engine import RuleEngine
+from app.services.batch_evaluator import BatchEvaluator
+from app.services.response_cache import ResponseCache
+from app.services.rule_reloader import RuleReloader, file_signature, install_ruleset
+from app.services.weather_cache import WeatherCache
+from app.services.weather_history import create_weather_history
+from app.services.weather_refresher import RegionWeatherRefresher
+from app.services.weather_service import WeatherService
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Load rules on startup"""
-    # Initialize rule loader and load all rules
+def load_ruleset(app: FastAPI) -> str:
+    """Load the data files and build the rule engine into app.state; returns the data source"""
+    load_start = time.perf_counter()
     rule_loader = RuleLoader()
-    app.state.rule_loader = rule_loader
-    app.state.rules = rule_loader.load_all_rules()
-    app.state.constants = rule_loader.load_constants()
-    app.state.profiles = rule_loader.load_profiles()
+    signature = file_signature(rule_loader.data_files())
+    source = rule_loader.load_with_snapshot()
+    
+    # One long-lived engine per ruleset version, shared by all requests
+    engine = RuleEngine(
+        rule_loader.load_all_rules(),
+        rule_loader.load_constants(),
+        rule_loader.load_compiled_rules(),
+        version=rule_loader.content_hash()[:12]
+    )
+    install_ruleset(app.state, rule_loader, engine, signature)
+    rule_loader.build_search_index()
     
     print(f"✅ Loaded {len(app.state.rules)} rule categories")
     print(f"✅ Loaded {len(app.state.constants)} constant files")
     print(f"✅ Loaded {len(app.state.profiles)} farm profiles")
+    print(f"✅ Built rule engine {app.state.engine.version} ({app.state.engine.rule_count} enabled rules) "
+          f"from {source} in {(time.perf_counter() - load_start) * 1000:.1f} ms")
+    return source
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load rules on startup"""
+    # Already loaded when the production server preloaded them before forking
+    preloaded = hasattr(app.state, 'engine')
+    if not preloaded:
+        load_ruleset(app)
+    app.state.batch_evaluator = BatchEvaluator()
+    app.state.response_cache = (
+        ResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
+        if settings.RESPONSE_CACHE_SIZE > 0 else None
+    )
+    app.state.catalogue_cache = CatalogueCache(settings.CATALOGUE_MAX_AGE)
+    # Hourly weather history per grid cell (off unless WEATHER_HISTORY_DAYS is set)
+    app.state.weather_history = create_weather_history()
+    # One pooled HTTP client for the weather APIs instead of one per request
+    app.state.weather_service = WeatherService(
+        cache=(
+            WeatherCache(settings.WEATHER_CACHE_TTL, settings.WEATHER_GRID_DEGREES)
+            if settings.WEATHER_CACHE_TTL > 0 else None
+        ),
+        history=app.state.weather_history
+    )
+    # Regional weather snapshot, refreshed in the background
+    app.state.weather_refresher = None
+    if settings.WEATHER_REFRESH_INTERVAL > 0:
+        app.state.weather_refresher = RegionWeatherRefresher(
+            app,
+            settings.WEATHER_REFRESH_INTERVAL,
+            settings.WEATHER_MAX_STALENESS,
+            settings.WEATHER_REFRESH_JITTER
+        )
+        app.state.weather_refresher.start()
+    
+    # Hot reload: admin endpoint always, file watcher when an interval is set
+    app.state.rule_reloader = RuleReloader(app)
+    if preloaded:
+        # A worker recycled after a watcher reload forks with the master's older ruleset
+        await app.state.rule_reloader.reload()
+    app.state.rule_reloader.start(settings.RULES_RELOAD_INTERVAL)
+    if settings.RULES_RELOAD_INTERVAL <= 0 and int(os.environ.get('WEB_CONCURRENCY') or 1) > 1:
+        print("⚠️ RULES_RELOAD_INTERVAL is 0 with several uvicorn workers: "
+              "/admin/rules/reload only reaches the worker that serves it")
     
     yield
     
     # Cleanup on shutdown
+    await app.state.rule_reloader.stop()
+    app.state.batch_evaluator.shutdown()
+    if app.state.weather_refresher is not None:
+        await app.state.weather_refresher.stop()
+    await app.state.weather_service.close()
+    if app.state.weather_history is not None:
+        app.state.weather_history.close()
     print("👋 Shutting down AgriAdvisor API...")
 
 
@@ -68,9 +142,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    engine = getattr(app.state, 'engine', None)
     return {
         "status": "healthy",
         "rules_loaded": hasattr(app.state, 'rules'),
         "constants_loaded": hasattr(app.state, 'constants'),
-        "profiles_loaded": hasattr(app.state, 'profiles')
+        "profiles_loaded": hasattr(app.state, 'profiles'),
+        "rules_version": engine.version if engine else None,
+        "engine_built_at": engine.built_at.isoformat() if engine else None
     }
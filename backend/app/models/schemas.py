@@ -54,6 +54,15 @@ class WeatherData(BaseModel):
     rainfall_forecast_amount_mm: float = Field(default=0, description="Gözlənilən yağış miqdarı (mm)")
     wind_speed: float = Field(default=0, ge=0, description="Külək sürəti (km/saat)")
     frost_warning: bool = Field(default=False, description="Şaxta xəbərdarlığı")
+    # Rolling aggregates of the server's weather history (None until it covers the window)
+    rainfall_last_30days: Optional[float] = Field(default=None, ge=0, description="Son 30 gün yağış (mm)")
+    temperature_max_24h: Optional[float] = Field(default=None, description="Son 24 saatın maksimum temperaturu (°C)")
+    temperature_min_24h: Optional[float] = Field(default=None, description="Son 24 saatın minimum temperaturu (°C)")
+    temperature_max_7days: Optional[float] = Field(default=None, description="Son 7 günün maksimum temperaturu (°C)")
+    temperature_min_7days: Optional[float] = Field(default=None, description="Son 7 günün minimum temperaturu (°C)")
+    wind_speed_max_24h: Optional[float] = Field(default=None, ge=0, description="Son 24 saatın maksimum külək sürəti (km/saat)")
+    consecutive_hot_hours: Optional[int] = Field(default=None, ge=0, description="Ardıcıl isti saatlar")
+    consecutive_humid_hours: Optional[int] = Field(default=None, ge=0, description="Ardıcıl rütubətli saatlar")
     time_of_day: Optional[str] = Field(default=None, description="Günün vaxtı (morning/midday/evening/night)")
 
 
@@ -161,6 +170,15 @@ class RecommendationRequest(BaseModel):
     # For mixed farms
     resource_context: Optional[ResourceContext] = Field(default=None, description="Resurs konteksti")
     farm_components: Optional[FarmComponents] = Field(default=None, description="Ferma komponentləri")
+    
+    # Response size: only the top_k most urgent recommendations, none scored below min_urgency
+    top_k: Optional[int] = Field(default=None, ge=1, le=100, description="Ən təcili tövsiyələrin sayı")
+    min_urgency: Optional[int] = Field(default=None, ge=0, le=100, description="Minimal təciliyyət balı")
+
+
+class RecommendationInput(RecommendationRequest):
+    """Request as posted to /recommendations: without weather, the region's latest is used"""
+    weather: Optional[WeatherData] = Field(default=None, description="Hava məlumatları (boş olarsa regionun son hava məlumatı)")
 
 
 # ============== RECOMMENDATIONS OUTPUT ==============
@@ -213,6 +231,34 @@ class RecommendationResponse(BaseModel):
     summary_en: str = ""
 
 
+# ============== BATCH RECOMMENDATIONS ==============
+
+class BatchRecommendationRequest(BaseModel):
+    """Many recommendation requests evaluated in one call"""
+    # Items are validated one by one, so a malformed farm only fails its own slot
+    requests: List[Dict[str, Any]] = Field(..., min_length=1, description="RecommendationRequest obyektləri")
+    # Bounded so one call cannot make a single worker task of a whole large batch
+    chunk_size: Optional[int] = Field(default=None, ge=1, le=1000, description="Bir işçiyə göndərilən sorğu sayı")
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item in a batch: a response or an error"""
+    index: int
+    ok: bool
+    response: Optional[RecommendationResponse] = None
+    error: Optional[str] = None
+
+
+class BatchRecommendationResponse(BaseModel):
+    """Batch results, in request order"""
+    total: int
+    succeeded: int
+    failed: int
+    executor: str
+    chunk_size: int
+    results: List[BatchItemResult] = []
+
+
 # ============== SIMPLE ENDPOINTS ==============
 
 class FarmProfileResponse(BaseModel):
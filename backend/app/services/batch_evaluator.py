@@ -0,0 +1,223 @@
+"""
+Batch Evaluator - Evaluates many recommendation requests across CPU cores
+Requests are split into chunks; every chunk is validated and evaluated by a
+worker holding its own RuleEngine for the same ruleset version, and results come back in order
+with one (response, error) slot per item.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, List, Any, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.schemas import RecommendationRequest, RecommendationResponse
+from app.services.rule_engine import RuleEngine
+from app.core.config import settings
+
+
+EXECUTORS = ('auto', 'process', 'thread', 'inline', 'columnar')
+
+# (response, error) of one batch item - exactly one of them is set
+ItemResult = Tuple[Optional[RecommendationResponse], Optional[str]]
+
+# Engine of a pool worker process, built once by _init_worker
+_worker_engine: Optional[RuleEngine] = None
+
+
+def process_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method of the pool workers. The app process runs threads (the
+    event loop's helpers, condition reordering, batch threads), and a fork
+    can copy a lock one of them holds into a child that then deadlocks;
+    the fork server starts workers from a clean single-threaded process.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Workers fork from a server that already imported the engine
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def is_free_threaded() -> bool:
+    """True on a free-threaded (no-GIL) interpreter build with the GIL disabled"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def format_error(error: Exception) -> str:
+    """Short, single-line description of why an item failed"""
+    if isinstance(error, ValidationError):
+        return '; '.join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'request'}: {e['msg']}"
+            for e in error.errors()
+        )
+    return f"{type(error).__name__}: {error}"
+
+
+def evaluate_items(engine: RuleEngine, items: List[Dict[str, Any]]) -> List[ItemResult]:
+    """Validate and evaluate items one by one, isolating failures per item"""
+    results: List[ItemResult] = []
+    for item in items:
+        try:
+            request = RecommendationRequest.model_validate(item)
+            results.append((engine.evaluate(request), None))
+        except Exception as e:
+            results.append((None, format_error(e)))
+    return results
+
+
+def evaluate_items_columnar(
+    engine: RuleEngine,
+    columnar: RuleEngine,
+    items: List[Dict[str, Any]]
+) -> List[ItemResult]:
+    """Validate items one by one, then evaluate all valid ones column-wise with the columnar engine"""
+    results: List[ItemResult] = []
+    valid: List[Tuple[int, RecommendationRequest]] = []
+    for item in items:
+        try:
+            valid.append((len(results), RecommendationRequest.model_validate(item)))
+            results.append((None, None))
+        except Exception as e:
+            results.append((None, format_error(e)))
+
+    try:
+        responses = columnar.evaluate_many([request for _, request in valid])
+    except Exception:
+        # Isolate the failing item(s) with the per-request path
+        return evaluate_items(engine, items)
+    for (position, _), response in zip(valid, responses):
+        results[position] = (response, None)
+    return results
+
+
+def _init_worker(rules: Dict[str, Dict[str, Any]], constants: Dict[str, Any], version: str):
+    """Process pool initializer: compile the parent's ruleset once per worker"""
+    global _worker_engine
+    _worker_engine = RuleEngine(rules, constants, version=version)
+
+
+def _evaluate_chunk_in_worker(items: List[Dict[str, Any]]) -> List[ItemResult]:
+    return evaluate_items(_worker_engine, items)
+
+
+class BatchEvaluator:
+    """
+    Runs batches on a lazily created, app-scoped executor.
+    Processes sidestep the GIL at the cost of pickling items and responses;
+    on free-threaded builds threads share the already compiled rules instead.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ):
+        kind = executor or settings.BATCH_EXECUTOR
+        if kind not in EXECUTORS:
+            raise ValueError(f"Unknown batch executor '{kind}', expected one of {EXECUTORS}")
+        self.workers = workers or settings.BATCH_WORKERS or os.cpu_count() or 1
+        if kind == 'auto':
+            # A pool of one worker only adds pickling / hand-off overhead
+            if self.workers == 1:
+                kind = 'inline'
+            else:
+                kind = 'thread' if is_free_threaded() else 'process'
+        self.kind = kind
+        self.chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+        self._executor: Optional[Executor] = None
+        # Ruleset version the process pool workers were initialized with
+        self._executor_version: Optional[str] = None
+        # Columnar engine of the latest ruleset version, built once per version
+        self._columnar: Optional[RuleEngine] = None
+
+    def _get_executor(self, engine: RuleEngine) -> Executor:
+        if self.kind == 'process' and self._executor is not None and self._executor_version != engine.version:
+            # Rules were reloaded: retire the old workers once their running chunks finish
+            self._reset_executor()
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=process_context(),
+                    initializer=_init_worker,
+                    initargs=(engine.rules, engine.constants, engine.version)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch')
+            self._executor_version = engine.version
+        return self._executor
+
+    def _columnar_engine(self, engine: RuleEngine) -> RuleEngine:
+        """The columnar engine for the engine's ruleset version, built on first use"""
+        columnar = self._columnar
+        if columnar is None or columnar.version != engine.version:
+            # Imported here so NumPy is only needed when the columnar executor is used
+            from app.services.columnar_engine import ColumnarEngine
+            columnar = ColumnarEngine(engine.rules, engine.constants, engine.compiled_rules, engine.version)
+            self._columnar = columnar
+        return columnar
+
+    def _evaluate_columnar(self, engine: RuleEngine, items: List[Dict[str, Any]]) -> List[ItemResult]:
+        return evaluate_items_columnar(engine, self._columnar_engine(engine), items)
+
+    async def evaluate(
+        self,
+        engine: RuleEngine,
+        items: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ) -> Tuple[List[ItemResult], str]:
+        """
+        Evaluate items in order, never on the event loop. Returns the per-item
+        results and the executor actually used - a batch that fits in one
+        chunk runs inline. The columnar executor ignores chunks: its masks
+        are cheapest over the whole batch at once.
+        """
+        # Inline and columnar work runs on a thread too: on the event loop a
+        # large batch would stall every other request of the worker until done
+        if self.kind == 'columnar':
+            return await asyncio.to_thread(self._evaluate_columnar, engine, items), self.kind
+
+        chunk_size = chunk_size or self.chunk_size
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        if len(chunks) <= 1 or self.kind == 'inline':
+            return await asyncio.to_thread(evaluate_items, engine, items), 'inline'
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor(engine)
+        if self.kind == 'process':
+            tasks = [loop.run_in_executor(executor, _evaluate_chunk_in_worker, chunk) for chunk in chunks]
+        else:
+            tasks = [loop.run_in_executor(executor, partial(evaluate_items, engine, chunk)) for chunk in chunks]
+        chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = []
+        for chunk, outcome in zip(chunks, chunk_results):
+            if isinstance(outcome, BaseException):
+                # A crashed worker only fails the items of its own chunk
+                if isinstance(outcome, BrokenProcessPool):
+                    self._reset_executor()
+                results.extend((None, format_error(outcome)) for _ in chunk)
+            else:
+                results.extend(outcome)
+        return results, self.kind
+
+    def _reset_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def shutdown(self):
+        """Stop the worker pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
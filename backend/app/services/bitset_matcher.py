@@ -0,0 +1,305 @@
+"""
+Bitset Matcher - Evaluates each distinct atomic condition once per request
+Atoms are deduplicated across all rules of a farm type and evaluated into a
+single integer mask; every rule is then a mask test, nested AND/OR included.
+"""
+
+import itertools
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from app.services.rule_compiler import RuleCompiler, CompiledRule, Predicate, membership_key
+from app.services.threshold_index import FieldThresholds, THRESHOLD_OPERATORS, numeric_threshold
+
+
+# Tests a block against the atom mask of a request
+MaskPredicate = Callable[[int], bool]
+
+
+def _is_nested(item: Dict[str, Any]) -> bool:
+    return 'operator' in item and 'items' in item
+
+
+def _hashable(value: Any) -> Any:
+    """Hashable stand-in for a condition value, used only for deduplication"""
+    if isinstance(value, list):
+        try:
+            return ('list', frozenset(value))
+        except TypeError:
+            return ('list', repr(value))
+    try:
+        hash(value)
+    except TypeError:
+        return ('repr', repr(value))
+    return (type(value).__name__, value)
+
+
+def atom_key(condition: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Canonical identity of an atomic condition.
+    Finite numeric thresholds are coerced like the interpreter (32 == 32.0)
+    and IN/NOT_IN lists compare as sets, so reordered lists share one atom.
+    """
+    field = condition.get('field', '')
+    op = condition.get('operator', '==')
+    value = condition.get('value')
+    if op in THRESHOLD_OPERATORS:
+        threshold = numeric_threshold(value)
+        if threshold is not None:
+            return (field, op, threshold)
+    return (field, op, _hashable(value))
+
+
+def applicable_to_key(applicable_to: Any) -> Tuple[Any, ...]:
+    """Canonical identity of an `applicable_to` filter, treated as one more atom"""
+    return ('@applicable_to', _hashable(applicable_to))
+
+
+class EqualityGroup:
+    """
+    All ==, !=, IN and NOT_IN atoms on one field, resolved with one dict probe.
+    For every constant mentioned by the atoms the satisfied-atom mask is
+    precomputed; any other value satisfies exactly the != / NOT_IN atoms.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        # (op, accepted constants, global bit, fallback predicate)
+        self._atoms: List[Tuple[str, frozenset, int, Predicate]] = []
+        self._masks: Dict[Any, int] = {}
+        self._default = 0
+
+    def add(self, op: str, value: Any, bit: int, predicate: Predicate):
+        constants = frozenset([value]) if op in ('==', '!=') else frozenset(value)
+        self._atoms.append((op, constants, bit, predicate))
+
+    def freeze(self):
+        constants = set()
+        for _, atom_constants, _, _ in self._atoms:
+            constants |= atom_constants
+
+        for op, _, bit, _ in self._atoms:
+            if op in ('!=', 'NOT_IN'):
+                self._default |= bit
+
+        for constant in constants:
+            mask = 0
+            for op, atom_constants, bit, _ in self._atoms:
+                is_member = constant in atom_constants
+                if is_member == (op in ('==', 'IN')):
+                    mask |= bit
+            self._masks[constant] = mask
+
+    def satisfied(self, context: Dict[str, Any]) -> int:
+        value = context.get(self.field)
+        if value is None:
+            return 0
+        try:
+            return self._masks.get(membership_key(value), self._default)
+        except TypeError:
+            # Unhashable value (list): evaluate the atoms one by one
+            mask = 0
+            for _, _, bit, predicate in self._atoms:
+                if predicate(context):
+                    mask |= bit
+            return mask
+
+
+class BitsetMatcher:
+    """Bitset evaluation of one farm type's rules"""
+
+    def __init__(self, compiled_rules: List[CompiledRule]):
+        self.rules = compiled_rules
+        self._compiler = RuleCompiler()
+
+        # Distinct atoms in first-seen order: key -> condition (or applicable_to list)
+        self._atom_conditions: Dict[Tuple[Any, ...], Any] = {}
+        self.atom_occurrences = 0
+        for compiled in compiled_rules:
+            applicable_to = compiled.rule.get('applicable_to')
+            if applicable_to:
+                self._register(applicable_to_key(applicable_to), applicable_to)
+            self._collect_atoms(compiled.rule.get('conditions', {}))
+
+        self._bits: Dict[Tuple[Any, ...], int] = {}
+        self._numeric: List[Tuple[str, FieldThresholds, int]] = []
+        self._equality: List[EqualityGroup] = []
+        self._generic: List[Tuple[int, Predicate]] = []
+        self._assign_bits()
+
+        # (required bits, extra mask test, rule) per rule in load order
+        self._tests: List[Tuple[int, Optional[MaskPredicate], CompiledRule]] = []
+        for compiled in compiled_rules:
+            required, extra = self._compile_block(compiled.rule.get('conditions', {}))
+            applicable_to = compiled.rule.get('applicable_to')
+            if applicable_to:
+                required |= self._bits[applicable_to_key(applicable_to)]
+            self._tests.append((required, extra, compiled))
+
+    @property
+    def distinct_atoms(self) -> int:
+        return len(self._atom_conditions)
+
+    @property
+    def atom_keys(self) -> List[Tuple[Any, ...]]:
+        return list(self._atom_conditions)
+
+    def _register(self, key: Tuple[Any, ...], condition: Any):
+        self.atom_occurrences += 1
+        if key not in self._atom_conditions:
+            self._atom_conditions[key] = condition
+
+    def _collect_atoms(self, conditions: Dict[str, Any]):
+        for item in conditions.get('items', []) if conditions else []:
+            if _is_nested(item):
+                self._collect_atoms(item)
+            else:
+                self._register(atom_key(item), item)
+
+    def _assign_bits(self):
+        """Give every distinct atom a bit; numeric atoms of a field get a contiguous range"""
+        next_bit = 0
+        numeric: Dict[str, FieldThresholds] = {}
+        equality: Dict[str, EqualityGroup] = {}
+
+        for key, condition in self._atom_conditions.items():
+            if key[0] == '@applicable_to':
+                continue
+            field, op = key[0], key[1]
+            if op in THRESHOLD_OPERATORS and isinstance(key[2], float):
+                numeric.setdefault(field, FieldThresholds(field)).add(op, key[2])
+
+        for field, field_thresholds in numeric.items():
+            field_thresholds.freeze()
+            for (op, threshold), local_bit in field_thresholds.atoms.items():
+                self._bits[(field, op, threshold)] = local_bit << next_bit
+            self._numeric.append((field, field_thresholds, next_bit))
+            next_bit += len(field_thresholds.atoms)
+
+        for key, condition in self._atom_conditions.items():
+            if key in self._bits:
+                continue
+            bit = 1 << next_bit
+            next_bit += 1
+            self._bits[key] = bit
+
+            if key[0] == '@applicable_to':
+                self._generic.append((bit, self._compiler.compile_applicable_to(condition)))
+                continue
+
+            predicate = self._compiler.compile_condition(condition)
+            op = condition.get('operator', '==')
+            value = condition.get('value')
+            # Only hashable scalar constants / hashable lists can share a dict probe
+            groupable = (
+                (op in ('==', '!=') and key[2][0] not in ('list', 'repr')) or
+                (op in ('IN', 'NOT_IN') and isinstance(value, list) and isinstance(key[2][1], frozenset))
+            )
+            if groupable:
+                field = condition.get('field', '')
+                if field not in equality:
+                    equality[field] = EqualityGroup(field)
+                equality[field].add(op, value, bit, predicate)
+            else:
+                self._generic.append((bit, predicate))
+
+        for group in equality.values():
+            group.freeze()
+        self._equality = list(equality.values())
+
+    def _compile_block(self, conditions: Dict[str, Any]) -> Tuple[int, Optional[MaskPredicate]]:
+        """
+        Compile a condition block into (required bits, extra test).
+        The block holds iff all required bits are set and the extra test
+        (if any) passes - mirroring RuleEngine._evaluate_conditions.
+        """
+        if not conditions:
+            return 0, None
+        items = conditions.get('items', [])
+        if not items:
+            return 0, None
+
+        parts = [
+            self._compile_block(item) if _is_nested(item) else (self._bits[atom_key(item)], None)
+            for item in items
+        ]
+
+        if conditions.get('operator', 'AND') != 'OR' or len(parts) == 1:
+            required = 0
+            extras = []
+            for part_required, part_extra in parts:
+                required |= part_required
+                if part_extra is not None:
+                    extras.append(part_extra)
+            if not extras:
+                return required, None
+            if len(extras) == 1:
+                return required, extras[0]
+
+            def all_extras(mask: int) -> bool:
+                for extra in extras:
+                    if not extra(mask):
+                        return False
+                return True
+            return required, all_extras
+
+        any_bits = 0
+        alternatives: List[Tuple[int, Optional[MaskPredicate]]] = []
+        for part_required, part_extra in parts:
+            if part_extra is None and part_required == 0:
+                # An empty alternative always holds
+                return 0, None
+            if part_extra is None and (part_required & (part_required - 1)) == 0:
+                any_bits |= part_required
+            else:
+                alternatives.append((part_required, part_extra))
+
+        def any_part(mask: int) -> bool:
+            if mask & any_bits:
+                return True
+            for part_required, part_extra in alternatives:
+                if (mask & part_required) == part_required and (part_extra is None or part_extra(mask)):
+                    return True
+            return False
+        return 0, any_part
+
+    def atom_mask(self, context: Dict[str, Any]) -> int:
+        """Evaluate every distinct atom once into a bitmask"""
+        mask = 0
+        for field, field_thresholds, offset in self._numeric:
+            satisfied = field_thresholds.satisfied(context.get(field))
+            if satisfied:
+                mask |= satisfied << offset
+        for group in self._equality:
+            mask |= group.satisfied(context)
+        for bit, predicate in self._generic:
+            if predicate(context):
+                mask |= bit
+        return mask
+
+    def match(
+        self,
+        context: Dict[str, Any],
+        limit: Optional[int] = None,
+        first: Optional[int] = None
+    ) -> List[CompiledRule]:
+        """
+        Matching rules for the context, in rule order. Only the first `first`
+        rules are tested, and testing stops once `limit` rules have matched;
+        every atom is still evaluated.
+        """
+        mask = self.atom_mask(context)
+        tests = self._tests if first is None else itertools.islice(self._tests, first)
+        if limit is None:
+            return [
+                compiled
+                for required, extra, compiled in tests
+                if (mask & required) == required and (extra is None or extra(mask))
+            ]
+
+        result = []
+        for required, extra, compiled in tests:
+            if (mask & required) == required and (extra is None or extra(mask)):
+                result.append(compiled)
+                if len(result) == limit:
+                    break
+        return result
@@ -0,0 +1,277 @@
+"""
+Columnar Engine - Vectorized rule evaluation over many farm contexts at once
+Contexts are flattened into NumPy columns (one per context field a rule
+reads) and every rule's condition tree becomes boolean mask operations over
+all farms; RecommendationAction objects are only built for the matches.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import RecommendationRequest, RecommendationResponse
+from app.services.bitset_matcher import atom_key, applicable_to_key
+from app.services.rule_compiler import RuleCompiler, CompiledRule, NUMERIC_OPERATORS, membership_key
+from app.services.rule_engine import RuleEngine
+from app.services.rule_index import APPLICABLE_TO_FIELDS
+
+
+# Value codes that never equal a rule constant
+MISSING = -1      # None / absent field
+UNMATCHED = -2    # present, but NaN or unhashable (lists)
+
+
+class Columns:
+    """
+    Column views of a list of contexts, built lazily per field and kind:
+    raw values, presence, float values (NaN when float() fails), truthiness
+    and integer codes of hashable values.
+    """
+
+    def __init__(self, contexts: List[Dict[str, Any]]):
+        self.contexts = contexts
+        self.size = len(contexts)
+        self._cache: Dict[Tuple[str, str], Any] = {}
+
+    def values(self, field: str) -> List[Any]:
+        key = (field, 'values')
+        if key not in self._cache:
+            self._cache[key] = [context.get(field) for context in self.contexts]
+        return self._cache[key]
+
+    def present(self, field: str) -> np.ndarray:
+        key = (field, 'present')
+        if key not in self._cache:
+            self._cache[key] = np.fromiter(
+                (value is not None for value in self.values(field)), dtype=bool, count=self.size
+            )
+        return self._cache[key]
+
+    def numeric(self, field: str) -> np.ndarray:
+        """float(value) per row like the interpreter, NaN where it cannot compare"""
+        key = (field, 'numeric')
+        if key not in self._cache:
+            values = self.values(field)
+            try:
+                # NumPy maps None to NaN, which fails every comparison as required
+                column = np.array(values, dtype=np.float64)
+            except (ValueError, TypeError):
+                column = None
+            if column is None or column.shape != (self.size,):
+                # Mixed / unconvertible values (or lists): convert one by one
+                column = np.full(self.size, np.nan)
+                for i, value in enumerate(values):
+                    if value is None:
+                        continue
+                    try:
+                        column[i] = float(value)
+                    except (ValueError, TypeError):
+                        pass
+            self._cache[key] = column
+        return self._cache[key]
+
+    def truthy(self, field: str) -> np.ndarray:
+        """NOT_EMPTY per row: present and truthy (non-empty for lists)"""
+        key = (field, 'truthy')
+        if key not in self._cache:
+            self._cache[key] = np.fromiter(
+                (bool(value) for value in self.values(field)), dtype=bool, count=self.size
+            )
+        return self._cache[key]
+
+    def codes(self, field: str) -> Tuple[np.ndarray, Dict[Any, int]]:
+        """Factorize a field: equal values share a code, table maps value -> code"""
+        key = (field, 'codes')
+        if key not in self._cache:
+            values = self.values(field)
+            table: Dict[Any, int] = {}
+            try:
+                # Code each distinct value once, then map the column in C
+                distinct = dict.fromkeys(values)
+            except TypeError:
+                codes = np.fromiter((self._code(value, table) for value in values), dtype=np.int64, count=self.size)
+            else:
+                for value in distinct:
+                    distinct[value] = self._code(value, table)
+                codes = np.fromiter(map(distinct.__getitem__, values), dtype=np.int64, count=self.size)
+            self._cache[key] = (codes, table)
+        return self._cache[key]
+
+    @staticmethod
+    def _code(value: Any, table: Dict[Any, int]) -> int:
+        if value is None:
+            return MISSING
+        value = membership_key(value)
+        try:
+            return UNMATCHED if value != value else table.setdefault(value, len(table))
+        except TypeError:
+            return UNMATCHED
+
+
+class ColumnarEngine(RuleEngine):
+    """
+    RuleEngine variant for large batches. Produces responses identical to
+    RuleEngine.evaluate: conditions it cannot vectorize (CONTAINS, unhashable
+    constants, ...) fall back to the compiled predicate row by row.
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, Dict[str, Any]],
+        constants: Dict[str, Any],
+        compiled_rules: Optional[Dict[str, Dict[str, List[CompiledRule]]]] = None,
+        version: str = "",
+        chunk_size: int = 8192
+    ):
+        self._compiler = RuleCompiler()
+        self.chunk_size = chunk_size
+        super().__init__(rules, constants, compiled_rules, version=version)
+
+    def _build_matchers(self) -> Dict[str, Any]:
+        # Rules are matched column-wise by match_matrix, not per context
+        return {}
+
+    def _build_optimizer(self) -> None:
+        # Vectorized matching does not evaluate conditions one by one
+        return None
+
+    def evaluate(self, request: RecommendationRequest) -> RecommendationResponse:
+        return self.evaluate_many([request])[0]
+
+    def evaluate_many(self, requests: List[RecommendationRequest]) -> List[RecommendationResponse]:
+        """Evaluate requests column-wise per farm type, returning responses in order"""
+        responses: List[Optional[RecommendationResponse]] = [None] * len(requests)
+
+        for start in range(0, len(requests), self.chunk_size):
+            chunk = requests[start:start + self.chunk_size]
+            contexts = [self._build_context(request) for request in chunk]
+
+            rows_by_farm: Dict[str, List[int]] = {}
+            for row, request in enumerate(chunk):
+                rows_by_farm.setdefault(request.farm_type.value, []).append(row)
+
+            for farm_type, rows in rows_by_farm.items():
+                farm_rules = self.farm_rules.get(farm_type, [])
+                matched: List[List[CompiledRule]] = [[] for _ in rows]
+                if farm_rules:
+                    matrix = self.match_matrix(farm_rules, [contexts[row] for row in rows])
+                    # Transposed nonzero walks farm by farm, rules in load order
+                    farm_positions, rule_positions = np.nonzero(matrix.T)
+                    for position, rule_position in zip(farm_positions.tolist(), rule_positions.tolist()):
+                        matched[position].append(farm_rules[rule_position])
+
+                for position, row in enumerate(rows):
+                    responses[start + row] = self._build_response(chunk[row], contexts[row], matched[position])
+
+        return responses
+
+    def match_matrix(self, farm_rules: List[CompiledRule], contexts: List[Dict[str, Any]]) -> np.ndarray:
+        """Boolean (rules x contexts) matrix of which rule matches which context"""
+        columns = Columns(contexts)
+        atoms: Dict[Tuple[Any, ...], np.ndarray] = {}
+        matrix = np.empty((len(farm_rules), len(contexts)), dtype=bool)
+
+        for position, compiled in enumerate(farm_rules):
+            mask = self._block_mask(compiled.rule.get('conditions', {}), columns, atoms)
+            applicable_to = compiled.rule.get('applicable_to')
+            if applicable_to:
+                mask = mask & self._applicable_mask(applicable_to, columns, atoms)
+            matrix[position] = mask
+
+        return matrix
+
+    def _per_row(self, predicate, columns: Columns) -> np.ndarray:
+        return np.fromiter((bool(predicate(c)) for c in columns.contexts), dtype=bool, count=columns.size)
+
+    def _block_mask(self, conditions: Dict[str, Any], columns: Columns, atoms: Dict) -> np.ndarray:
+        """Vectorized RuleEngine._evaluate_conditions"""
+        items = conditions.get('items', []) if conditions else []
+        if not items:
+            return np.ones(columns.size, dtype=bool)
+
+        masks = [
+            self._block_mask(item, columns, atoms) if 'operator' in item and 'items' in item
+            else self._atom_mask(item, columns, atoms)
+            for item in items
+        ]
+        if len(masks) == 1:
+            return masks[0]
+        if conditions.get('operator', 'AND') == 'OR':
+            return np.logical_or.reduce(masks)
+        return np.logical_and.reduce(masks)
+
+    def _atom_mask(self, condition: Dict[str, Any], columns: Columns, atoms: Dict) -> np.ndarray:
+        """Vectorized RuleEngine._evaluate_single_condition, shared by identical atoms"""
+        key = atom_key(condition)
+        if key not in atoms:
+            atoms[key] = self._compute_atom(condition, columns)
+        return atoms[key]
+
+    def _compute_atom(self, condition: Dict[str, Any], columns: Columns) -> np.ndarray:
+        field = condition.get('field', '')
+        op = condition.get('operator', '==')
+        expected = condition.get('value')
+        size = columns.size
+
+        if op in NUMERIC_OPERATORS:
+            try:
+                threshold = float(expected)
+            except (ValueError, TypeError):
+                return np.zeros(size, dtype=bool)
+            return NUMERIC_OPERATORS[op](columns.numeric(field), threshold)
+
+        if op in ('==', '!='):
+            codes, table = columns.codes(field)
+            try:
+                code = table.get(membership_key(expected))
+            except TypeError:
+                return self._per_row(self._compiler.compile_condition(condition), columns)
+            equal = codes == code if code is not None else np.zeros(size, dtype=bool)
+            return equal if op == '==' else columns.present(field) & ~equal
+
+        if op in ('IN', 'NOT_IN'):
+            if not isinstance(expected, list):
+                return np.zeros(size, dtype=bool) if op == 'IN' else columns.present(field)
+            member = self._member_mask(field, expected, columns)
+            if member is None:
+                return self._per_row(self._compiler.compile_condition(condition), columns)
+            return member if op == 'IN' else columns.present(field) & ~member
+
+        if op == 'NOT_EMPTY':
+            return columns.truthy(field)
+        if op == 'EMPTY':
+            return ~columns.truthy(field)
+
+        # CONTAINS and unknown operators
+        return self._per_row(self._compiler.compile_condition(condition), columns)
+
+    def _member_mask(self, field: str, values: List[Any], columns: Columns) -> Optional[np.ndarray]:
+        """Rows whose value is in `values`, or None if the constants are unhashable"""
+        codes, table = columns.codes(field)
+        try:
+            member_codes = [table[value] for value in frozenset(values) if value in table]
+        except TypeError:
+            return None
+        return np.isin(codes, member_codes)
+
+    def _applicable_mask(self, applicable_to: Any, columns: Columns, atoms: Dict) -> np.ndarray:
+        """Vectorized `applicable_to` crop/animal filter"""
+        key = applicable_to_key(applicable_to)
+        if key in atoms:
+            return atoms[key]
+
+        mask = None
+        if isinstance(applicable_to, list):
+            mask = np.ones(columns.size, dtype=bool)
+            for field in APPLICABLE_TO_FIELDS:
+                member = self._member_mask(field, applicable_to, columns)
+                if member is None:
+                    mask = None
+                    break
+                # A set crop/animal type outside the list excludes the rule
+                mask &= ~columns.truthy(field) | member
+        if mask is None:
+            mask = self._per_row(self._compiler.compile_applicable_to(applicable_to), columns)
+
+        atoms[key] = mask
+        return mask
@@ -0,0 +1,262 @@
+"""
+Condition Optimizer - Orders AND/OR blocks by sampled pass rates and costs
+One in `sample_every` evaluations runs every condition of the candidate
+rules without short-circuiting, counting how often each condition and
+block passes and timing each leaf. Every `reorder_every` samples a
+background thread replans the blocks so the children most likely to
+decide them cheaply come first (ascending cost / (1 - pass rate) for AND,
+cost / pass rate for OR), recompiles the rules whose order changed and
+swaps a new predicates tuple into their farm type's RuleIndex. Compiled
+rules are never modified. Conditions have no side effects and never
+raise, so the order never changes a result.
+"""
+
+import threading
+from time import perf_counter_ns
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from app.services.rule_compiler import RuleCompiler, CompiledRule, Predicate
+from app.services.rule_index import RuleIndex
+
+
+# Evaluations a block needs before its children are reordered
+MIN_EVALUATIONS = 32
+
+# A new order must be expected to save this share of the block's cost, so
+# timing noise does not flip orders (and recompile rules) back and forth
+MIN_SAVING = 0.05
+
+
+def _timer_overhead_ns() -> int:
+    """Cost of the perf_counter_ns pair around a leaf, subtracted from its timings"""
+    best = None
+    for _ in range(200):
+        start = perf_counter_ns()
+        elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+TIMER_OVERHEAD_NS = _timer_overhead_ns()
+
+
+class ConditionNode:
+    """A condition (leaf) or AND/OR block of one rule, with its sampled statistics"""
+
+    def __init__(self, source: Dict[str, Any], path: str, compiler: RuleCompiler, is_block: bool):
+        self.source = source
+        self.path = path
+        self.evaluations = 0
+        self.passes = 0
+        self.cost_ns = 0
+
+        if is_block:
+            self.predicate: Optional[Predicate] = None
+            # Anything other than OR behaves as AND, as in the compiler
+            self.is_or = source.get('operator', 'AND') == 'OR'
+            self.children = [
+                ConditionNode(item, f"{path}.{i}", compiler, 'operator' in item and 'items' in item)
+                for i, item in enumerate(source.get('items', []))
+            ]
+        else:
+            self.predicate = compiler.compile_condition(source)
+            self.is_or = False
+            self.children = []
+        # Current evaluation order, as positions in the JSON items
+        self.order = list(range(len(self.children)))
+
+    @property
+    def pass_rate(self) -> float:
+        """Smoothed pass rate, so untried or always-passing conditions rank sensibly"""
+        return (self.passes + 1) / (self.evaluations + 2)
+
+    def observe(self, context: Dict[str, Any]) -> bool:
+        """Evaluate without short-circuiting, recording every node's outcome"""
+        self.evaluations += 1
+        if self.predicate is not None:
+            start = perf_counter_ns()
+            result = self.predicate(context)
+            self.cost_ns += max(perf_counter_ns() - start - TIMER_OVERHEAD_NS, 0)
+        elif self.children:
+            results = [child.observe(context) for child in self.children]
+            result = any(results) if self.is_or else all(results)
+        else:
+            # An empty block always matches, OR included
+            result = True
+        if result:
+            self.passes += 1
+        return result
+
+    def expected_cost(self) -> float:
+        """Mean cost in ns of evaluating this node in its current order"""
+        if self.predicate is not None:
+            return self.cost_ns / self.evaluations if self.evaluations else 0.0
+        return self._cost_of(self.order, [child.expected_cost() for child in self.children])
+
+    def _cost_of(self, order: List[int], costs: List[float]) -> float:
+        cost = 0.0
+        reached = 1.0
+        for i in order:
+            cost += reached * costs[i]
+            # Probability that evaluation goes on past this child
+            pass_rate = self.children[i].pass_rate
+            reached *= (1 - pass_rate) if self.is_or else pass_rate
+        return cost
+
+    def plan(self):
+        """Reorder this block's children (and theirs) from the statistics so far"""
+        for child in self.children:
+            child.plan()
+        if len(self.children) < 2 or self.evaluations < MIN_EVALUATIONS:
+            return
+        costs = [child.expected_cost() for child in self.children]
+
+        def rank(i: int) -> float:
+            # Probability that this child alone decides the block
+            decides = self.children[i].pass_rate if self.is_or else 1 - self.children[i].pass_rate
+            return costs[i] / decides
+
+        order = sorted(range(len(self.children)), key=rank)
+        if self._cost_of(order, costs) < self._cost_of(self.order, costs) * (1 - MIN_SAVING):
+            self.order = order
+
+    def signature(self) -> Tuple:
+        return (tuple(self.order),) + tuple(child.signature() for child in self.children)
+
+    def is_reordered(self) -> bool:
+        """Whether any block is evaluated in a different order than its JSON"""
+        return self.order != sorted(self.order) or any(child.is_reordered() for child in self.children)
+
+    def ordered(self) -> Dict[str, Any]:
+        """The block's JSON with items in the current order"""
+        if self.predicate is not None:
+            return self.source
+        return {**self.source, 'items': [self.children[i].ordered() for i in self.order]}
+
+    def describe(self) -> str:
+        if self.predicate is None:
+            return f"{'OR' if self.is_or else 'AND'} of {len(self.children)}"
+        return f"{self.source.get('field', '')} {self.source.get('operator', '==')} {self.source.get('value')!r}"
+
+    def stats(self, position: int = 0) -> List[Dict[str, Any]]:
+        """This node and its descendants, in evaluation order"""
+        rows = [{
+            "path": self.path,
+            "condition": self.describe(),
+            "position": position,
+            "evaluations": self.evaluations,
+            "pass_rate": round(self.passes / self.evaluations, 4) if self.evaluations else None,
+            "cost_ns": round(self.expected_cost(), 1),
+        }]
+        for position, i in enumerate(self.order):
+            rows.extend(self.children[i].stats(position))
+        return rows
+
+
+class ConditionOptimizer:
+    """Sampled condition statistics and selectivity ordering for one engine's rules"""
+
+    def __init__(self, matchers: Dict[str, RuleIndex], sample_every: int, reorder_every: int):
+        self.matchers = matchers
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self._compiler = RuleCompiler()
+
+        # (farm type, rule, condition tree) per rule, in matcher position order;
+        # trees by id() for candidate lookups
+        self.rules: List[Tuple[str, CompiledRule, ConditionNode]] = []
+        self._trees: Dict[int, ConditionNode] = {}
+        for farm_type, matcher in matchers.items():
+            for compiled_rule in matcher.rules:
+                tree = ConditionNode(compiled_rule.rule.get('conditions') or {}, 'root', self._compiler, True)
+                self.rules.append((farm_type, compiled_rule, tree))
+                self._trees[id(compiled_rule)] = tree
+        # Held while a reorder runs; samples due meanwhile do not start another
+        self._reordering = threading.Lock()
+
+        self.calls = 0
+        self.samples = 0
+        self.reorders = 0
+        self.recompiled = 0
+        self.skipped_reorders = 0
+
+    def due(self) -> bool:
+        """Count an evaluation; True for the ones to sample"""
+        self.calls += 1
+        return self.calls % self.sample_every == 0
+
+    def observe(self, candidates: Iterable[CompiledRule], context: Dict[str, Any]):
+        """Record every condition of the rules the matcher would try on this context"""
+        for compiled_rule in candidates:
+            tree = self._trees.get(id(compiled_rule))
+            if tree is not None:
+                tree.observe(context)
+        self.samples += 1
+        if self.samples % self.reorder_every == 0:
+            self.reorder_in_background()
+
+    def reorder_in_background(self) -> Optional[threading.Thread]:
+        """Start a reorder off the request path; None if one is already running"""
+        if not self._reordering.acquire(blocking=False):
+            self.skipped_reorders += 1
+            return None
+        thread = threading.Thread(target=self._reorder_and_release, name='condition-reorder', daemon=True)
+        thread.start()
+        return thread
+
+    def _reorder_and_release(self):
+        try:
+            self._reorder()
+        except Exception as e:
+            print(f"⚠️ Condition reorder failed: {e}")
+        finally:
+            self._reordering.release()
+
+    def reorder(self) -> int:
+        """Replan and swap predicates now, waiting for a running reorder; returns rules recompiled"""
+        with self._reordering:
+            return self._reorder()
+
+    def _reorder(self) -> int:
+        changed = 0
+        for farm_type, matcher in self.matchers.items():
+            predicates = list(matcher.predicates)
+            swapped = False
+            for position, compiled_rule in enumerate(matcher.rules):
+                tree = self._trees[id(compiled_rule)]
+                before = tree.signature()
+                tree.plan()
+                if tree.signature() != before:
+                    predicates[position] = self._compiler.compile_predicate(compiled_rule.rule, tree.ordered())
+                    swapped = True
+                    changed += 1
+            if swapped:
+                # One reference assignment: a match in progress keeps the tuple it started with
+                matcher.predicates = tuple(predicates)
+        self.reorders += 1
+        self.recompiled += changed
+        return changed
+
+    def stats(self, farm_type: Optional[str] = None, rule_id: Optional[str] = None) -> Dict[str, Any]:
+        rules = [
+            {
+                "farm_type": rule_farm_type,
+                "rule_id": compiled_rule.rule.get('rule_id', ''),
+                "reordered": tree.is_reordered(),
+                "conditions": tree.stats(),
+            }
+            for rule_farm_type, compiled_rule, tree in self.rules
+            if (farm_type is None or rule_farm_type == farm_type)
+            and (rule_id is None or compiled_rule.rule.get('rule_id') == rule_id)
+        ]
+        return {
+            "enabled": True,
+            "sample_every": self.sample_every,
+            "reorder_every": self.reorder_every,
+            "evaluations": self.calls,
+            "samples": self.samples,
+            "reorders": self.reorders,
+            "recompiled_rules": self.recompiled,
+            "skipped_reorders": self.skipped_reorders,
+            "rules": rules,
+        }
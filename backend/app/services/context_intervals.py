@@ -0,0 +1,119 @@
+"""
+Context Intervals - Canonical match keys from the thresholds in the rules
+For every numeric field the rules only compare (>, >=, <, <=, or == / !=
+against a number), the thresholds split the number line into intervals,
+and every value inside one interval satisfies exactly the same conditions.
+A context's match key replaces such values with their interval index and
+keeps every other field the rules read as is, dropping fields no rule
+reads: contexts with equal keys provably match the same rules.
+"""
+
+import math
+from bisect import bisect_left
+from enum import Enum
+from typing import Dict, List, Any, Set, Tuple
+
+from app.services.rule_compiler import CompiledRule
+from app.services.rule_index import APPLICABLE_TO_FIELDS
+
+
+# Operators whose result depends only on where a number lies relative to the value
+ORDER_OPERATORS = ('>', '>=', '<', '<=')
+EQUALITY_OPERATORS = ('==', '!=')
+
+# Above this, ints no longer convert to float exactly
+MAX_EXACT_INT = 2 ** 53
+
+
+def freeze(value: Any) -> Any:
+    """Hashable form of a context value, equal for equal values"""
+    if isinstance(value, Enum):
+        return value.value  # str enums hash by member name, not by value
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class IntervalCanonicalizer:
+    """Match keys for the rules of one farm type"""
+
+    def __init__(self, farm_rules: List[CompiledRule]):
+        points: Dict[str, Set[float]] = {}
+        exact: Set[str] = set()
+        for compiled in farm_rules:
+            self._collect(compiled.rule.get('conditions', {}), points, exact)
+            if compiled.rule.get('applicable_to'):
+                exact.update(APPLICABLE_TO_FIELDS)
+
+        # field -> sorted thresholds; a field also used any other way is kept exact
+        self.thresholds: Dict[str, List[float]] = {
+            field: sorted(values) for field, values in points.items() if field not in exact
+        }
+        self.exact_fields: Tuple[str, ...] = tuple(sorted(exact))
+        self.fields: Tuple[str, ...] = tuple(sorted(set(self.thresholds) | exact))
+
+    def _collect(self, conditions: Dict[str, Any], points: Dict[str, Set[float]], exact: Set[str]):
+        for item in conditions.get('items', []):
+            if 'operator' in item and 'items' in item:
+                self._collect(item, points, exact)
+                continue
+            field = item.get('field', '')
+            op = item.get('operator', '==')
+            expected = item.get('value')
+            if op in ORDER_OPERATORS:
+                try:
+                    threshold = float(expected)
+                except (ValueError, TypeError):
+                    continue  # float(expected) fails: never true whatever the value
+                points.setdefault(field, set())
+                if not math.isnan(threshold):
+                    points[field].add(threshold)
+            elif op in EQUALITY_OPERATORS and _is_number(expected) and abs(expected) < MAX_EXACT_INT:
+                points.setdefault(field, set()).add(float(expected))
+            else:
+                exact.add(field)
+
+    def _interval(self, thresholds: List[float], value: Any) -> Any:
+        """
+        Interval index of a number: 2i for values strictly between the
+        (i-1)th and ith threshold, 2i + 1 for the ith threshold itself.
+        Anything else (strings, bools, NaN, huge ints) is kept as is.
+        """
+        if value is None:
+            return None
+        if not _is_number(value) or value != value or (isinstance(value, int) and abs(value) >= MAX_EXACT_INT):
+            return ('value', freeze(value))
+        number = float(value)
+        position = bisect_left(thresholds, number)
+        if position < len(thresholds) and thresholds[position] == number:
+            return 2 * position + 1
+        return 2 * position
+
+    def key(self, context: Dict[str, Any]) -> Tuple:
+        """Canonical values of the fields the rules read, in a fixed order"""
+        thresholds = self.thresholds
+        values = []
+        for field in self.fields:
+            value = context.get(field)
+            if field in thresholds:
+                values.append(self._interval(thresholds[field], value))
+            else:
+                values.append(freeze(value))
+        return tuple(values)
+
+    def describe(self, field: str) -> List[str]:
+        """Human-readable intervals of a numeric field, e.g. ['<25', '25', '25..32', ...]"""
+        thresholds = self.thresholds.get(field, [])
+        if not thresholds:
+            return ['any']
+        labels = [f"<{thresholds[0]:g}"]
+        for low, high in zip(thresholds, thresholds[1:]):
+            labels.extend([f"{low:g}", f"{low:g}..{high:g}"])
+        labels.extend([f"{thresholds[-1]:g}", f">{thresholds[-1]:g}"])
+        return labels
@@ -0,0 +1,102 @@
+"""
+Context Layout - Evaluation contexts holding only the fields the rules read
+The context keys a farm type's rules can look at (condition fields, the
+applicable_to fields and message placeholders, disabled rules included)
+are collected once at load time. Building a context then reads exactly
+those attributes off the request's sections, without dumping each model
+to a dict or formatting a prefixed key per field.
+"""
+
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, List, Any, Callable, Iterable, Set, Tuple
+
+from app.models.schemas import RecommendationRequest
+from app.services.message_template import CONTEXT_SECTIONS, context_keys
+from app.services.rule_compiler import CompiledRule
+from app.services.rule_index import APPLICABLE_TO_FIELDS
+
+
+def time_of_day(hour: int) -> str:
+    if 5 <= hour < 12:
+        return 'morning'
+    if 12 <= hour < 17:
+        return 'midday'
+    if 17 <= hour < 21:
+        return 'evening'
+    return 'night'
+
+
+def _condition_fields(conditions: Dict[str, Any], fields: Set[str]):
+    for item in conditions.get('items', []):
+        if 'operator' in item and 'items' in item:
+            _condition_fields(item, fields)
+        else:
+            fields.add(item.get('field', ''))
+
+
+def rule_fields(compiled_rules: Iterable[CompiledRule]) -> Set[str]:
+    """Every context key the rules' conditions, filters and messages can read"""
+    fields: Set[str] = set()
+    for compiled in compiled_rules:
+        _condition_fields(compiled.rule.get('conditions', {}), fields)
+        if compiled.rule.get('applicable_to'):
+            fields.update(APPLICABLE_TO_FIELDS)
+        for template in (compiled.message_az, compiled.message_en):
+            if template is None:
+                continue
+            for segment in template.segments:
+                if not isinstance(segment, str):
+                    fields.update(segment[0])
+    return fields
+
+
+class ContextLayout:
+    """
+    Builds flat contexts with a fixed set of keys. farm_type, region and
+    date are always present; time_of_day and day_of_week only when read.
+    Fields whose value is None are left out - rules read the context
+    with .get(), so a missing key and a None value are the same to them.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        known = context_keys()
+        self.keys: Tuple[str, ...] = tuple(sorted(key for key in set(keys) if key in known))
+        self.time_of_day = 'time_of_day' in self.keys
+        self.day_of_week = 'day_of_week' in self.keys
+
+        # (request attribute, getter of the section's fields, their context keys)
+        sections: List[Tuple[str, Callable[[Any], Any], Tuple[str, ...]]] = []
+        for section in CONTEXT_SECTIONS:
+            section_keys = tuple(key for key in self.keys if key.startswith(section + '.'))
+            if not section_keys:
+                continue
+            names = [key[len(section) + 1:] for key in section_keys]
+            getter = attrgetter(*names)
+            if len(names) == 1:
+                # attrgetter with one name returns the value, not a 1-tuple
+                getter = lambda model, _get=getter: (_get(model),)
+            sections.append((section, getter, section_keys))
+        self.sections = tuple(sections)
+
+    def build(self, request: RecommendationRequest) -> Dict[str, Any]:
+        context = {
+            'farm_type': request.farm_type.value,
+            'region': request.region.value,
+            'date': request.request_date.isoformat(),
+        }
+
+        for section, getter, keys in self.sections:
+            model = getattr(request, section)
+            if model is None:
+                continue
+            for key, value in zip(keys, getter(model)):
+                if value is not None:
+                    context[key] = value
+
+        if self.time_of_day:
+            context['time_of_day'] = time_of_day(datetime.now().hour)
+        if self.day_of_week:
+            context['day_of_week'] = request.request_date.strftime('%A').lower()
+
+        return context
@@ -0,0 +1,142 @@
+"""
+Forecast Ingestion - Current weather plus hourly past and forecast rainfall from Open-Meteo
+Open-Meteo accepts comma-separated coordinate lists, so weather for many
+points is fetched in one request per FORECAST_BATCH_SIZE points. Each
+point's hourly precipitation (7 past days, 3 forecast days) is reduced
+server-side to the WeatherData fields the rules read: rainfall in the last
+24 hours and 7 days, and the amount expected in the next 48 hours. With a
+weather history, the past hours of every variable are written to it and
+its aggregates added to the point's weather.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_right
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import httpx
+
+from app.services.weather_history import VARIABLES, WeatherHistory
+
+logger = logging.getLogger(__name__)
+
+
+CURRENT_VARIABLES = "temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m"
+HOURLY_VARIABLES = "precipitation"
+# Requested instead when the past hours are kept in a weather history
+HISTORY_VARIABLES = ",".join(VARIABLES)
+PAST_DAYS = 7
+# Today plus two days always reaches 48 hours past the current hour
+FORECAST_DAYS = 3
+FORECAST_HOURS = 48
+
+# Rain is "expected" from 1 mm on, the climatological threshold of a rain day
+RAIN_EXPECTED_MM = 1.0
+
+HOUR = 3600
+
+
+def _total(values: Sequence[Any]) -> float:
+    # Hours the model has no value for count as dry
+    return round(sum(value for value in values if value is not None), 1)
+
+
+def derive_weather(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    WeatherData fields from one location of a response requested with
+    timeformat=unixtime. Open-Meteo's hourly precipitation at time t is the
+    sum over the hour before t, so the past is the hours up to the current
+    time and the forecast the hours after it.
+    """
+    current = data.get("current", {})
+    now = current.get("time") or time.time()
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    precipitation = hourly.get("precipitation", [])
+
+    present = bisect_right(times, now)
+    last_24h = precipitation[bisect_right(times, now - 24 * HOUR):present]
+    last_7days = precipitation[bisect_right(times, now - PAST_DAYS * 24 * HOUR):present]
+    forecast = precipitation[present:bisect_right(times, now + FORECAST_HOURS * HOUR)]
+    forecast_amount = _total(forecast)
+
+    # Check for frost warning (temperature below 0°C)
+    temperature = current.get("temperature_2m", 0)
+    return {
+        "temperature": round(temperature),
+        "humidity": round(current.get("relative_humidity_2m", 0)),
+        "rainfall_last_24h": _total(last_24h),
+        "rainfall_last_7days": _total(last_7days),
+        "rainfall_forecast_48h": forecast_amount >= RAIN_EXPECTED_MM,
+        "rainfall_forecast_amount_mm": forecast_amount,
+        "wind_speed": round(current.get("wind_speed_10m", 0)),
+        "frost_warning": temperature < 0
+    }
+
+
+class ForecastIngestion:
+    """Batched Open-Meteo requests for many points through a shared client"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        batch_size: int,
+        history: Optional[WeatherHistory] = None
+    ):
+        self.client = client
+        self.url = url
+        self.batch_size = max(batch_size, 1)
+        self.history = history
+        self.requests = 0
+        self.points = 0
+        self.errors = 0
+
+    async def fetch(self, points: Sequence[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """Weather for each (latitude, longitude), in order; batches are requested concurrently"""
+        batches = [points[i:i + self.batch_size] for i in range(0, len(points), self.batch_size)]
+        results = await asyncio.gather(*(self._fetch_batch(batch) for batch in batches))
+        return [weather for batch in results for weather in batch]
+
+    async def _fetch_batch(self, points: Sequence[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        self.requests += 1
+        self.points += len(points)
+        try:
+            params = {
+                "latitude": ",".join(str(latitude) for latitude, _ in points),
+                "longitude": ",".join(str(longitude) for _, longitude in points),
+                "current": CURRENT_VARIABLES,
+                "hourly": HOURLY_VARIABLES if self.history is None else HISTORY_VARIABLES,
+                "past_days": str(PAST_DAYS),
+                "forecast_days": str(FORECAST_DAYS),
+                "timezone": "auto",
+                "timeformat": "unixtime"
+            }
+            response = await self.client.get(self.url, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            # One location comes back as an object, several as a list in request order
+            locations = data if isinstance(data, list) else [data]
+            if len(locations) != len(points):
+                raise ValueError(f"{len(locations)} locations in the response for {len(points)} points")
+            weather = [derive_weather(location) for location in locations]
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Weather API error: {e}")
+            raise ValueError("Could not fetch weather data")
+
+        if self.history is not None:
+            for (latitude, longitude), location, point_weather in zip(points, locations, weather):
+                point_weather.update(self.history.record(latitude, longitude, location))
+        return weather
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "points": self.points,
+            "points_per_request": round(self.points / self.requests, 1) if self.requests else 0.0,
+            "batch_size": self.batch_size,
+            "errors": self.errors,
+        }
@@ -0,0 +1,303 @@
+"""
+IP Resolver - Client IP to location, from a local range table first
+Resolvers are tried in order until one knows the address: a memory-mapped
+table of sorted IP ranges searched with bisect (no network, no parsing per
+lookup), then optionally the geolocation API. An LRU cache per IP sits in
+front of them, and private or loopback addresses are never looked up.
+
+Table layout: MAGIC, range count and locations length (8 bytes each, little
+endian), the JSON list of distinct locations, then one record per range:
+first and last address (16 bytes each, big endian, IPv4 mapped into IPv6 so
+both families share one table) and a location index (4 bytes, little endian).
+
+Build a table from a CSV with a start,end,country,region,city,latitude,longitude
+header (one row per range, addresses as text) with:
+    python -m app.services.ip_resolver ranges.csv ip-ranges.bin
+"""
+
+import csv
+import ipaddress
+import json
+import mmap
+import os
+import socket
+import sys
+import tempfile
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+MAGIC = b'AGRIIP01'
+HEADER_SIZE = len(MAGIC) + 16
+ADDRESS_SIZE = 16
+RECORD_SIZE = 2 * ADDRESS_SIZE + 4
+
+# IPv4 address a.b.c.d is stored as ::ffff:a.b.c.d
+IPV4_MAPPED_PREFIX = bytes(10) + b'\xff\xff'
+
+# Every SPARSE_STEP-th first address is kept in memory, so a lookup bisects
+# a list first and touches only one block of SPARSE_STEP mapped records
+SPARSE_STEP = 64
+
+
+def address_key(address: str) -> Optional[bytes]:
+    """16-byte big-endian key of an address (ordered like the addresses), None if invalid"""
+    address = address.strip()
+    try:
+        return IPV4_MAPPED_PREFIX + socket.inet_pton(socket.AF_INET, address)
+    except OSError:
+        pass
+    try:
+        # Already in mapped form for ::ffff:a.b.c.d
+        return socket.inet_pton(socket.AF_INET6, address.split('%')[0])
+    except OSError:
+        return None
+
+
+def is_public(address: Optional[str]) -> bool:
+    """Whether an address can be geolocated at all (not private, loopback, reserved, ...)"""
+    if not address:
+        return False
+    try:
+        return ipaddress.ip_address(address.strip()).is_global
+    except ValueError:
+        return False
+
+
+def location_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """A location in the shape get_location_from_ip has always returned"""
+    return {
+        "latitude": float(row["latitude"]),
+        "longitude": float(row["longitude"]),
+        "city": row.get("city") or "Unknown",
+        "country": row.get("country") or "Unknown",
+        "region": row.get("region") or "",
+    }
+
+
+def write_range_table(path: Path, rows: Iterable[Dict[str, Any]]) -> int:
+    """Write rows with start, end and location columns as a range table, atomically; returns the range count"""
+    locations: List[Dict[str, Any]] = []
+    location_ids: Dict[tuple, int] = {}
+    ranges = []
+    for row in rows:
+        start, end = address_key(row["start"]), address_key(row["end"])
+        if start is None or end is None or start > end:
+            raise ValueError(f"Invalid IP range {row['start']} - {row['end']}")
+        location = location_from_row(row)
+        key = tuple(location.values())
+        if key not in location_ids:
+            location_ids[key] = len(locations)
+            locations.append(location)
+        ranges.append((start, end, location_ids[key]))
+
+    ranges.sort()
+    for previous, current in zip(ranges, ranges[1:]):
+        if current[0] <= previous[1]:
+            raise ValueError("IP ranges overlap: each address may belong to one range only")
+    encoded_locations = json.dumps(locations, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.ip-ranges-', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(ranges).to_bytes(8, 'little'))
+        f.write(len(encoded_locations).to_bytes(8, 'little'))
+        f.write(encoded_locations)
+        for start, end, location_id in ranges:
+            f.write(start)
+            f.write(end)
+            f.write(location_id.to_bytes(4, 'little'))
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return len(ranges)
+
+
+class _RangeStarts:
+    """The first addresses of a mapped table as a sequence bisect can search"""
+
+    def __init__(self, data: mmap.mmap, offset: int, count: int):
+        self._data = data
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self._offset + i * RECORD_SIZE
+        return self._data[start:start + ADDRESS_SIZE]
+
+
+class RangeTableResolver:
+    """Locations from a memory-mapped range table; lookups are O(log n) and offline"""
+
+    name = "range_table"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not an IP range table")
+
+        self.ranges = int.from_bytes(self._map[len(MAGIC):len(MAGIC) + 8], 'little')
+        locations_length = int.from_bytes(self._map[len(MAGIC) + 8:HEADER_SIZE], 'little')
+        self._records = HEADER_SIZE + locations_length
+        # Decoded once: the same dicts are handed out for every address of a location
+        self.locations: List[Dict[str, Any]] = json.loads(self._map[HEADER_SIZE:self._records])
+        self._starts = _RangeStarts(self._map, self._records, self.ranges)
+        self._sparse = [self._starts[i] for i in range(0, self.ranges, SPARSE_STEP)]
+
+        self.lookups = 0
+        self.found = 0
+
+    def lookup(self, address: str) -> Optional[Dict[str, Any]]:
+        self.lookups += 1
+        key = address_key(address)
+        if key is None:
+            return None
+        block = bisect_right(self._sparse, key)
+        if block == 0:
+            # Before the first range
+            return None
+        lo = (block - 1) * SPARSE_STEP
+        i = bisect_right(self._starts, key, lo, min(lo + SPARSE_STEP, self.ranges)) - 1
+        record = self._records + i * RECORD_SIZE
+        if key > self._map[record + ADDRESS_SIZE:record + 2 * ADDRESS_SIZE]:
+            # Between two ranges
+            return None
+        self.found += 1
+        return self.locations[int.from_bytes(self._map[record + 2 * ADDRESS_SIZE:record + RECORD_SIZE], 'little')]
+
+    async def resolve(self, address: str) -> Optional[Dict[str, Any]]:
+        return self.lookup(address)
+
+    def close(self):
+        self._map.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resolver": self.name,
+            "path": str(self.path),
+            "ranges": self.ranges,
+            "locations": len(self.locations),
+            "size_bytes": len(self._map),
+            "lookups": self.lookups,
+            "found": self.found,
+        }
+
+
+class NetworkResolver:
+    """Locations from the geolocation API (IP_GEOLOCATION_URL with {ip}), through a shared client"""
+
+    name = "network"
+
+    def __init__(self, client: httpx.AsyncClient, url: str):
+        self.client = client
+        self.url = url
+        self.requests = 0
+        self.errors = 0
+
+    async def resolve(self, address: str) -> Optional[Dict[str, Any]]:
+        self.requests += 1
+        try:
+            response = await self.client.get(self.url.format(ip=address), headers={"Accept": "application/json"})
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self.errors += 1
+            raise
+        if data.get("latitude") is None or data.get("longitude") is None:
+            return None
+        return location_from_row({**data, "country": data.get("country_name")})
+
+    def close(self):
+        # The client belongs to the weather service
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"resolver": self.name, "url": self.url, "requests": self.requests, "errors": self.errors}
+
+
+class IPLocator:
+    """Resolvers tried in order behind an LRU cache per address"""
+
+    def __init__(self, resolvers: List[Any], cache_size: int):
+        self.resolvers = resolvers
+        self.cache_size = cache_size
+        # address -> location, or None when no resolver knows it
+        self._cache: OrderedDict = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.unresolvable = 0
+
+    async def resolve(self, address: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Location of a client address, None if it is not public or no resolver knows it"""
+        if address in self._cache:
+            self._cache.move_to_end(address)
+            self.hits += 1
+            return self._cache[address]
+        if not is_public(address):
+            self.unresolvable += 1
+            return None
+
+        self.misses += 1
+        location = None
+        for resolver in self.resolvers:
+            # Errors propagate uncached, so the next request tries again
+            location = await resolver.resolve(address)
+            if location is not None:
+                break
+        if self.cache_size > 0:
+            self._cache[address] = location
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return location
+
+    def close(self):
+        for resolver in self.resolvers:
+            resolver.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "resolvers": [resolver.stats() for resolver in self.resolvers],
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "unresolvable": self.unresolvable,
+        }
+
+
+def create_ip_resolvers(client: httpx.AsyncClient) -> List[Any]:
+    """The resolvers configured in settings: the range table, then the network fallback"""
+    resolvers: List[Any] = []
+    if settings.IP_DATABASE_PATH:
+        try:
+            resolvers.append(RangeTableResolver(Path(settings.IP_DATABASE_PATH)))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ IP range table unavailable, resolving without it: {e}")
+    if settings.IP_GEOLOCATION_FALLBACK:
+        resolvers.append(NetworkResolver(client, settings.IP_GEOLOCATION_URL))
+    return resolvers
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python -m app.services.ip_resolver ranges.csv ip-ranges.bin")
+        sys.exit(2)
+    with open(sys.argv[1], newline='', encoding='utf-8') as f:
+        count = write_range_table(Path(sys.argv[2]), csv.DictReader(f))
+    print(f"✅ IP range table with {count} ranges: {sys.argv[2]}")
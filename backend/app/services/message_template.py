@@ -0,0 +1,112 @@
+"""
+Message Templates - Rule messages parsed once into literal and field segments
+Each `{placeholder}` is resolved at load time to the context keys it can
+come from, so rendering a matched rule's message is a lookup and a join.
+"""
+
+import re
+from typing import Dict, List, Any, FrozenSet, Optional, Tuple, Union
+
+from app.models.schemas import (
+    WeatherData,
+    SoilData,
+    CropContext,
+    LivestockContext,
+    GreenhouseContext,
+    ResourceContext,
+    FarmComponents
+)
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+# Prefixes tried, in order, for a placeholder that is not a context key itself
+PLACEHOLDER_PREFIXES = ('weather.', 'soil.', 'crop_context.', 'livestock_context.', 'greenhouse_context.')
+
+# Keys produced by RuleEngine._build_context: top-level ones and prefixed sections
+CONTEXT_ROOT_KEYS = ('farm_type', 'region', 'date', 'time_of_day', 'day_of_week')
+CONTEXT_SECTIONS = {
+    'weather': WeatherData,
+    'soil': SoilData,
+    'crop_context': CropContext,
+    'livestock_context': LivestockContext,
+    'greenhouse_context': GreenhouseContext,
+    'resource_context': ResourceContext,
+    'farm_components': FarmComponents,
+}
+
+# A segment is literal text or (candidate context keys, original placeholder text)
+Segment = Union[str, Tuple[Tuple[str, ...], str]]
+
+
+def context_keys() -> FrozenSet[str]:
+    """Every key the rule engine can put into an evaluation context"""
+    keys = set(CONTEXT_ROOT_KEYS)
+    for section, model in CONTEXT_SECTIONS.items():
+        keys.update(f'{section}.{field}' for field in model.model_fields)
+    return frozenset(keys)
+
+
+class MessageTemplate:
+    """
+    A parsed message template. Renders exactly like
+    RuleEngine._process_template: the first non-None candidate value is
+    inserted with str(), and unresolved placeholders are left as written.
+    """
+
+    __slots__ = ('source', 'segments', 'unknown', 'is_static')
+
+    def __init__(self, source: str, known_keys: Optional[FrozenSet[str]] = None):
+        if known_keys is None:
+            known_keys = context_keys()
+        self.source = source
+        self.unknown: List[str] = []
+
+        segments: List[Segment] = []
+        literal: List[str] = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+
+            name = match.group(1)
+            candidates = tuple(
+                key for key in (name,) + tuple(prefix + name for prefix in PLACEHOLDER_PREFIXES)
+                if key in known_keys
+            )
+            if not candidates:
+                # Can never resolve - keep the placeholder text as a literal
+                self.unknown.append(name)
+                literal.append(match.group(0))
+                continue
+
+            if any(literal):
+                segments.append(''.join(literal))
+            literal = []
+            segments.append((candidates, match.group(0)))
+
+        literal.append(source[position:])
+        if any(literal):
+            segments.append(''.join(literal))
+        self.segments: Tuple[Segment, ...] = tuple(segments)
+        # No placeholder can ever be substituted: render is the source itself
+        self.is_static = all(isinstance(segment, str) for segment in self.segments)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """Fill in the placeholders from the context"""
+        if self.is_static:
+            return self.source
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            candidates, original = segment
+            for key in candidates:
+                value = context.get(key)
+                if value is not None:
+                    parts.append(str(value))
+                    break
+            else:
+                parts.append(original)
+        return ''.join(parts)
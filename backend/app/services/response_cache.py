@@ -0,0 +1,145 @@
+"""
+Response Cache - LRU + TTL cache of recommendation responses
+Keyed by RuleEngine.match_key: farm type, region and date plus the values
+of every field the rules read (time_of_day and day_of_week included when
+rules read them), with numbers reduced to the rules' threshold intervals.
+Contexts with equal keys match the same rules, so a hit only re-renders
+the messages that have placeholders. Every hit returns its own copy with
+a new generated_at, and the stored entry is a copy the caller never sees.
+Misses are evaluated on a thread, off the event loop, and identical misses
+in flight are coalesced: later ones await the first evaluation and
+re-render its response like a hit. The cache empties itself when the
+engine's ruleset version changes.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+from app.models.schemas import RecommendationRequest, RecommendationResponse
+from app.services.rule_engine import RuleEngine
+
+
+# Entries serialized to estimate the cache's memory use
+SIZE_SAMPLE = 32
+
+GROUPS = ('critical_alerts', 'high_priority', 'medium_priority', 'low_priority', 'info', 'daily_schedule')
+
+
+class ResponseCache:
+    """Evaluation responses by context key, bounded by entry count and age"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = ""
+        # key -> (expires_at, response), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        # (version, key) -> the evaluation every concurrent miss for it awaits
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_evaluate(self, engine: RuleEngine, request: RecommendationRequest) -> RecommendationResponse:
+        """Cached response for the request's context, evaluating it on a miss"""
+        if engine.version != self.version:
+            self.invalidate(engine.version)
+
+        context = engine._build_context(request)
+        # Responses limited by top_k / min_urgency are different responses
+        key = engine.match_key(context) + (request.top_k, request.min_urgency)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return engine.rerender(entry[1], context)
+            del self._entries[key]
+            self.expired += 1
+
+        # The version is part of the key: a request on a newer engine never
+        # waits for a response of the previous ruleset
+        flight_key = (engine.version, key)
+        task = self._in_flight.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+            _, stored = await asyncio.shield(task)
+            return engine.rerender(stored, context)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._evaluate(engine, request, context, flight_key))
+        # Nobody may be left to await a failure if every waiter was cancelled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._in_flight[flight_key] = task
+        # Shielded: a client that disconnects does not cancel the evaluation others await
+        response, _ = await asyncio.shield(task)
+        return response
+
+    async def _evaluate(
+        self,
+        engine: RuleEngine,
+        request: RecommendationRequest,
+        context: Dict[str, Any],
+        flight_key: Tuple
+    ) -> Tuple[RecommendationResponse, RecommendationResponse]:
+        """Evaluate a miss on a thread and cache it; returns the response and the cached copy"""
+        try:
+            response = await asyncio.to_thread(engine.evaluate_context, request, context)
+            return response, self._store(*flight_key, response)
+        finally:
+            self._in_flight.pop(flight_key, None)
+
+    def _store(self, version: str, key: Tuple, response: RecommendationResponse) -> RecommendationResponse:
+        # Its own lists, so changes the caller makes to the response are not cached
+        stored = response.model_copy(update={group: list(getattr(response, group)) for group in GROUPS})
+        if version != self.version:
+            # Evaluated before a reload: not served to requests of the new ruleset
+            return stored
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, stored)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return stored
+
+    def approx_bytes(self) -> int:
+        """Memory estimate: serialized size of a sample of entries, scaled to all of them"""
+        if not self._entries:
+            return 0
+        sample = list(itertools.islice(reversed(self._entries.values()), SIZE_SAMPLE))
+        sampled = sum(len(response.model_dump_json()) for _, response in sample)
+        return sampled * len(self._entries) // len(sample)
+
+    def invalidate(self, version: str):
+        """Drop every entry; responses of another ruleset version are never served"""
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self.version = version
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "enabled": True,
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "approx_bytes": self.approx_bytes(),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "in_flight": len(self._in_flight),
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,329 @@
+"""
+Rule Compiler - Turns JSON rule conditions into prebuilt predicate closures
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Any, Callable, Optional
+import operator as op_module
+
+from pydantic import ValidationError
+
+from app.models.schemas import RecommendationAction, UrgencyLevel
+from app.services.message_template import MessageTemplate, context_keys
+
+
+# A compiled predicate takes the flat evaluation context and returns match/no match
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+NUMERIC_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    '>': op_module.gt,
+    '>=': op_module.ge,
+    '<': op_module.lt,
+    '<=': op_module.le,
+}
+
+
+def _always_true(context: Dict[str, Any]) -> bool:
+    return True
+
+
+def _always_false(context: Dict[str, Any]) -> bool:
+    return False
+
+
+def membership_key(value: Any) -> Any:
+    """
+    Normalize a context value before a set lookup.
+    str-based enums (e.g. AnimalType) compare equal to their value but hash
+    by member name, so they have to be unwrapped to hit a frozenset.
+    """
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def compile_membership(values: Any) -> Callable[[Any], bool]:
+    """Build a fast `actual in values` test with the same semantics as a list scan"""
+    if not isinstance(values, list):
+        return values.__contains__
+
+    try:
+        members = frozenset(values)
+    except TypeError:
+        # Unhashable constants (nested lists) - keep the linear scan
+        return values.__contains__
+
+    def contains(actual: Any) -> bool:
+        try:
+            return membership_key(actual) in members
+        except TypeError:
+            # Unhashable context values (lists) fall back to equality scan
+            return actual in values
+
+    return contains
+
+
+def action_fields(rule: Dict[str, Any], category: str) -> Dict[str, Any]:
+    """RecommendationAction fields of a matched rule, apart from its rendered messages"""
+    action_data = rule.get('action', {})
+    try:
+        urgency = UrgencyLevel(action_data.get('urgency', 'medium'))
+    except ValueError:
+        urgency = UrgencyLevel.MEDIUM
+    return {
+        'rule_id': rule.get('rule_id', ''),
+        'name_az': rule.get('name_az', ''),
+        'name_en': rule.get('name_en', ''),
+        'category': category,
+        'urgency': urgency,
+        'urgency_score': action_data.get('urgency_score', 50),
+        'action_type': action_data.get('type', 'info'),
+        'action_details': action_data,
+        'timing_az': action_data.get('timing_az'),
+    }
+
+
+@dataclass
+class CompiledRule:
+    """A rule paired with its prebuilt match predicate and message templates"""
+    rule: Dict[str, Any]
+    category: str
+    matches: Predicate
+    message_az: Optional[MessageTemplate] = None
+    message_en: Optional[MessageTemplate] = None
+    # The rule's action validated once, messages left empty; None if it does not validate
+    action: Optional[RecommendationAction] = None
+
+    @property
+    def is_static(self) -> bool:
+        """Whether the rendered messages are the same for every context"""
+        return all(template is None or template.is_static for template in (self.message_az, self.message_en))
+
+    @property
+    def urgency_score(self) -> float:
+        """Score the rule's recommendation is ranked by in responses"""
+        if self.action is not None:
+            return self.action.urgency_score
+        score = action_fields(self.rule, self.category)['urgency_score']
+        # An action that does not validate fails when it is built; rank it last
+        return score if isinstance(score, (int, float)) else 0
+
+
+class RuleCompiler:
+    """
+    Compiles the `conditions` tree and `applicable_to` filter of each rule
+    into a single callable. Produces the same results as the interpreter in
+    RuleEngine._evaluate_rule, with constants coerced once at load time.
+    Message templates are parsed and actions validated here too; placeholders
+    that no context key can fill are collected in `unknown_placeholders`.
+    """
+
+    def __init__(self):
+        self._context_keys = context_keys()
+        self.unknown_placeholders: List[str] = []
+
+    def compile_all(self, rules: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, List[CompiledRule]]]:
+        """Compile every rule, keeping the farm_type -> category layout of the loader"""
+        compiled: Dict[str, Dict[str, List[CompiledRule]]] = {}
+
+        for farm_type, categories in rules.items():
+            compiled[farm_type] = {}
+            for category, category_data in categories.items():
+                if category_data and 'rules' in category_data:
+                    compiled[farm_type][category] = [
+                        self.compile_rule(rule, category)
+                        for rule in category_data['rules']
+                    ]
+
+        return compiled
+
+    def compile_rule(self, rule: Dict[str, Any], category: str) -> CompiledRule:
+        """Compile a single rule into a CompiledRule"""
+        matches = self.compile_predicate(rule)
+        message_az = self.compile_template(rule, 'message_az')
+        message_en = self.compile_template(rule, 'message_en')
+        action = self.compile_action(rule, category)
+        return CompiledRule(rule, category, matches, message_az, message_en, action)
+
+    def compile_predicate(self, rule: Dict[str, Any], conditions: Optional[Dict[str, Any]] = None) -> Predicate:
+        """
+        Match predicate of a rule: its applicable_to filter, then its conditions.
+        `conditions` stands in for the rule's own block (the same block reordered).
+        """
+        conditions_match = self.compile_conditions(rule.get('conditions', {}) if conditions is None else conditions)
+        applicable_to = rule.get('applicable_to')
+        if not applicable_to:
+            return conditions_match
+
+        is_applicable = self.compile_applicable_to(applicable_to)
+
+        def matches(context: Dict[str, Any]) -> bool:
+            return is_applicable(context) and conditions_match(context)
+
+        return matches
+
+    def compile_action(self, rule: Dict[str, Any], category: str) -> Optional[RecommendationAction]:
+        """Validate the rule's action once, so matches only copy it with their messages"""
+        try:
+            return RecommendationAction(**action_fields(rule, category), message_az='', message_en='')
+        except ValidationError:
+            # Left to fail the same way on every match, as without compilation
+            return None
+
+    def compile_template(self, rule: Dict[str, Any], key: str) -> Optional[MessageTemplate]:
+        """Parse a message template, recording placeholders that can never resolve"""
+        source = rule.get(key, '')
+        if not isinstance(source, str):
+            return None
+
+        template = MessageTemplate(source, self._context_keys)
+        for name in template.unknown:
+            self.unknown_placeholders.append(f"{rule.get('rule_id', '?')}.{key}: {{{name}}}")
+        return template
+
+    def compile_applicable_to(self, applicable_to: Any) -> Predicate:
+        """Compile the `applicable_to` crop/animal filter of a rule"""
+        if not applicable_to:
+            return _always_true
+
+        is_member = compile_membership(applicable_to)
+
+        def is_applicable(context: Dict[str, Any]) -> bool:
+            crop_type = context.get('crop_context.crop_type')
+            if crop_type and not is_member(crop_type):
+                return False
+            animal_type = context.get('livestock_context.animal_type')
+            if animal_type and not is_member(animal_type):
+                return False
+            return True
+
+        return is_applicable
+
+    def compile_conditions(self, conditions: Dict[str, Any]) -> Predicate:
+        """Compile a (possibly nested) AND/OR condition block"""
+        if not conditions:
+            return _always_true
+
+        items = conditions.get('items', [])
+        if not items:
+            return _always_true
+
+        predicates = tuple(
+            self.compile_conditions(item) if 'operator' in item and 'items' in item
+            else self.compile_condition(item)
+            for item in items
+        )
+
+        if len(predicates) == 1:
+            return predicates[0]
+
+        # Anything other than OR behaves as AND, matching the interpreter
+        if conditions.get('operator', 'AND') == 'OR':
+            def any_match(context: Dict[str, Any]) -> bool:
+                for predicate in predicates:
+                    if predicate(context):
+                        return True
+                return False
+            return any_match
+
+        def all_match(context: Dict[str, Any]) -> bool:
+            for predicate in predicates:
+                if not predicate(context):
+                    return False
+            return True
+        return all_match
+
+    def compile_condition(self, condition: Dict[str, Any]) -> Predicate:
+        """Compile a single condition item"""
+        field = condition.get('field', '')
+        op = condition.get('operator', '==')
+        expected = condition.get('value')
+
+        if op == '==':
+            def equals(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                return actual is not None and actual == expected
+            return equals
+
+        if op == '!=':
+            def not_equals(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                return actual is not None and actual != expected
+            return not_equals
+
+        if op in NUMERIC_OPERATORS:
+            compare = NUMERIC_OPERATORS[op]
+            try:
+                threshold = float(expected)
+            except (ValueError, TypeError):
+                return _always_false
+
+            def numeric(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                if actual is None:
+                    return False
+                try:
+                    return compare(float(actual), threshold)
+                except (ValueError, TypeError):
+                    return False
+            return numeric
+
+        if op == 'IN':
+            if not isinstance(expected, list):
+                return _always_false
+            is_member = compile_membership(expected)
+
+            def in_values(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                return actual is not None and is_member(actual)
+            return in_values
+
+        if op == 'NOT_IN':
+            if not isinstance(expected, list):
+                def present(context: Dict[str, Any]) -> bool:
+                    return context.get(field) is not None
+                return present
+            is_member = compile_membership(expected)
+
+            def not_in_values(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                return actual is not None and not is_member(actual)
+            return not_in_values
+
+        if op == 'CONTAINS':
+            wanted = tuple(expected) if isinstance(expected, list) else (expected,)
+
+            def contains(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                if not isinstance(actual, list):
+                    return False
+                for value in wanted:
+                    if value in actual:
+                        return True
+                return False
+            return contains
+
+        if op == 'NOT_EMPTY':
+            def not_empty(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                if actual is None:
+                    return False
+                if isinstance(actual, list):
+                    return len(actual) > 0
+                return bool(actual)
+            return not_empty
+
+        if op == 'EMPTY':
+            def empty(context: Dict[str, Any]) -> bool:
+                actual = context.get(field)
+                if actual is None:
+                    return True
+                if isinstance(actual, list):
+                    return len(actual) == 0
+                return not bool(actual)
+            return empty
+
+        # Unknown operator never matches
+        return _always_false
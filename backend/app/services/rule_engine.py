@@ -2,6 +2,7 @@
 Rule Engine - Evaluates rules against input context and generates recommendations
 """
 
+from bisect import bisect_right
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import re
@@ -13,40 +14,192 @@ from app.models.schemas import (
     RecommendationResponse,
     UrgencyLevel
 )
+from app.services.rule_compiler import RuleCompiler, CompiledRule, action_fields
+from app.services.rule_index import RuleIndex
+from app.services.bitset_matcher import BitsetMatcher
+from app.services.condition_optimizer import ConditionOptimizer
+from app.services.context_intervals import IntervalCanonicalizer
+from app.services.context_layout import ContextLayout, rule_fields
+from app.services.message_template import context_keys
+from app.core.config import settings
 
 
 class RuleEngine:
     """
     Core rule evaluation engine.
     Evaluates conditions and generates recommendations.
+    
+    One engine is built per loaded ruleset version and shared by all
+    requests, so everything derived from the rules is computed once here.
     """
     
-    def __init__(self, rules: Dict[str, Dict[str, Any]], constants: Dict[str, Any]):
+    def __init__(
+        self,
+        rules: Dict[str, Dict[str, Any]],
+        constants: Dict[str, Any],
+        compiled_rules: Optional[Dict[str, Dict[str, List[CompiledRule]]]] = None,
+        evaluation_mode: Optional[str] = None,
+        version: str = ""
+    ):
         self.rules = rules
         self.constants = constants
+        self.evaluation_mode = evaluation_mode or settings.RULE_EVALUATION_MODE
+        self.version = version
+        # Prefer rules compiled once at load time; compile here only as a fallback
+        if compiled_rules is None:
+            compiled_rules = RuleCompiler().compile_all(rules)
+        self.compiled_rules = compiled_rules
+        
+        # Enabled rules per farm type, most urgent first and ties in load order:
+        # the order responses list them in, so top_k evaluation can stop early
+        self.farm_rules: Dict[str, List[CompiledRule]] = {
+            farm_type: sorted(
+                (
+                    compiled_rule
+                    for category_rules in categories.values()
+                    for compiled_rule in category_rules
+                    if self._is_rule_enabled(compiled_rule.rule)
+                ),
+                key=lambda compiled_rule: -compiled_rule.urgency_score
+            )
+            for farm_type, categories in compiled_rules.items()
+        }
+        # Negated urgency scores of the ranked rules (ascending, for bisect)
+        self.ranked_scores: Dict[str, List[float]] = {
+            farm_type: [-compiled_rule.urgency_score for compiled_rule in rules]
+            for farm_type, rules in self.farm_rules.items()
+        }
+        self.matchers = self._build_matchers()
+        self.optimizer = self._build_optimizer()
+        # Context keys each farm type's rules read (disabled ones included), so
+        # contexts skip every other field; unknown farm types get them all
+        self.layouts: Dict[str, ContextLayout] = {
+            farm_type: ContextLayout(rule_fields(
+                compiled_rule for category_rules in categories.values() for compiled_rule in category_rules
+            ))
+            for farm_type, categories in compiled_rules.items()
+        }
+        self.full_layout = ContextLayout(context_keys())
+        # Threshold intervals per farm type, for cache keys that ignore irrelevant precision
+        self.canonicalizers: Dict[str, IntervalCanonicalizer] = {
+            farm_type: IntervalCanonicalizer(rules) for farm_type, rules in self.farm_rules.items()
+        }
+        self.compiled_by_id: Dict[Tuple[str, str], CompiledRule] = {
+            (farm_type, compiled_rule.rule.get('rule_id', '')): compiled_rule
+            for farm_type, rules in self.farm_rules.items()
+            for compiled_rule in rules
+        }
+        self.built_at = datetime.now()
+    
+    def _build_matchers(self) -> Dict[str, Any]:
+        """Per-farm-type matcher over the enabled rules: candidate index or atom bitset"""
+        if self.evaluation_mode == 'bitset':
+            return {farm_type: BitsetMatcher(rules) for farm_type, rules in self.farm_rules.items()}
+        return {farm_type: RuleIndex(rules) for farm_type, rules in self.farm_rules.items()}
+    
+    def _build_optimizer(self) -> Optional[ConditionOptimizer]:
+        """Condition statistics and ordering; the bitset matcher evaluates every atom anyway"""
+        if self.evaluation_mode == 'bitset' or settings.CONDITION_SAMPLE_EVERY <= 0:
+            return None
+        return ConditionOptimizer(self.matchers, settings.CONDITION_SAMPLE_EVERY, settings.CONDITION_REORDER_EVERY)
+    
+    @property
+    def rule_count(self) -> int:
+        """Number of enabled rules across all farm types"""
+        return sum(len(rules) for rules in self.farm_rules.values())
     
     def evaluate(self, request: RecommendationRequest) -> RecommendationResponse:
         """
         Main evaluation method - processes request and returns recommendations
         """
-        farm_type = request.farm_type.value
-        
-        # Get rules for this farm type
-        farm_rules = self.rules.get(farm_type, {})
-        
         # Build context dictionary for evaluation
         context = self._build_context(request)
+        return self.evaluate_context(request, context)
+    
+    def evaluate_context(self, request: RecommendationRequest, context: Dict[str, Any]) -> RecommendationResponse:
+        """Evaluate a request whose context was already built with _build_context"""
+        # Find matching rules via the candidate index or the atom bitset,
+        # stopping once top_k are found: no later rule can outrank them
+        farm_type = request.farm_type.value
+        matcher = self.matchers.get(farm_type)
+        if self.optimizer is not None and matcher is not None and self.optimizer.due():
+            self.optimizer.observe(matcher.candidates(context), context)
+        if matcher is None:
+            matched = []
+        elif request.top_k is None and request.min_urgency is None:
+            matched = matcher.match(context)
+        else:
+            matched = matcher.match(context, request.top_k, self._ranked_count(farm_type, request.min_urgency))
         
-        # Evaluate all rules
-        matched_rules: List[RecommendationAction] = []
-        
-        for category, category_data in farm_rules.items():
-            if category_data and 'rules' in category_data:
-                for rule in category_data['rules']:
-                    if self._is_rule_enabled(rule):
-                        match, action = self._evaluate_rule(rule, context, category)
-                        if match and action:
-                            matched_rules.append(action)
+        return self._build_response(request, context, matched)
+    
+    def _ranked_count(self, farm_type: str, min_urgency: Optional[int]) -> Optional[int]:
+        """How many of the ranked rules score at least min_urgency (None: all of them)"""
+        if min_urgency is None:
+            return None
+        return bisect_right(self.ranked_scores.get(farm_type, []), -min_urgency)
+    
+    def match_key(self, context: Dict[str, Any]) -> Tuple:
+        """
+        Key under which contexts get the same response apart from rendered
+        message values: farm type, region and date (the response header)
+        plus the interval-canonical values of every field the rules read.
+        """
+        farm_type = context.get('farm_type')
+        canonicalizer = self.canonicalizers.get(farm_type)
+        fields = canonicalizer.key(context) if canonicalizer else ()
+        return (farm_type, context.get('region'), context.get('date')) + fields
+    
+    def rerender(self, response: RecommendationResponse, context: Dict[str, Any]) -> RecommendationResponse:
+        """
+        Copy of a response for another context with the same match_key:
+        messages with placeholders are rendered from this context's values,
+        generated_at is the time of the copy and every list is the copy's own.
+        """
+        farm_type = context.get('farm_type')
+        updates: Dict[str, Any] = {
+            'generated_at': datetime.now(),
+            'daily_schedule': list(response.daily_schedule),
+        }
+        for group in ('critical_alerts', 'high_priority', 'medium_priority', 'low_priority', 'info'):
+            rendered = []
+            for action in getattr(response, group):
+                if self._has_static_messages(farm_type, action):
+                    rendered.append(action)
+                    continue
+                compiled_rule = self.compiled_by_id[(farm_type, action.rule_id)]
+                rendered.append(action.model_copy(update={
+                    'message_az': compiled_rule.message_az.render(context) if compiled_rule.message_az else action.message_az,
+                    'message_en': compiled_rule.message_en.render(context) if compiled_rule.message_en else action.message_en,
+                }))
+            updates[group] = rendered
+        return response.model_copy(update=updates)
+    
+    def _has_static_messages(self, farm_type: str, action: RecommendationAction) -> bool:
+        compiled_rule = self.compiled_by_id.get((farm_type, action.rule_id))
+        return compiled_rule is None or compiled_rule.is_static
+    
+    def _build_response(
+        self,
+        request: RecommendationRequest,
+        context: Dict[str, Any],
+        matched: List[CompiledRule]
+    ) -> RecommendationResponse:
+        """Turn the matched enabled rules of a request (in rank order) into the response"""
+        farm_type = request.farm_type.value
+        if request.top_k is not None or request.min_urgency is not None:
+            # evaluate_context already stopped early; the columnar engine passes every match
+            if request.min_urgency is not None:
+                matched = [
+                    compiled_rule for compiled_rule in matched
+                    if compiled_rule.urgency_score >= request.min_urgency
+                ]
+            matched = matched[:request.top_k]
+        # Only the rules that are shown get their messages rendered and actions built
+        matched_rules: List[RecommendationAction] = [
+            self._build_action(compiled_rule.rule, context, compiled_rule.category, compiled_rule)
+            for compiled_rule in matched
+        ]
         
         # Sort by urgency score (highest first)
         matched_rules.sort(key=lambda x: x.urgency_score, reverse=True)
@@ -65,74 +218,8 @@ class RuleEngine:
     
     def _build_context(self, request: RecommendationRequest) -> Dict[str, Any]:
         """Build flat context dictionary from request for rule evaluation"""
-        context = {
-            'farm_type': request.farm_type.value,
-            'region': request.region.value,
-            'date': request.request_date.isoformat(),
-        }
-        
-        # Add weather data
-        if request.weather:
-            weather_dict = request.weather.model_dump()
-            for key, value in weather_dict.items():
-                context[f'weather.{key}'] = value
-        
-        # Add soil data
-        if request.soil:
-            soil_dict = request.soil.model_dump()
-            for key, value in soil_dict.items():
-                if value is not None:
-                    context[f'soil.{key}'] = value
-        
-        # Add crop context
-        if request.crop_context:
-            crop_dict = request.crop_context.model_dump()
-            for key, value in crop_dict.items():
-                if value is not None:
-                    context[f'crop_context.{key}'] = value
-        
-        # Add livestock context
-        if request.livestock_context:
-            livestock_dict = request.livestock_context.model_dump()
-            for key, value in livestock_dict.items():
-                if value is not None:
-                    context[f'livestock_context.{key}'] = value
-        
-        # Add greenhouse context
-        if request.greenhouse_context:
-            gh_dict = request.greenhouse_context.model_dump()
-            for key, value in gh_dict.items():
-                if value is not None:
-                    context[f'greenhouse_context.{key}'] = value
-        
-        # Add resource context
-        if request.resource_context:
-            res_dict = request.resource_context.model_dump()
-            for key, value in res_dict.items():
-                if value is not None:
-                    context[f'resource_context.{key}'] = value
-        
-        # Add farm components
-        if request.farm_components:
-            fc_dict = request.farm_components.model_dump()
-            for key, value in fc_dict.items():
-                context[f'farm_components.{key}'] = value
-        
-        # Add time of day
-        hour = datetime.now().hour
-        if 5 <= hour < 12:
-            context['time_of_day'] = 'morning'
-        elif 12 <= hour < 17:
-            context['time_of_day'] = 'midday'
-        elif 17 <= hour < 21:
-            context['time_of_day'] = 'evening'
-        else:
-            context['time_of_day'] = 'night'
-        
-        # Add day of week
-        context['day_of_week'] = request.request_date.strftime('%A').lower()
-        
-        return context
+        layout = self.layouts.get(request.farm_type.value, self.full_layout)
+        return layout.build(request)
     
     def _is_rule_enabled(self, rule: Dict[str, Any]) -> bool:
         """Check if rule is enabled"""
@@ -145,8 +232,11 @@ class RuleEngine:
         category: str
     ) -> Tuple[bool, Optional[RecommendationAction]]:
         """
-        Evaluate a single rule against context.
+        Evaluate a single rule against context by interpreting its JSON.
         Returns (matched: bool, action: Optional[RecommendationAction])
+
+        Reference interpreter: evaluate() runs the compiled predicates from
+        RuleCompiler, which must stay result-identical to this method.
         """
         conditions = rule.get('conditions', {})
         
@@ -180,22 +270,18 @@ class RuleEngine:
         if not items:
             return True
         
-        results = []
-        
+        # Anything other than OR behaves as AND; stop at the first deciding item
+        is_or = operator == 'OR'
         for item in items:
             # Check if this is a nested condition block
             if 'operator' in item and 'items' in item:
                 result = self._evaluate_conditions(item, context)
             else:
                 result = self._evaluate_single_condition(item, context)
-            results.append(result)
+            if result == is_or:
+                return is_or
         
-        if operator == 'AND':
-            return all(results)
-        elif operator == 'OR':
-            return any(results)
-        else:
-            return all(results)
+        return not is_or
     
     def _evaluate_single_condition(self, condition: Dict[str, Any], context: Dict[str, Any]) -> bool:
         """Evaluate a single condition item"""
@@ -260,34 +346,28 @@ class RuleEngine:
         self, 
         rule: Dict[str, Any], 
         context: Dict[str, Any],
-        category: str
+        category: str,
+        compiled_rule: Optional[CompiledRule] = None
     ) -> RecommendationAction:
         """Build recommendation action from matched rule"""
-        action_data = rule.get('action', {})
-        
-        # Get urgency
-        urgency_str = action_data.get('urgency', 'medium')
-        try:
-            urgency = UrgencyLevel(urgency_str)
-        except ValueError:
-            urgency = UrgencyLevel.MEDIUM
+        # Render message templates (parsed at load time when the rule is compiled)
+        if compiled_rule is not None and compiled_rule.message_az is not None:
+            message_az = compiled_rule.message_az.render(context)
+        else:
+            message_az = self._process_template(rule.get('message_az', ''), context)
+        if compiled_rule is not None and compiled_rule.message_en is not None:
+            message_en = compiled_rule.message_en.render(context)
+        else:
+            message_en = self._process_template(rule.get('message_en', ''), context)
         
-        # Process message templates
-        message_az = self._process_template(rule.get('message_az', ''), context)
-        message_en = self._process_template(rule.get('message_en', ''), context)
+        # The action was validated at compile time; only the messages differ per match
+        if compiled_rule is not None and compiled_rule.action is not None:
+            return compiled_rule.action.model_copy(update={'message_az': message_az, 'message_en': message_en})
         
         return RecommendationAction(
-            rule_id=rule.get('rule_id', ''),
-            name_az=rule.get('name_az', ''),
-            name_en=rule.get('name_en', ''),
-            category=category,
-            urgency=urgency,
-            urgency_score=action_data.get('urgency_score', 50),
+            **action_fields(rule, category),
             message_az=message_az,
-            message_en=message_en,
-            action_type=action_data.get('type', 'info'),
-            action_details=action_data,
-            timing_az=action_data.get('timing_az')
+            message_en=message_en
         )
     
     def _process_template(self, template: str, context: Dict[str, Any]) -> str:
@@ -318,7 +398,8 @@ class RuleEngine:
         request: RecommendationRequest
     ) -> RecommendationResponse:
         """Group recommendations by urgency level"""
-        response = RecommendationResponse(
+        # Built from the already validated request, so validation is skipped
+        response = RecommendationResponse.model_construct(
             farm_type=request.farm_type,
             region=request.region,
             response_date=request.request_date
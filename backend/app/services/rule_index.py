@@ -0,0 +1,217 @@
+"""
+Rule Index - Discrimination index over equality/IN and numeric conditions
+Narrows a farm type's rules down to the candidates whose discriminating
+conditions can match a given context, before any predicate is evaluated.
+"""
+
+from typing import Dict, List, Any, FrozenSet, Optional, Tuple
+
+from app.services.rule_compiler import CompiledRule, Predicate, membership_key
+from app.services.threshold_index import ThresholdIndex, ThresholdAtom, THRESHOLD_OPERATORS, numeric_threshold
+
+
+# Context fields checked against a rule's `applicable_to` list
+APPLICABLE_TO_FIELDS = ('crop_context.crop_type', 'livestock_context.animal_type')
+
+
+def required_conditions(conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Leaf condition items that must all hold for the block to match, i.e.
+    those not under an OR with several alternatives.
+    """
+    required: List[Dict[str, Any]] = []
+    _collect_required(conditions, required)
+    return required
+
+
+def _collect_required(conditions: Dict[str, Any], required: List[Dict[str, Any]]):
+    if not conditions:
+        return
+
+    items = conditions.get('items', [])
+    if conditions.get('operator', 'AND') == 'OR' and len(items) > 1:
+        return
+
+    for item in items:
+        if 'operator' in item and 'items' in item:
+            _collect_required(item, required)
+        else:
+            required.append(item)
+
+
+def equality_constraints(conditions: Dict[str, Any]) -> Dict[str, FrozenSet[Any]]:
+    """
+    Collect the values each field must take for the condition block to match,
+    from its required `==` and `IN` items.
+    """
+    constraints: Dict[str, FrozenSet[Any]] = {}
+
+    for item in required_conditions(conditions):
+        op = item.get('operator', '==')
+        value = item.get('value')
+        if op == '==':
+            accepted = [value]
+        elif op == 'IN' and isinstance(value, list):
+            accepted = value
+        else:
+            continue
+
+        try:
+            accepted_set = frozenset(accepted)
+        except TypeError:
+            continue
+
+        field = item.get('field', '')
+        if field in constraints:
+            constraints[field] = constraints[field] & accepted_set
+        else:
+            constraints[field] = accepted_set
+
+    return constraints
+
+
+def threshold_constraints(conditions: Dict[str, Any]) -> Dict[str, List[ThresholdAtom]]:
+    """Collect the required `>`, `>=`, `<`, `<=` comparisons of each field"""
+    constraints: Dict[str, List[ThresholdAtom]] = {}
+
+    for item in required_conditions(conditions):
+        op = item.get('operator', '==')
+        if op not in THRESHOLD_OPERATORS:
+            continue
+        threshold = numeric_threshold(item.get('value'))
+        if threshold is None:
+            continue
+        constraints.setdefault(item.get('field', ''), []).append((op, threshold))
+
+    return constraints
+
+
+class RuleIndex:
+    """
+    Discrimination index for the rules of one farm type.
+    Rules are numbered by position and candidate sets are int bitmasks, so a
+    lookup is one dict probe (equality fields) or one bisect (numeric fields)
+    and one AND per indexed field. Candidates are tested with `predicates`,
+    the match predicate of each rule by position: an immutable tuple the
+    condition optimizer replaces as a whole, never edits.
+    """
+
+    def __init__(self, compiled_rules: List[CompiledRule]):
+        self.rules = compiled_rules
+        self.predicates: Tuple[Predicate, ...] = tuple(compiled.matches for compiled in compiled_rules)
+        self._all_mask = (1 << len(compiled_rules)) - 1
+
+        # field -> (mask of rules not constrained on field, value -> mask of rules accepting value)
+        self._field_masks: Dict[str, Tuple[int, Dict[Any, int]]] = {}
+        # Rules without a (list) applicable_to filter, and value -> mask for those with one
+        self._unrestricted_mask = 0
+        self._applicable_masks: Dict[Any, int] = {}
+
+        constraints_by_rule = [
+            equality_constraints(compiled.rule.get('conditions', {}))
+            for compiled in compiled_rules
+        ]
+        fields = sorted({field for constraints in constraints_by_rule for field in constraints})
+
+        for field in fields:
+            unconstrained = 0
+            by_value: Dict[Any, int] = {}
+            for position, constraints in enumerate(constraints_by_rule):
+                bit = 1 << position
+                accepted = constraints.get(field)
+                if accepted is None:
+                    unconstrained |= bit
+                    continue
+                for value in accepted:
+                    by_value[value] = by_value.get(value, 0) | bit
+            self._field_masks[field] = (unconstrained, by_value)
+
+        self.thresholds = ThresholdIndex([
+            threshold_constraints(compiled.rule.get('conditions', {}))
+            for compiled in compiled_rules
+        ])
+
+        for position, compiled in enumerate(compiled_rules):
+            bit = 1 << position
+            applicable_to = compiled.rule.get('applicable_to')
+            if not applicable_to or not isinstance(applicable_to, list):
+                self._unrestricted_mask |= bit
+                continue
+            try:
+                for value in applicable_to:
+                    self._applicable_masks[value] = self._applicable_masks.get(value, 0) | bit
+            except TypeError:
+                self._unrestricted_mask |= bit
+
+    @property
+    def indexed_fields(self) -> List[str]:
+        """Fields the index discriminates on"""
+        return list(self._field_masks) + self.thresholds.indexed_fields
+
+    def candidate_mask(self, context: Dict[str, Any], mask: Optional[int] = None) -> int:
+        """Bitmask of rules that can still match the context, within mask if given"""
+        if mask is None:
+            mask = self._all_mask
+
+        for field, (unconstrained, by_value) in self._field_masks.items():
+            value = context.get(field)
+            if value is None:
+                # == and IN never match a missing field
+                mask &= unconstrained
+            else:
+                try:
+                    mask &= unconstrained | by_value.get(membership_key(value), 0)
+                except TypeError:
+                    # Unhashable context value (list) - cannot prune on it
+                    continue
+            if not mask:
+                return 0
+
+        for field in APPLICABLE_TO_FIELDS:
+            value = context.get(field)
+            if value:
+                try:
+                    mask &= self._unrestricted_mask | self._applicable_masks.get(membership_key(value), 0)
+                except TypeError:
+                    continue
+
+        if mask:
+            mask = self.thresholds.candidate_mask(context, mask)
+
+        return mask
+
+    def candidates(self, context: Dict[str, Any]) -> List[CompiledRule]:
+        """Candidate rules for the context, in rule order"""
+        mask = self.candidate_mask(context)
+        rules = self.rules
+        result = []
+        while mask:
+            lowest = mask & -mask
+            result.append(rules[lowest.bit_length() - 1])
+            mask ^= lowest
+        return result
+
+    def match(
+        self,
+        context: Dict[str, Any],
+        limit: Optional[int] = None,
+        first: Optional[int] = None
+    ) -> List[CompiledRule]:
+        """
+        Matching rules for the context, in rule order. Only the first `first`
+        rules are tried, and matching stops once `limit` rules have matched.
+        """
+        mask = self.candidate_mask(context, self._all_mask if first is None else (1 << first) - 1)
+        rules = self.rules
+        # One tuple for the whole call, even if the optimizer swaps in another
+        predicates = self.predicates
+        result = []
+        while mask:
+            lowest = mask & -mask
+            position = lowest.bit_length() - 1
+            if predicates[position](context):
+                result.append(rules[position])
+                if len(result) == limit:
+                    break
+            mask ^= lowest
+        return result
@@ -2,12 +2,41 @@
 Rule Loader Service - Loads all JSON rules, constants, and profiles
 """
 
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
 from app.core.config import settings
+from app.services.rule_compiler import RuleCompiler, CompiledRule
+from app.services.rule_search import RuleSearchIndex
+from app.services.ruleset_snapshot import read_snapshot, write_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Constant files, by name
+CONSTANT_FILES = ("stages", "regions", "thresholds")
+
+# Farm profiles: (farm type, file name)
+PROFILE_FILES = [
+    ("wheat", "wheat_profile.json"),
+    ("livestock", "livestock_profile.json"),
+    ("orchard", "orchard_profile.json"),
+    ("vegetable", "vegetable_profile.json"),
+    ("mixed", "mixed_profile.json")
+]
+
+# Farm types and their rule categories
+FARM_RULE_CATEGORIES = {
+    "wheat": ["irrigation", "fertilization", "pest_disease", "harvest"],
+    "livestock": ["disease_risk", "feeding", "veterinary"],
+    "orchard": ["irrigation", "fertilization", "pruning", "pest_disease"],
+    "vegetable": ["irrigation", "fertilization", "greenhouse", "pest_disease"],
+    "mixed": ["integration", "resource_allocation", "daily_coordination"]
+}
 
 
 class RuleLoader:
@@ -22,14 +51,25 @@ class RuleLoader:
         self._constants: Dict[str, Any] = {}
         self._profiles: Dict[str, Any] = {}
         self._rules: Dict[str, Dict[str, Any]] = {}
+        self._compiled_rules: Dict[str, Dict[str, List[CompiledRule]]] = {}
+        self._search_index: Optional[RuleSearchIndex] = None
+        # Bytes of every JSON data file, read once so the content hash and
+        # the parsed data always describe the same version of the files
+        self._sources: Dict[Path, bytes] = {}
+        self._content_hash: Optional[str] = None
+        # Files that failed to parse, as "path: error"
+        self.load_errors: List[str] = []
     
     def _load_json_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Load a single JSON file"""
         try:
+            if file_path in self._sources:
+                return json.loads(self._sources[file_path])
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
+            self.load_errors.append(f"{file_path}: {e}")
             return None
     
     def load_constants(self) -> Dict[str, Any]:
@@ -39,20 +79,10 @@ class RuleLoader:
         
         constants = {}
         
-        # Load stages
-        stages_path = self.constants_path / "stages.json"
-        if stages_path.exists():
-            constants['stages'] = self._load_json_file(stages_path)
-        
-        # Load regions
-        regions_path = self.constants_path / "regions.json"
-        if regions_path.exists():
-            constants['regions'] = self._load_json_file(regions_path)
-        
-        # Load thresholds
-        thresholds_path = self.constants_path / "thresholds.json"
-        if thresholds_path.exists():
-            constants['thresholds'] = self._load_json_file(thresholds_path)
+        for name in CONSTANT_FILES:
+            file_path = self.constants_path / f"{name}.json"
+            if file_path.exists():
+                constants[name] = self._load_json_file(file_path)
         
         self._constants = constants
         return constants
@@ -64,15 +94,7 @@ class RuleLoader:
         
         profiles = {}
         
-        profile_files = [
-            ("wheat", "wheat_profile.json"),
-            ("livestock", "livestock_profile.json"),
-            ("orchard", "orchard_profile.json"),
-            ("vegetable", "vegetable_profile.json"),
-            ("mixed", "mixed_profile.json")
-        ]
-        
-        for farm_type, filename in profile_files:
+        for farm_type, filename in PROFILE_FILES:
             file_path = self.profiles_path / filename
             if file_path.exists():
                 profiles[farm_type] = self._load_json_file(file_path)
@@ -87,16 +109,7 @@ class RuleLoader:
         
         rules = {}
         
-        # Define farm types and their rule categories
-        farm_rule_categories = {
-            "wheat": ["irrigation", "fertilization", "pest_disease", "harvest"],
-            "livestock": ["disease_risk", "feeding", "veterinary"],
-            "orchard": ["irrigation", "fertilization", "pruning", "pest_disease"],
-            "vegetable": ["irrigation", "fertilization", "greenhouse", "pest_disease"],
-            "mixed": ["integration", "resource_allocation", "daily_coordination"]
-        }
-        
-        for farm_type, categories in farm_rule_categories.items():
+        for farm_type, categories in FARM_RULE_CATEGORIES.items():
             rules[farm_type] = {}
             farm_rules_path = self.rules_path / farm_type
             
@@ -108,6 +121,107 @@ class RuleLoader:
         self._rules = rules
         return rules
     
+    def load_compiled_rules(self) -> Dict[str, Dict[str, List[CompiledRule]]]:
+        """Compile all loaded rules into predicate closures for the RuleEngine"""
+        if self._compiled_rules:
+            return self._compiled_rules
+        
+        compiler = RuleCompiler()
+        self._compiled_rules = compiler.compile_all(self.load_all_rules())
+        # Rendered as written, like the interpreter does; not worth a warning per worker start
+        for placeholder in compiler.unknown_placeholders:
+            logger.debug(f"Unknown message placeholder {placeholder}")
+        return self._compiled_rules
+    
+    def validate_rules(self) -> List[str]:
+        """Check the loaded rules can be served; returns a list of problems (empty if valid)"""
+        rules = self.load_all_rules()
+        errors = list(self.load_errors)
+        seen_ids = set()
+        
+        for farm_type, categories in rules.items():
+            for category, data in categories.items():
+                if data is None:
+                    continue  # already reported in load_errors
+                if not isinstance(data.get('rules'), list):
+                    errors.append(f"{farm_type}/{category}: 'rules' must be a list")
+                    continue
+                for position, rule in enumerate(data['rules']):
+                    rule_id = rule.get('rule_id') if isinstance(rule, dict) else None
+                    if not rule_id:
+                        errors.append(f"{farm_type}/{category}: rule #{position} has no rule_id")
+                        continue
+                    if rule_id in seen_ids:
+                        errors.append(f"{farm_type}/{category}: duplicate rule_id {rule_id}")
+                    seen_ids.add(rule_id)
+                    if not isinstance(rule.get('conditions', {}), dict):
+                        errors.append(f"{rule_id}: 'conditions' must be an object")
+        
+        return errors
+    
+    def data_files(self) -> List[Path]:
+        """
+        The constant, profile and rule files the loader reads. Other JSON
+        under DATA_PATH (e.g. weather/region_points.json) is not part of the
+        ruleset, so editing it neither changes the version nor reloads rules.
+        """
+        files = [self.constants_path / f"{name}.json" for name in CONSTANT_FILES]
+        files += [self.profiles_path / filename for _, filename in PROFILE_FILES]
+        files += [
+            self.rules_path / farm_type / f"{category}.json"
+            for farm_type, categories in FARM_RULE_CATEGORIES.items()
+            for category in categories
+        ]
+        return files
+    
+    def _data_name(self, file_path: Path) -> str:
+        """Path of a data file as hashed: relative to DATA_PATH when it is inside"""
+        try:
+            return file_path.relative_to(self.data_path).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+    
+    def content_hash(self) -> str:
+        """SHA-256 over the paths and bytes of the ruleset's data files - the ruleset version"""
+        if self._content_hash is not None:
+            return self._content_hash
+        
+        digest = hashlib.sha256()
+        for file_path in sorted(self.data_files(), key=self._data_name):
+            if not file_path.exists():
+                continue
+            self._sources[file_path] = file_path.read_bytes()
+            digest.update(self._data_name(file_path).encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(self._sources[file_path])
+        self._content_hash = digest.hexdigest()
+        return self._content_hash
+    
+    def load_with_snapshot(self, previous_index: Optional[RuleSearchIndex] = None) -> str:
+        """
+        Load rules, constants, profiles and the search index from the snapshot
+        matching the content hash; on a miss parse the JSON files and, if they
+        are valid, index them (reusing previous_index) and write a snapshot.
+        Returns "snapshot" or "json".
+        """
+        content_hash = self.content_hash()
+        snapshot = read_snapshot(content_hash)
+        if snapshot is not None:
+            self._rules = snapshot['rules']
+            self._constants = snapshot['constants']
+            self._profiles = snapshot['profiles']
+            self._search_index = snapshot['search_index']
+            self._sources = {}
+            return "snapshot"
+        
+        rules = self.load_all_rules()
+        constants = self.load_constants()
+        profiles = self.load_profiles()
+        self._sources = {}
+        if not self.validate_rules():
+            write_snapshot(content_hash, rules, constants, profiles, self.build_search_index(previous_index))
+        return "json"
+    
     def get_rules_for_farm_type(self, farm_type: str) -> Dict[str, Any]:
         """Get all rules for a specific farm type"""
         if not self._rules:
@@ -176,32 +290,12 @@ class RuleLoader:
         counts['_total'] = total
         return counts
     
-    def search_rules(self, keyword: str) -> List[Dict[str, Any]]:
-        """Search rules by keyword in name or message"""
-        if not self._rules:
-            self.load_all_rules()
-        
-        keyword_lower = keyword.lower()
-        results = []
-        
-        for farm_type, categories in self._rules.items():
-            for category, data in categories.items():
-                if data and 'rules' in data:
-                    for rule in data['rules']:
-                        # Search in various fields
-                        searchable = [
-                            rule.get('name_az', ''),
-                            rule.get('name_en', ''),
-                            rule.get('message_az', ''),
-                            rule.get('message_en', ''),
-                            rule.get('rule_id', '')
-                        ]
-                        
-                        if any(keyword_lower in s.lower() for s in searchable):
-                            results.append({
-                                'farm_type': farm_type,
-                                'category': category,
-                                **rule
-                            })
-        
-        return results
+    def build_search_index(self, previous: Optional[RuleSearchIndex] = None) -> RuleSearchIndex:
+        """Index the loaded rules for search, reusing what an older index analyzed"""
+        if self._search_index is None:
+            self._search_index = RuleSearchIndex(self.load_all_rules(), previous)
+        return self._search_index
+    
+    def search_rules(self, keyword: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """Search rules by keyword in id, name, message or reasoning: (total, page)"""
+        return self.build_search_index().search(keyword, offset, limit)
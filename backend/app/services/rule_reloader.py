@@ -0,0 +1,201 @@
+"""
+Rule Reloader - Hot reload of the JSON data files with an atomic engine swap
+A new RuleLoader and RuleEngine are built off the event loop; only when the
+new ruleset loads, validates and compiles cleanly are the app.state
+references replaced. Requests already running keep the engine they started
+with, and a failed reload leaves the previous ruleset in service.
+
+A reload only swaps the ruleset of the process that runs it. Under the
+preloading server (app.serve) the admin endpoint also sends SIGHUP to the
+gunicorn master, which rebuilds its ruleset and replaces every worker; with
+`uvicorn --workers` only the file watcher reaches every worker.
+"""
+
+import asyncio
+import os
+import signal
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+
+
+# (path, mtime_ns, size) of every ruleset data file - a cheap change detector
+FileSignature = Tuple[Tuple[str, int, int], ...]
+
+
+class RuleReloadError(Exception):
+    """The new ruleset could not be loaded, validated or compiled"""
+
+
+def file_signature(files: List[Path]) -> FileSignature:
+    """Stat the ruleset data files; changes when any of them is edited, added or removed"""
+    signature = []
+    for file_path in files:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        signature.append((file_path.as_posix(), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def build_ruleset(previous: Optional[RuleLoader] = None) -> Tuple[RuleLoader, RuleEngine]:
+    """Load, validate and compile the data files into a fresh loader and engine"""
+    loader = RuleLoader()
+    previous_index = previous.build_search_index() if previous is not None else None
+    loader.load_with_snapshot(previous_index)
+
+    errors = loader.validate_rules()
+    if errors:
+        raise RuleReloadError('; '.join(errors))
+
+    try:
+        engine = RuleEngine(
+            loader.load_all_rules(),
+            loader.load_constants(),
+            loader.load_compiled_rules(),
+            version=loader.content_hash()[:12]
+        )
+    except Exception as e:
+        raise RuleReloadError(f"Failed to compile rules: {type(e).__name__}: {e}") from e
+    # Unchanged rules keep their analyzed search words from the running index;
+    # the typo lookup is built here, off the event loop, instead of on first use
+    loader.build_search_index(previous_index).typo_lookup()
+    return loader, engine
+
+
+def install_ruleset(state: Any, loader: RuleLoader, engine: RuleEngine, signature: FileSignature):
+    """Point app.state at a ruleset; each assignment is a single reference swap"""
+    state.rule_loader = loader
+    state.rules = loader.load_all_rules()
+    state.constants = loader.load_constants()
+    state.profiles = loader.load_profiles()
+    state.engine = engine
+    # Files as they were before loading: a later edit always looks like a change
+    state.ruleset_signature = signature
+
+
+def rebuild_preloaded(app: Any) -> Optional[str]:
+    """
+    Reload the ruleset of the preloading server's master (app.serve, on
+    SIGHUP), so the workers it forks next start with it. Returns the new
+    version, or None if the ruleset failed and the master keeps its own.
+    """
+    signature = file_signature(app.state.rule_loader.data_files())
+    try:
+        loader, engine = build_ruleset(app.state.rule_loader)
+    except RuleReloadError as e:
+        print(f"❌ Master rule reload failed, keeping version {app.state.engine.version}: {e}")
+        return None
+    install_ruleset(app.state, loader, engine, signature)
+    return engine.version
+
+
+class RuleReloader:
+    """Reloads the ruleset on demand or from a polling watcher task"""
+
+    def __init__(self, app: Any):
+        self.app = app
+        # Files the loader reads; their paths only depend on the settings
+        self.data_files = RuleLoader().data_files()
+        self._lock = asyncio.Lock()
+        # A worker forked from a preloaded master starts with the files as
+        # the master loaded them, which may predate later edits
+        self._signature: FileSignature = getattr(app.state, 'ruleset_signature', None) or file_signature(self.data_files)
+        self._watcher: Optional[asyncio.Task] = None
+
+        self.reload_count = 0
+        self.failed_count = 0
+        self.last_reload_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    async def reload(self, force: bool = False, broadcast: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild the ruleset if the data files changed (or when forced) and
+        swap it in. Returns the outcome: reloaded, unchanged or failed.
+        With broadcast, a reloaded (or forced) ruleset is also sent to every
+        worker of the preloading server; "workers" tells whether it was.
+        """
+        result = await self._reload(force)
+        if broadcast and result["status"] != "failed":
+            result["workers"] = "this worker only"
+            if (result["status"] == "reloaded" or force) and self._signal_master():
+                result["workers"] = "restarting"
+        return result
+
+    def _signal_master(self) -> bool:
+        """SIGHUP the app.serve master, which reloads and replaces all workers"""
+        master_pid = getattr(self.app.state, 'master_pid', None)
+        if master_pid is None:
+            return False
+        try:
+            os.kill(master_pid, signal.SIGHUP)
+        except OSError as e:
+            print(f"⚠️ Could not signal the server master {master_pid}: {e}")
+            return False
+        return True
+
+    async def _reload(self, force: bool) -> Dict[str, Any]:
+        async with self._lock:
+            previous = self.app.state.engine
+            signature = await asyncio.to_thread(file_signature, self.data_files)
+            if not force and signature == self._signature:
+                return {"status": "unchanged", "version": previous.version}
+
+            try:
+                loader, engine = await asyncio.to_thread(build_ruleset, self.app.state.rule_loader)
+            except RuleReloadError as e:
+                # Keep serving the previous ruleset; retry only after the files change again
+                self._signature = signature
+                self.failed_count += 1
+                self.last_error = str(e)
+                print(f"❌ Rule reload failed, keeping version {previous.version}: {e}")
+                return {"status": "failed", "version": previous.version, "error": str(e)}
+
+            self._signature = signature
+            if engine.version == previous.version and not force:
+                self.last_error = None
+                return {"status": "unchanged", "version": previous.version}
+
+            install_ruleset(self.app.state, loader, engine, signature)
+            self.reload_count += 1
+            self.last_reload_at = datetime.now()
+            self.last_error = None
+            print(f"🔄 Reloaded rules: {previous.version} -> {engine.version} ({engine.rule_count} enabled rules)")
+            return {"status": "reloaded", "version": engine.version, "previous_version": previous.version}
+
+    def start(self, interval: float):
+        """Start polling the data files every `interval` seconds"""
+        if interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"❌ Rule watcher error: {e}")
+
+    async def stop(self):
+        """Stop the watcher task, if running"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "version": self.app.state.engine.version,
+            "reload_count": self.reload_count,
+            "failed_count": self.failed_count,
+            "last_reload_at": self.last_reload_at.isoformat() if self.last_reload_at else None,
+            "last_error": self.last_error,
+            "watching": self._watcher is not None
+        }
@@ -0,0 +1,239 @@
+"""
+Rule Search - Inverted index over rule names, messages, reasoning and ids
+Text is folded for Azerbaijani: İ, I, ı and i are one letter (Python's
+lower() turns İ into i + a combining dot and keeps I as i, never ı), and
+ə, ö, ü, ş, ç, ğ match their plain Latin letters, so "İstilik",
+"TƏCILI" and "tecili" all find what they should. Every query word must
+match a word of the rule exactly, as a prefix or within one or two typos;
+results are ranked by match quality and field, then by load order.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+
+# Indexed fields and the weight of a word found in them
+FIELD_WEIGHTS = {
+    'rule_id': 4.0,
+    'name_az': 3.0,
+    'name_en': 3.0,
+    'message_az': 2.0,
+    'message_en': 2.0,
+    'reasoning_az': 1.0,
+}
+
+# How well a query word matched an indexed word
+EXACT, PREFIX, ONE_TYPO, TWO_TYPOS = 1.0, 0.6, 0.4, 0.25
+
+# Shortest query words tolerating one and two typos
+ONE_TYPO_LENGTH = 4
+TWO_TYPOS_LENGTH = 8
+
+DOTTED_I = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+PLAIN_LETTERS = str.maketrans({'ə': 'e'})
+WORD_PATTERN = re.compile(r'\w+')
+
+# (farm_type, category, rule_id)
+DocKey = Tuple[str, str, str]
+
+
+def fold(text: str) -> str:
+    """Case- and diacritic-insensitive form of Azerbaijani / English text"""
+    text = text.translate(DOTTED_I).lower()
+    # ö ü ş ç ğ decompose into a base letter and a combining mark; ə does not
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).translate(PLAIN_LETTERS)
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded words; snake_case words (rule ids) also yield their parts and tails"""
+    tokens = []
+    for word in WORD_PATTERN.findall(fold(text)):
+        tokens.append(word)
+        parts = [part for part in word.split('_') if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+            # "irr_001" finds WHT_IRR_001
+            tokens.extend('_'.join(parts[i:]) for i in range(1, len(parts) - 1))
+    return tokens
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """Every string made by deleting up to `distance` characters from word"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(word: str) -> int:
+    if len(word) >= TWO_TYPOS_LENGTH:
+        return 2
+    if len(word) >= ONE_TYPO_LENGTH:
+        return 1
+    return 0
+
+
+class RuleSearchIndex:
+    """
+    Search index of one ruleset. Built from the previous index on reload:
+    rules whose indexed text did not change keep their analyzed words, and
+    words already in the vocabulary keep their typo variants.
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, Any]], previous: Optional['RuleSearchIndex'] = None):
+        previous_docs = previous.analyzed if previous is not None else {}
+        previous_deletes = previous.word_deletes if previous is not None else {}
+
+        self.docs: List[Tuple[DocKey, Dict[str, Any]]] = []
+        # doc key -> (indexed field texts, word -> weight of its best field)
+        self.analyzed: Dict[DocKey, Tuple[Tuple[str, ...], Dict[str, float]]] = {}
+        self.reused = 0
+
+        for farm_type, categories in rules.items():
+            for category, data in categories.items():
+                if not data or 'rules' not in data:
+                    continue
+                for rule in data['rules']:
+                    key = (farm_type, category, rule.get('rule_id', ''))
+                    texts = tuple(str(rule.get(field) or '') for field in FIELD_WEIGHTS)
+                    cached = previous_docs.get(key)
+                    if cached is not None and cached[0] == texts:
+                        self.analyzed[key] = cached
+                        self.reused += 1
+                    else:
+                        self.analyzed[key] = (texts, self._analyze(texts))
+                    self.docs.append((key, rule))
+
+        # word -> [(doc position, weight)], doc positions ascending
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for position, (key, _) in enumerate(self.docs):
+            for word, weight in self.analyzed[key][1].items():
+                self.postings[word].append((position, weight))
+        self.postings = dict(self.postings)
+        self.vocabulary: List[str] = sorted(self.postings)
+
+        # Typo lookup, built on the first query that needs it
+        self._previous_deletes = previous_deletes
+        self.word_deletes: Dict[str, Set[str]] = {}
+        self._delete_index: Optional[Dict[str, List[str]]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled into ruleset snapshots without the typo lookup: it is larger
+        # to load than to rebuild on the first query that needs it
+        state = dict(self.__dict__)
+        state.update(_previous_deletes={}, word_deletes={}, _delete_index=None)
+        return state
+
+    def typo_lookup(self) -> Dict[str, List[str]]:
+        """Deleted-character variants of every indexed word -> the words"""
+        if self._delete_index is None:
+            delete_index: Dict[str, List[str]] = defaultdict(list)
+            for word in self.vocabulary:
+                variants = self._previous_deletes.get(word)
+                if variants is None:
+                    # A two-typo query word has 8+ letters, so its matches have 6+
+                    variants = deletes(word, 2 if len(word) >= TWO_TYPOS_LENGTH - 2 else 1)
+                self.word_deletes[word] = variants
+                for variant in variants:
+                    delete_index[variant].append(word)
+            self._previous_deletes = {}
+            self._delete_index = dict(delete_index)
+        return self._delete_index
+
+    @staticmethod
+    def _analyze(texts: Tuple[str, ...]) -> Dict[str, float]:
+        words: Dict[str, float] = {}
+        for text, weight in zip(texts, FIELD_WEIGHTS.values()):
+            for word in tokenize(text):
+                if weight > words.get(word, 0.0):
+                    words[word] = weight
+        return words
+
+    def _candidates(self, query_word: str) -> Dict[str, float]:
+        """Indexed words matching one query word, with their match quality"""
+        candidates: Dict[str, float] = {}
+        if query_word in self.postings:
+            candidates[query_word] = EXACT
+
+        position = bisect_left(self.vocabulary, query_word)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(query_word):
+            candidates.setdefault(self.vocabulary[position], PREFIX)
+            position += 1
+
+        limit = max_typos(query_word)
+        if limit:
+            typo_lookup = self.typo_lookup()
+            for variant in deletes(query_word, limit):
+                for word in typo_lookup.get(variant, ()):
+                    if word in candidates:
+                        continue
+                    distance = edit_distance(query_word, word, limit)
+                    if distance <= limit:
+                        candidates[word] = ONE_TYPO if distance == 1 else TWO_TYPOS
+        return candidates
+
+    def search(self, query: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Ranked matches for the query: (total count, results[offset:offset + limit]).
+        A blank query lists every rule in load order.
+        """
+        if not query.strip():
+            ranked = list(range(len(self.docs)))
+        else:
+            scores: Optional[Dict[int, float]] = None
+            for query_word in dict.fromkeys(tokenize(query)):
+                word_scores: Dict[int, float] = {}
+                for word, quality in self._candidates(query_word).items():
+                    for position, weight in self.postings[word]:
+                        score = quality * weight
+                        if score > word_scores.get(position, 0.0):
+                            word_scores[position] = score
+                # Every query word has to match
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {p: s + word_scores[p] for p, s in scores.items() if p in word_scores}
+                if not scores:
+                    break
+            scores = scores or {}
+            ranked = sorted(scores, key=lambda position: (-scores[position], position))
+
+        page = ranked[offset:] if limit is None else ranked[offset:offset + limit]
+        results = []
+        for position in page:
+            (farm_type, category, _), rule = self.docs[position]
+            results.append({'farm_type': farm_type, 'category': category, **rule})
+        return len(ranked), results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.docs),
+            "words": len(self.vocabulary),
+            "typo_variants": len(self._delete_index) if self._delete_index is not None else 0,
+            "reused_rules": self.reused,
+        }
@@ -0,0 +1,103 @@
+"""
+Ruleset Snapshot - Binary snapshot of the parsed rules, constants and profiles
+Snapshots are pickles keyed by the content hash of the ruleset files, so a
+cold start with unchanged files skips JSON parsing and building the rule
+search index; any edit changes the hash and the files are parsed (and
+snapshotted) again. Compiled predicates are closures and cannot be pickled,
+so rules are still compiled at startup, and the hash still reads every file.
+
+Loading a pickle runs code chosen by whoever wrote it, so the snapshot
+directory must not be writable by untrusted users; snapshots that are, or
+sit in a directory that is, world-writable (like /tmp) are ignored.
+
+Build one ahead of time (e.g. in a Docker image) with:
+    python -m app.services.ruleset_snapshot
+"""
+
+import os
+import pickle
+import stat
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.services.rule_search import RuleSearchIndex
+
+
+# Bump when the snapshot payload layout changes
+SNAPSHOT_FORMAT = 2
+
+
+def snapshot_path(content_hash: str) -> Optional[Path]:
+    """Snapshot file for a content hash, or None if snapshots are disabled"""
+    if not settings.RULES_SNAPSHOT_DIR:
+        return None
+    return Path(settings.RULES_SNAPSHOT_DIR) / f"ruleset-{content_hash[:16]}.pickle"
+
+
+def _world_writable(path: Path) -> bool:
+    """True if any user could have written the file: it or its directory is world-writable"""
+    return bool((path.stat().st_mode | path.parent.stat().st_mode) & stat.S_IWOTH)
+
+
+def read_snapshot(content_hash: str) -> Optional[Dict[str, Any]]:
+    """Load the snapshot matching the content hash, if there is a valid one"""
+    path = snapshot_path(content_hash)
+    if path is None or not path.exists():
+        return None
+    try:
+        if _world_writable(path):
+            print(f"⚠️ Ignoring world-writable ruleset snapshot {path}")
+            return None
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable ruleset snapshot {path}: {e}")
+        return None
+    if data.get('format') != SNAPSHOT_FORMAT or data.get('content_hash') != content_hash:
+        return None
+    return data
+
+
+def write_snapshot(
+    content_hash: str,
+    rules: Dict[str, Any],
+    constants: Dict[str, Any],
+    profiles: Dict[str, Any],
+    search_index: Optional[RuleSearchIndex] = None
+):
+    """Write the snapshot atomically and drop snapshots of older content"""
+    path = snapshot_path(content_hash)
+    if path is None:
+        return
+    # One pickle, so the search index refers to the same rule dicts as `rules`
+    data = {
+        'format': SNAPSHOT_FORMAT,
+        'content_hash': content_hash,
+        'rules': rules,
+        'constants': constants,
+        'profiles': profiles,
+        'search_index': search_index,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.ruleset-', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        for stale in path.parent.glob('ruleset-*.pickle'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        # Read-only deployments simply run without a snapshot
+        print(f"⚠️ Could not write ruleset snapshot {path}: {e}")
+
+
+if __name__ == '__main__':
+    from app.services.rule_loader import RuleLoader
+
+    loader = RuleLoader()
+    source = loader.load_with_snapshot()
+    print(f"✅ Ruleset snapshot for {loader.content_hash()[:12]} ({source}): {snapshot_path(loader.content_hash())}")
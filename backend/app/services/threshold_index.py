@@ -0,0 +1,197 @@
+"""
+Threshold Index - Sorted per-field thresholds for numeric comparison conditions
+Finds every satisfied `>`, `>=`, `<`, `<=` atom on a field with one bisect
+instead of one comparison per rule.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Tuple
+
+
+THRESHOLD_OPERATORS = ('>', '>=', '<', '<=')
+
+# (operator, threshold) pair, e.g. ('>', 32.0)
+ThresholdAtom = Tuple[str, float]
+
+
+def numeric_threshold(value: Any) -> Optional[float]:
+    """
+    Threshold of a comparison atom, or None if it cannot be indexed.
+    NaN and infinite thresholds (e.g. "nan") would break the sorted order,
+    so they stay with the atom's own predicate like non-numeric values.
+    """
+    try:
+        threshold = float(value)
+    except (ValueError, TypeError):
+        return None
+    return threshold if math.isfinite(threshold) else None
+
+
+class FieldThresholds:
+    """
+    All numeric atoms on a single context field.
+    The distinct thresholds are kept sorted; a value falls into one of
+    2n + 1 states (strictly between two thresholds, or equal to one) and the
+    set of satisfied atoms is precomputed per state as an int bitmask.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._bits: Dict[ThresholdAtom, int] = {}
+        self._thresholds: List[float] = []
+        self._state_masks: List[int] = []
+
+    def add(self, op: str, threshold: float) -> int:
+        """Register an atom and return its bit"""
+        key = (op, threshold)
+        if key not in self._bits:
+            self._bits[key] = 1 << len(self._bits)
+        return self._bits[key]
+
+    @property
+    def atoms(self) -> Dict[ThresholdAtom, int]:
+        return self._bits
+
+    @property
+    def state_count(self) -> int:
+        return len(self._state_masks)
+
+    def freeze(self):
+        """Precompute the satisfied-atom mask of every state"""
+        thresholds = sorted({threshold for _, threshold in self._bits})
+        size = len(thresholds)
+        position = {threshold: i for i, threshold in enumerate(thresholds)}
+
+        gt = [0] * size
+        ge = [0] * size
+        lt = [0] * size
+        le = [0] * size
+        for (op, threshold), bit in self._bits.items():
+            {'>': gt, '>=': ge, '<': lt, '<=': le}[op][position[threshold]] |= bit
+
+        # With i thresholds strictly below x: `>`/`>=` hold for thresholds[:i]
+        # and `<`/`<=` hold for thresholds[i:]. If x equals thresholds[i],
+        # `>=` also holds there and `<` does not.
+        suffix = [0] * (size + 1)
+        for i in range(size - 1, -1, -1):
+            suffix[i] = suffix[i + 1] | le[i] | lt[i]
+
+        state_masks = []
+        prefix = 0
+        for i in range(size + 1):
+            below = prefix | suffix[i]
+            state_masks.append(below)
+            if i < size:
+                state_masks.append(below ^ (ge[i] | lt[i]))
+                prefix |= gt[i] | ge[i]
+
+        self._thresholds = thresholds
+        self._state_masks = state_masks
+
+    def state(self, value: Any) -> Optional[int]:
+        """
+        State of a context value, or None if no comparison can hold
+        (missing, not convertible with float() like the interpreter, or NaN).
+        """
+        if value is None:
+            return None
+        try:
+            x = float(value)
+        except (ValueError, TypeError):
+            return None
+        if x != x:
+            return None
+
+        i = bisect_left(self._thresholds, x)
+        if i < len(self._thresholds) and self._thresholds[i] == x:
+            return 2 * i + 1
+        return 2 * i
+
+    def satisfied_in_state(self, state: Optional[int]) -> int:
+        """Bitmask of atoms satisfied in a state"""
+        if state is None:
+            return 0
+        return self._state_masks[state]
+
+    def satisfied(self, value: Any) -> int:
+        """Bitmask of atoms satisfied by a context value"""
+        return self.satisfied_in_state(self.state(value))
+
+
+class ThresholdIndex:
+    """
+    Rule-level threshold index for one farm type.
+    For every numeric field it stores, per state, the bitmask of rules whose
+    required comparisons on that field hold - so pruning rules on a field
+    costs a single bisect regardless of how many rules test it.
+    """
+
+    def __init__(self, required_atoms_by_rule: List[Dict[str, List[ThresholdAtom]]]):
+        self.fields: Dict[str, FieldThresholds] = {}
+
+        for required in required_atoms_by_rule:
+            for field, atoms in required.items():
+                if field not in self.fields:
+                    self.fields[field] = FieldThresholds(field)
+                for op, threshold in atoms:
+                    self.fields[field].add(op, threshold)
+
+        # field -> (mask of rules not constrained on field, sorted thresholds, rule mask per state)
+        self._rule_masks: Dict[str, Tuple[int, List[float], List[int]]] = {}
+
+        for field, field_thresholds in self.fields.items():
+            field_thresholds.freeze()
+            unconstrained = 0
+            required_bits: List[Tuple[int, int]] = []
+            for position, required in enumerate(required_atoms_by_rule):
+                atoms = required.get(field)
+                if not atoms:
+                    unconstrained |= 1 << position
+                    continue
+                needed = 0
+                for atom in atoms:
+                    needed |= field_thresholds.atoms[atom]
+                required_bits.append((1 << position, needed))
+
+            state_masks = []
+            for state in range(field_thresholds.state_count):
+                satisfied = field_thresholds.satisfied_in_state(state)
+                mask = unconstrained
+                for rule_bit, needed in required_bits:
+                    if needed & satisfied == needed:
+                        mask |= rule_bit
+                state_masks.append(mask)
+
+            self._rule_masks[field] = (unconstrained, field_thresholds._thresholds, state_masks)
+
+    @property
+    def indexed_fields(self) -> List[str]:
+        return list(self.fields)
+
+    def candidate_mask(self, context: Dict[str, Any], mask: int) -> int:
+        """Narrow a rule bitmask to rules whose required comparisons all hold"""
+        for field, (unconstrained, thresholds, state_masks) in self._rule_masks.items():
+            if not mask & ~unconstrained:
+                # No remaining candidate tests this field
+                continue
+
+            # Inlined FieldThresholds.state()
+            value = context.get(field)
+            if value is None:
+                mask &= unconstrained
+            else:
+                try:
+                    x = float(value)
+                except (ValueError, TypeError):
+                    x = None
+                if x is None or x != x:
+                    mask &= unconstrained
+                else:
+                    i = bisect_left(thresholds, x)
+                    state = 2 * i + 1 if i < len(thresholds) and thresholds[i] == x else 2 * i
+                    mask &= state_masks[state]
+
+            if not mask:
+                return 0
+        return mask
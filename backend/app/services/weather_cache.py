@@ -0,0 +1,109 @@
+"""
+Weather Cache - Current weather per lat/lon grid cell with single-flight fetches
+Coordinates are snapped to cells of WEATHER_GRID_DEGREES and weather is
+fetched for the cell centre, so every request in a cell shares one
+upstream result for WEATHER_CACHE_TTL seconds. Concurrent misses for the
+same cell await one fetch instead of each calling the weather API.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+# (latitude index, longitude index) of a grid cell
+GridCell = Tuple[int, int]
+
+# Fetches weather for (latitude, longitude)
+WeatherFetch = Callable[[float, float], Awaitable[Dict[str, Any]]]
+
+
+def grid_cell(latitude: float, longitude: float, degrees: float) -> GridCell:
+    return math.floor(latitude / degrees), math.floor(longitude / degrees)
+
+
+def cell_centre(cell: GridCell, degrees: float) -> Tuple[float, float]:
+    return round((cell[0] + 0.5) * degrees, 4), round((cell[1] + 0.5) * degrees, 4)
+
+
+class WeatherCache:
+    """Weather by grid cell, bounded by entry count and age; shared read-only dicts"""
+
+    def __init__(self, ttl: float, grid_degrees: float, max_entries: int = 4096):
+        self.ttl = ttl
+        self.grid_degrees = grid_degrees
+        self.max_entries = max_entries
+        # cell -> (expires_at, weather), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        # cell -> the fetch every concurrent miss for it awaits
+        self._in_flight: Dict[GridCell, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.evictions = 0
+
+    async def get(self, latitude: float, longitude: float, fetch: WeatherFetch) -> Dict[str, Any]:
+        """Weather of the cell containing the point, fetching it for the cell centre on a miss"""
+        cell = grid_cell(latitude, longitude, self.grid_degrees)
+        entry = self._entries.get(cell)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(cell)
+            self.hits += 1
+            return entry[1]
+
+        task = self._in_flight.get(cell)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(cell, fetch))
+            # Nobody may be left to await a failure if every waiter was cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._in_flight[cell] = task
+        else:
+            self.coalesced += 1
+        # A waiter that is cancelled (client gone) leaves the fetch running for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, cell: GridCell, fetch: WeatherFetch) -> Dict[str, Any]:
+        try:
+            weather = await fetch(*cell_centre(cell, self.grid_degrees))
+        except Exception:
+            # Failures are not cached: the next request tries again
+            self.errors += 1
+            raise
+        finally:
+            self._in_flight.pop(cell, None)
+        self.put(cell, weather)
+        return weather
+
+    def cell(self, latitude: float, longitude: float) -> GridCell:
+        return grid_cell(latitude, longitude, self.grid_degrees)
+
+    def centre(self, cell: GridCell) -> Tuple[float, float]:
+        return cell_centre(cell, self.grid_degrees)
+
+    def put(self, cell: GridCell, weather: Dict[str, Any]):
+        """Store fresh weather for a cell, e.g. from a batched fetch"""
+        self._entries.pop(cell, None)
+        self._entries[cell] = (time.monotonic() + self.ttl, weather)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "grid_degrees": self.grid_degrees,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "in_flight": len(self._in_flight),
+            "errors": self.errors,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,305 @@
+"""
+Weather History - Hourly weather per grid cell in fixed-size ring buffers
+Every forecast fetch writes the past hours of its hourly series into the
+ring of the point's grid cell: WEATHER_HISTORY_DAYS * 24 slots per variable,
+the slot of an hour being its number modulo the capacity, so re-fetched
+hours overwrite themselves and missing hours stay unknown. The rolling
+aggregates rules read (30-day rainfall, 24-hour and 7-day temperature
+extremes, consecutive hot or humid hours) are computed when a cell is
+written, so reading them is a lookup.
+
+With WEATHER_HISTORY_PATH set the rings live in a memory-mapped file, so
+history survives restarts and reaches further back than the 7 days a fetch
+returns. One process writes a file; other workers, and every process
+without a path, keep their history in memory.
+
+File layout: MAGIC, then capacity in hours, maximum cells, grid size in
+micro-degrees and cells in use (8 bytes each, little endian), padded to
+HEADER_SIZE; then, for all cells, the (latitude, longitude) grid indices,
+the latest hour written, the hour held by each slot (int32) and the values
+(float32, VARIABLES x capacity). Hours are counted from the Unix epoch.
+"""
+
+import fcntl
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.weather_cache import GridCell, grid_cell
+
+
+MAGIC = b'AGRIWH01'
+HEADER_SIZE = 64
+HOUR = 3600
+
+# Hourly variables kept per cell, named as Open-Meteo's hourly parameter
+VARIABLES = ('temperature_2m', 'relative_humidity_2m', 'precipitation', 'wind_speed_10m')
+TEMPERATURE, HUMIDITY, PRECIPITATION, WIND = range(len(VARIABLES))
+
+DAY = 24
+WEEK = 7 * DAY
+MONTH = 30 * DAY
+
+# WeatherData fields computed from the history. A windowed field is None until
+# every hour of its window is known; runs count back from the latest hour
+HISTORY_FIELDS = (
+    'rainfall_last_30days',
+    'temperature_max_24h',
+    'temperature_min_24h',
+    'temperature_max_7days',
+    'temperature_min_7days',
+    'wind_speed_max_24h',
+    'consecutive_hot_hours',
+    'consecutive_humid_hours',
+)
+
+# A cell not written for longer than this has no current aggregates
+MAX_LAG_HOURS = 3
+
+
+def weather_history_path() -> Optional[Path]:
+    """WEATHER_HISTORY_PATH, or None to keep the history in memory"""
+    if settings.WEATHER_HISTORY_PATH:
+        return Path(settings.WEATHER_HISTORY_PATH)
+    return None
+
+
+def _view(buffer: Any, dtype: str, shape: tuple, offset: int) -> np.ndarray:
+    count = int(np.prod(shape))
+    return np.frombuffer(buffer, dtype, count, offset).reshape(shape)
+
+
+class WeatherHistory:
+    """Hourly ring buffers per grid cell, in a mapped file (or in memory with path None)"""
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        days: int,
+        grid_degrees: float,
+        max_cells: int = 1024,
+        hot_temperature: float = 30,
+        humid_percent: float = 80
+    ):
+        self.capacity = days * DAY
+        self.max_cells = max_cells
+        self.grid_degrees = grid_degrees
+        self.hot_temperature = hot_temperature
+        self.humid_percent = humid_percent
+        self.path: Optional[Path] = None
+        self._fd: Optional[int] = None
+
+        layout = np.array([self.capacity, max_cells, round(grid_degrees * 1e6), 0], dtype='<i8')
+        offsets = [HEADER_SIZE]
+        for itemsize, per_cell in ((4, 2), (4, 1), (4, self.capacity), (4, len(VARIABLES) * self.capacity)):
+            offsets.append(offsets[-1] + itemsize * per_cell * max_cells)
+        self.size = offsets[-1]
+
+        self._map: Optional[mmap.mmap] = None
+        if path is not None:
+            try:
+                self._map = self._open(Path(path), layout)
+            except OSError as e:
+                print(f"⚠️ Weather history file unavailable, keeping history in memory: {e}")
+        if self._map is None:
+            # Anonymous mapping: zero pages are only allocated once written
+            self._map = mmap.mmap(-1, self.size)
+            self._map[:len(MAGIC) + layout.nbytes] = MAGIC + layout.tobytes()
+
+        self._header = _view(self._map, '<i8', (4,), len(MAGIC))
+        self._cells = _view(self._map, '<i4', (max_cells, 2), offsets[0])
+        self._latest = _view(self._map, '<i4', (max_cells,), offsets[1])
+        self._hours = _view(self._map, '<i4', (max_cells, self.capacity), offsets[2])
+        self._values = _view(self._map, '<f4', (max_cells, len(VARIABLES), self.capacity), offsets[3])
+        # Hours back from a cell's latest hour, newest first
+        self._back = np.arange(self.capacity)
+
+        count = int(self._header[3])
+        self._rows: Dict[GridCell, int] = {
+            (int(cell[0]), int(cell[1])): row for row, cell in enumerate(self._cells[:count])
+        }
+        # row -> its aggregates, recomputed on every write to the row
+        self._summaries: List[Dict[str, Any]] = [self._aggregate(row) for row in range(count)]
+
+        self.writes = 0
+        self.reads = 0
+        self.lagging = 0
+        self.evictions = 0
+
+    def _open(self, path: Path, layout: np.ndarray) -> mmap.mmap:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise OSError(f"{path} is in use by another process")
+
+        header = os.pread(fd, len(MAGIC) + 24, 0)
+        size = os.fstat(fd).st_size
+        matches = header[:len(MAGIC)] == MAGIC and header[len(MAGIC):] == layout[:3].tobytes()
+        if not matches or size != self.size:
+            if size:
+                print(f"⚠️ Weather history in {path} has another layout, starting a new one")
+            # Truncating first leaves the file sparse: pages are only allocated once written
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, self.size)
+            os.pwrite(fd, MAGIC + layout.tobytes(), 0)
+
+        self._fd = fd
+        self.path = path
+        return mmap.mmap(fd, self.size)
+
+    def _row(self, cell: GridCell) -> int:
+        row = self._rows.get(cell)
+        if row is not None:
+            return row
+        count = int(self._header[3])
+        if count < self.max_cells:
+            row = count
+            self._summaries.append({})
+        else:
+            # Full: reuse the cell written least recently
+            row = int(np.argmin(self._latest))
+            del self._rows[(int(self._cells[row][0]), int(self._cells[row][1]))]
+            self.evictions += 1
+        self._cells[row] = cell
+        self._latest[row] = 0
+        self._hours[row] = 0
+        if row == count:
+            self._header[3] = count + 1
+        self._rows[cell] = row
+        return row
+
+    def record(self, latitude: float, longitude: float, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store the past hours of one location of an Open-Meteo response
+        (timeformat=unixtime, hourly VARIABLES) in the point's cell; returns
+        the cell's aggregates. Forecast hours are not history and are skipped.
+        """
+        cell = grid_cell(latitude, longitude, self.grid_degrees)
+        hourly = data.get("hourly") or {}
+        now = (data.get("current") or {}).get("time") or time.time()
+        times = np.asarray(hourly.get("time") or [], dtype=np.int64)
+        past = times <= now
+        if not past.any():
+            row = self._rows.get(cell)
+            return self._summaries[row] if row is not None else dict.fromkeys(HISTORY_FIELDS)
+
+        hours = (times[past] // HOUR)[-self.capacity:]
+        values = np.array(
+            [hourly.get(variable) or [None] * len(times) for variable in VARIABLES], dtype=np.float32
+        )[:, past][:, -self.capacity:]
+
+        row = self._row(cell)
+        slots = hours % self.capacity
+        self._hours[row, slots] = hours
+        self._values[row][:, slots] = values
+        self._latest[row] = max(int(self._latest[row]), int(hours[-1]))
+        self._summaries[row] = self._aggregate(row)
+        self.writes += 1
+        return self._summaries[row]
+
+    def _aggregate(self, row: int) -> Dict[str, Any]:
+        latest = int(self._latest[row])
+        if not latest:
+            return dict.fromkeys(HISTORY_FIELDS)
+
+        # Newest hour first; slots holding another hour (or none) are unknown
+        expected = latest - self._back
+        slots = expected % self.capacity
+        known = self._hours[row, slots] == expected
+        temperature, humidity, precipitation, wind = self._values[row][:, slots]
+        # Hours known without a gap, back from the latest one
+        covered = self.capacity if known.all() else int(known.argmin())
+
+        def extreme(series: np.ndarray, hours: int, reduce) -> Optional[float]:
+            # fmax/fmin skip unknown values; NaN only if all are unknown
+            if covered < hours:
+                return None
+            value = reduce(series[:hours])
+            return None if value != value else round(float(value), 1)
+
+        def total(series: np.ndarray, hours: int) -> Optional[float]:
+            if covered < hours:
+                return None
+            series = series[:hours]
+            # Hours the model has no value for count as dry
+            return round(float(series[series == series].sum(dtype=np.float64)), 1)
+
+        def run(series: np.ndarray, threshold: float) -> int:
+            # Unknown values compare False and end a run
+            above = series[:covered] >= threshold
+            return covered if above.all() else int(above.argmin())
+
+        return {
+            'rainfall_last_30days': total(precipitation, MONTH),
+            'temperature_max_24h': extreme(temperature, DAY, np.fmax.reduce),
+            'temperature_min_24h': extreme(temperature, DAY, np.fmin.reduce),
+            'temperature_max_7days': extreme(temperature, WEEK, np.fmax.reduce),
+            'temperature_min_7days': extreme(temperature, WEEK, np.fmin.reduce),
+            'wind_speed_max_24h': extreme(wind, DAY, np.fmax.reduce),
+            'consecutive_hot_hours': run(temperature, self.hot_temperature),
+            'consecutive_humid_hours': run(humidity, self.humid_percent),
+        }
+
+    def summary(self, latitude: float, longitude: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The aggregates of the point's cell, None if it has no history up to the current hour"""
+        row = self._rows.get(grid_cell(latitude, longitude, self.grid_degrees))
+        if row is None:
+            return None
+        if (now or time.time()) // HOUR - self._latest[row] > MAX_LAG_HOURS:
+            self.lagging += 1
+            return None
+        self.reads += 1
+        return self._summaries[row]
+
+    def close(self):
+        """Flush and unmap; the file lock is released"""
+        if self._map is None:
+            return
+        # Views export the mapping's buffer, which must be released before closing it
+        self._header = self._cells = self._latest = self._hours = self._values = None
+        if self._fd is not None:
+            self._map.flush()
+        self._map.close()
+        self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        count = len(self._rows)
+        return {
+            "path": str(self.path) if self.path is not None else None,
+            "days": self.capacity // DAY,
+            "cells": count,
+            "max_cells": self.max_cells,
+            "size_bytes": self.size,
+            "hours_stored": int(np.count_nonzero(self._hours[:count])) if self._hours is not None else 0,
+            "hot_temperature": self.hot_temperature,
+            "humid_percent": self.humid_percent,
+            "writes": self.writes,
+            "reads": self.reads,
+            "lagging": self.lagging,
+            "evictions": self.evictions,
+        }
+
+
+def create_weather_history() -> Optional[WeatherHistory]:
+    """The history configured in settings, None when WEATHER_HISTORY_DAYS is 0"""
+    if settings.WEATHER_HISTORY_DAYS <= 0:
+        return None
+    return WeatherHistory(
+        weather_history_path(),
+        settings.WEATHER_HISTORY_DAYS,
+        settings.WEATHER_GRID_DEGREES,
+        settings.WEATHER_HISTORY_MAX_CELLS,
+        settings.WEATHER_HOT_TEMPERATURE,
+        settings.WEATHER_HUMID_PERCENT
+    )
@@ -0,0 +1,271 @@
+"""
+Weather Refresher - Current weather per region, refreshed in the background
+A lifespan task fetches the weather at each region's representative points
+(WEATHER_POINTS_PATH, kept out of the public constants), all in one batched
+request, every
+WEATHER_REFRESH_INTERVAL seconds, with jitter so workers do not call the API
+in step. Requests read the in-memory snapshot:
+past the interval it is still served but refreshed in the background
+(stale-while-revalidate); past WEATHER_MAX_STALENESS it is not served at all.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.models.schemas import WeatherData
+from app.services.weather_history import HISTORY_FIELDS
+
+
+# (name, latitude, longitude) of a representative point
+Point = Tuple[str, float, float]
+
+# A region whose refresh failed is not retried from requests sooner than this
+RETRY_AFTER = 30.0
+
+
+def region_points(path: Path) -> Dict[str, List[Point]]:
+    """Representative points per region id, from the points file; empty if it cannot be read"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            regions = json.load(f).get('regions') or {}
+        points: Dict[str, List[Point]] = {}
+        for region_id, region_points in regions.items():
+            parsed = [
+                (point.get('name', ''), float(point['latitude']), float(point['longitude']))
+                for point in region_points or []
+            ]
+            if parsed:
+                points[region_id] = parsed
+        return points
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"⚠️ Could not read weather points from {path}: {e}")
+        return {}
+
+
+def combine(readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    A region's weather from its points: means, and frost or rain expected if
+    any point expects it. History aggregates are means too, runs the longest
+    at any point, and None unless every point has them.
+    """
+    count = len(readings)
+
+    def mean(field: str, digits: Optional[int] = None) -> float:
+        return round(sum(r[field] for r in readings) / count, digits)
+
+    history: Dict[str, Any] = {}
+    for field in HISTORY_FIELDS:
+        values = [r.get(field) for r in readings]
+        if any(value is None for value in values):
+            history[field] = None
+        elif field.startswith('consecutive_'):
+            history[field] = max(values)
+        else:
+            history[field] = round(sum(values) / count, 1)
+
+    return {
+        "temperature": mean("temperature"),
+        "humidity": mean("humidity"),
+        "rainfall_last_24h": mean("rainfall_last_24h", 1),
+        "rainfall_last_7days": mean("rainfall_last_7days", 1),
+        "rainfall_forecast_48h": any(r["rainfall_forecast_48h"] for r in readings),
+        "rainfall_forecast_amount_mm": mean("rainfall_forecast_amount_mm", 1),
+        "wind_speed": mean("wind_speed"),
+        "frost_warning": any(r["frost_warning"] for r in readings),
+        **history,
+    }
+
+
+@dataclass
+class RegionSnapshot:
+    """The latest weather of one region"""
+    weather: Dict[str, Any]
+    weather_data: WeatherData
+    points: Dict[str, Dict[str, Any]]
+    fetched_at: float
+    updated_at: datetime
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class RegionWeatherRefresher:
+    """Keeps a weather snapshot per region fresh from a background task"""
+
+    def __init__(self, app: Any, interval: float, max_staleness: float, jitter: float, points_path: Optional[Path] = None):
+        self.app = app
+        self.points_path = Path(points_path or settings.WEATHER_POINTS_PATH)
+        self._points = region_points(self.points_path)
+        self.interval = interval
+        # Never below the interval, or every snapshot would expire before its refresh
+        self.max_staleness = max(max_staleness, interval)
+        self.jitter = jitter
+        self._snapshots: Dict[str, RegionSnapshot] = {}
+        # region -> its refresh in progress, shared by the loop and revalidations
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # region -> refreshes, failures, consecutive_failures, last_error, ...
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self.fresh = 0
+        self.stale = 0
+        self.expired = 0
+        self.missing = 0
+        self.revalidations = 0
+
+    def regions(self) -> Dict[str, List[Point]]:
+        return self._points
+
+    def get(self, region: str) -> Optional[RegionSnapshot]:
+        """The region's snapshot if within the staleness bound; a stale one triggers a refresh"""
+        snapshot = self._snapshots.get(region)
+        if snapshot is None:
+            self.missing += 1
+            self._revalidate(region)
+            return None
+        age = snapshot.age()
+        if age > self.max_staleness:
+            self.expired += 1
+            self._revalidate(region)
+            return None
+        if age > self.interval:
+            self.stale += 1
+            self._revalidate(region)
+        else:
+            self.fresh += 1
+        return snapshot
+
+    def _revalidate(self, region: str):
+        if self._task is None or region in self._refreshing:
+            return
+        last_attempt = self._metrics.get(region, {}).get('last_attempt', float('-inf'))
+        if time.monotonic() - last_attempt < RETRY_AFTER:
+            return
+        self.revalidations += 1
+        self._refresh([region])
+
+    def _refresh(self, regions: List[str]) -> List[asyncio.Task]:
+        """One batched refresh for the regions not already being refreshed; returns every task involved"""
+        tasks = {self._refreshing[region] for region in regions if region in self._refreshing}
+        pending = [region for region in regions if region not in self._refreshing]
+        if pending:
+            task = asyncio.create_task(self.refresh_regions(pending))
+            for region in pending:
+                self._refreshing[region] = task
+            task.add_done_callback(lambda done: self._finished(pending, done))
+            tasks.add(task)
+        return list(tasks)
+
+    def _finished(self, regions: List[str], task: asyncio.Task):
+        for region in regions:
+            if self._refreshing.get(region) is task:
+                del self._refreshing[region]
+
+    async def refresh_regions(self, regions: List[str]) -> bool:
+        """Fetch the regions' points in one batch and replace their snapshots; False if it failed"""
+        start = time.monotonic()
+        points = self.regions()
+        batch = [(region, point) for region in regions for point in points.get(region, [])]
+        for region in regions:
+            metrics = self._metrics.setdefault(region, {
+                "refreshes": 0, "failures": 0, "consecutive_failures": 0, "last_error": None,
+            })
+            metrics['last_attempt'] = start
+        if not batch:
+            return False
+
+        try:
+            readings = await self.app.state.weather_service.fetch_weather_batch(
+                [(latitude, longitude) for _, (_, latitude, longitude) in batch]
+            )
+        except Exception as e:
+            for region in {region for region, _ in batch}:
+                metrics = self._metrics[region]
+                metrics['failures'] += 1
+                metrics['consecutive_failures'] += 1
+                metrics['last_error'] = str(e)
+                metrics['last_duration_ms'] = round((time.monotonic() - start) * 1000, 1)
+            print(f"⚠️ Weather refresh failed for {', '.join(regions)}: {e}")
+            return False
+
+        by_region: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (region, (name, _, _)), reading in zip(batch, readings):
+            by_region.setdefault(region, {})[name] = reading
+        fetched_at, updated_at = time.monotonic(), datetime.now()
+        for region, region_readings in by_region.items():
+            weather = combine(list(region_readings.values()))
+            self._snapshots[region] = RegionSnapshot(
+                weather, WeatherData(**weather), region_readings, fetched_at, updated_at
+            )
+            metrics = self._metrics[region]
+            metrics['refreshes'] += 1
+            metrics['consecutive_failures'] = 0
+            metrics['last_error'] = None
+            metrics['last_duration_ms'] = round((fetched_at - start) * 1000, 1)
+        return True
+
+    async def refresh_all(self):
+        """Every region in one batched request (or as many as FORECAST_BATCH_SIZE needs)"""
+        # Read per cycle, so edited points apply on the next refresh
+        self._points = region_points(self.points_path)
+        await asyncio.gather(*self._refresh(list(self.regions())), return_exceptions=True)
+
+    def start(self):
+        """Start refreshing: every region at once, then every interval ± jitter"""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                print(f"❌ Weather refresher error: {e}")
+            await asyncio.sleep(self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def stop(self):
+        """Stop the refresher task and any refresh in progress"""
+        tasks = list(self._refreshing.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        regions = {}
+        for region in self.regions():
+            snapshot = self._snapshots.get(region)
+            metrics = {key: value for key, value in self._metrics.get(region, {}).items() if key != 'last_attempt'}
+            age = snapshot.age() if snapshot is not None else None
+            regions[region] = {
+                **metrics,
+                "age_seconds": round(age, 1) if age is not None else None,
+                # How far behind schedule the snapshot is
+                "refresh_lag_seconds": round(max(age - self.interval, 0.0), 1) if age is not None else None,
+                "updated_at": snapshot.updated_at.isoformat() if snapshot is not None else None,
+                "weather": snapshot.weather if snapshot is not None else None,
+            }
+        lags = [r["refresh_lag_seconds"] for r in regions.values() if r["refresh_lag_seconds"] is not None]
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "max_staleness_seconds": self.max_staleness,
+            "jitter": self.jitter,
+            "served_fresh": self.fresh,
+            "served_stale": self.stale,
+            "expired": self.expired,
+            "missing": self.missing,
+            "revalidations": self.revalidations,
+            "max_refresh_lag_seconds": max(lags) if lags else None,
+            "failures": sum(r.get("failures", 0) for r in regions.values()),
+            "regions": regions,
+        }
@@ -1,110 +1,136 @@
 """
 Weather Service - Auto-fetch weather based on IP location
 Handles external API calls for IP geolocation and weather data
+One service (and one pooled HTTP client) is created per app in the lifespan.
 """
 
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from app.core.config import settings
+from app.services.forecast_ingestion import ForecastIngestion
+from app.services.ip_resolver import IPLocator, create_ip_resolvers
+from app.services.weather_cache import WeatherCache
+from app.services.weather_history import WeatherHistory
+
 logger = logging.getLogger(__name__)
 
 
+def create_http_client() -> httpx.AsyncClient:
+    """HTTP client for the weather and geolocation APIs, reusing keep-alive connections"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.WEATHER_HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.WEATHER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.WEATHER_MAX_CONNECTIONS,
+            keepalive_expiry=30
+        )
+    )
+
+
 class WeatherService:
     """Service for fetching weather data based on IP location"""
 
-    IPAPI_URL = "https://ipapi.co/json/"
-    OPENMETEO_URL = "https://api.open-meteo.com/v1/forecast"
-
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0)
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[WeatherCache] = None,
+        resolvers: Optional[List[Any]] = None,
+        history: Optional[WeatherHistory] = None
+    ):
+        self.openmeteo_url = settings.WEATHER_API_URL
+        # A client passed in belongs to the caller and is not closed here
+        self._owns_client = client is None
+        self.client = client or create_http_client()
+        self.cache = cache
+        # Hourly history per grid cell, written by every fetch (owned by the caller)
+        self.history = history
+        # Current weather and hourly rainfall, many points per request
+        self.ingestion = ForecastIngestion(
+            self.client, self.openmeteo_url, settings.FORECAST_BATCH_SIZE, history
+        )
+        # Client IP -> location: the local range table, then the geolocation API
+        self.locator = IPLocator(
+            create_ip_resolvers(self.client) if resolvers is None else resolvers,
+            settings.IP_CACHE_SIZE
+        )
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Close HTTP client and the IP range table"""
+        self.locator.close()
+        if self._owns_client:
+            await self.client.aclose()
 
     async def get_location_from_ip(self, client_ip: Optional[str] = None) -> Dict[str, Any]:
         """
         Get user's location from IP address
 
         Args:
-            client_ip: Optional IP address (for debugging)
+            client_ip: Client IP address (private and loopback addresses cannot be located)
 
         Returns:
             Location data with latitude, longitude, city, country
         """
         try:
-            response = await self.client.get(
-                self.IPAPI_URL,
-                headers={"Accept": "application/json"}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return {
-                "latitude": data.get("latitude"),
-                "longitude": data.get("longitude"),
-                "city": data.get("city", "Unknown"),
-                "country": data.get("country_name", "Unknown"),
-                "region": data.get("region", "")
-            }
+            location = await self.locator.resolve(client_ip)
         except Exception as e:
             logger.error(f"IP geolocation error: {e}")
             raise ValueError("Could not determine location from IP")
+        if location is None:
+            raise ValueError(f"No location known for IP {client_ip}")
+        return location
 
     async def fetch_weather_data(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """
-        Fetch current weather data from Open-Meteo
+        Fetch current weather data and rainfall history/forecast from Open-Meteo,
+        through the grid cell cache if enabled
 
         Args:
             latitude: Latitude coordinate
             longitude: Longitude coordinate
 
         Returns:
-            Weather data with temperature, humidity, rainfall, wind speed
+            Weather data with temperature, humidity, rainfall (last 24h, last 7
+            days, next 48h), wind speed, and the history aggregates when kept
+            (shared with other requests in the cell when cached - do not modify)
         """
-        try:
-            params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "current": "temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m",
-                "timezone": "auto",
-                "forecast_days": "1"
-            }
-
-            response = await self.client.get(self.OPENMETEO_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            current = data.get("current", {})
-
-            # Check for frost warning (temperature below 0°C)
-            temperature = current.get("temperature_2m", 0)
-            frost_warning = temperature < 0
-
-            return {
-                "temperature": round(temperature),
-                "humidity": round(current.get("relative_humidity_2m", 0)),
-                "rainfall_last_24h": current.get("precipitation", 0),
-                "wind_speed": round(current.get("wind_speed_10m", 0)),
-                "frost_warning": frost_warning
-            }
-        except Exception as e:
-            logger.error(f"Weather API error: {e}")
-            raise ValueError("Could not fetch weather data")
+        if self.cache is not None:
+            return await self.cache.get(latitude, longitude, self.fetch_point_weather)
+        return await self.fetch_point_weather(latitude, longitude)
+
+    async def fetch_point_weather(self, latitude: float, longitude: float) -> Dict[str, Any]:
+        """Fetch weather for one point from Open-Meteo, bypassing the grid cache"""
+        return (await self.ingestion.fetch([(latitude, longitude)]))[0]
 
-    async def auto_fetch_weather(self, client_ip: Optional[str] = None) -> Dict[str, Any]:
+    async def fetch_weather_batch(self, points: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
         """
-        Auto-fetch weather based on user's IP location
+        Fetch fresh weather for many points in batched requests. Not read from
+        the grid cell cache, but stored in it: with the cache on, each point's
+        cell centre is fetched once and its cell refreshed.
+        """
+        if self.cache is None:
+            return await self.ingestion.fetch(points)
+        cells = [self.cache.cell(latitude, longitude) for latitude, longitude in points]
+        unique_cells = list(dict.fromkeys(cells))
+        weather = await self.ingestion.fetch([self.cache.centre(cell) for cell in unique_cells])
+        by_cell = dict(zip(unique_cells, weather))
+        for cell, cell_weather in by_cell.items():
+            self.cache.put(cell, cell_weather)
+        return [by_cell[cell] for cell in cells]
+
+    async def locate_client(self, client_ip: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Locate the user by IP address
         Falls back to Baku, Azerbaijan if:
-        - IP geolocation fails (rate limit, network error)
+        - IP geolocation fails (unknown or private address, rate limit, network error)
         - Detected location is outside Azerbaijan (VPN, proxy, routing)
 
         Args:
-            client_ip: Optional IP address (for debugging)
+            client_ip: Client IP address to locate
 
         Returns:
-            Combined location and weather data
+            (location, whether the default location was used)
         """
         # Default location: Baku, Azerbaijan
         default_location = {
@@ -115,9 +141,6 @@ class WeatherService:
             "region": "Bakı"
         }
 
-        location = None
-        used_fallback = False
-
         try:
             # Step 1: Try to get location from IP
             location = await self.get_location_from_ip(client_ip)
@@ -127,30 +150,23 @@ class WeatherService:
             # If not (VPN, proxy, or foreign IP), use default Azerbaijan location
             if location.get("country", "").lower() not in ["azerbaijan", "azərbaycan"]:
                 logger.warning(f"Detected location outside Azerbaijan ({location['country']}), using Baku as default")
-                location = default_location
-                used_fallback = True
+                return default_location, True
+            return location, False
 
         except Exception as e:
             logger.warning(f"IP geolocation failed (using default location): {e}")
             # Use default location on failure (rate limit, network error, etc.)
-            location = default_location
-            used_fallback = True
-
-        try:
-            # Step 3: Fetch weather for location (real or default)
-            weather = await self.fetch_weather_data(
-                location["latitude"],
-                location["longitude"]
-            )
-
-            return {
-                **weather,
-                "location": location,
-                "used_fallback": used_fallback
-            }
-        except Exception as e:
-            logger.error(f"Weather fetch error: {e}")
-            raise ValueError(f"Could not fetch weather data: {e}")
+            return default_location, True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "weather_api": self.openmeteo_url,
+            "ip_location": self.locator.stats(),
+            "max_connections": settings.WEATHER_MAX_CONNECTIONS,
+            "ingestion": self.ingestion.stats(),
+            "cache": self.cache.stats() if self.cache is not None else {"enabled": False},
+            "history": self.history.stats() if self.history is not None else {"enabled": False},
+        }
 
     def map_location_to_region(self, city: str, region: str) -> str:
         """
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch recommendations endpoint vs one POST per farm
+Run from the backend directory: python -m benchmarks.bench_batch
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Any
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.batch_evaluator import BatchEvaluator
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 2000
+CHUNK_SIZES = [16, 64, 256]
+EXECUTORS = ['inline', 'thread', 'process', 'columnar']
+
+
+def comparable(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Response without its generation timestamp"""
+    return {k: v for k, v in response.items() if k != 'generated_at'}
+
+
+def main():
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+    engine = RuleEngine(rules, loader.load_constants(), loader.load_compiled_rules())
+    payloads = [r.model_dump(mode='json') for r in generate_requests(rules, REQUEST_COUNT)]
+
+    print("=" * 60)
+    print("BATCH RECOMMENDATIONS BENCHMARK")
+    print("=" * 60)
+    print(f"{REQUEST_COUNT} generated requests, {os.cpu_count()} CPU core(s)")
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        expected = [comparable(client.post('/api/v1/recommendations', json=p).json()) for p in payloads]
+        single_time = time.perf_counter() - start
+        print(f"  {REQUEST_COUNT} single POSTs:                {single_time * 1000:9.1f} ms")
+
+        start = time.perf_counter()
+        batch = client.post('/api/v1/recommendations/batch', json={'requests': payloads}).json()
+        batch_time = time.perf_counter() - start
+        actual = [comparable(item['response']) for item in batch['results']]
+        status = "✅" if actual == expected else "❌"
+        print(f"  One batch POST ({batch['executor']}):         {batch_time * 1000:9.1f} ms "
+              f"({single_time / batch_time:.2f}x) {status}")
+        if actual != expected:
+            return 1
+
+    # Executor / chunk size sweep, without HTTP
+    for kind in EXECUTORS:
+        # Inline and columnar evaluate the whole batch at once
+        for chunk_size in CHUNK_SIZES if kind not in ('inline', 'columnar') else [REQUEST_COUNT]:
+            evaluator = BatchEvaluator(executor=kind, chunk_size=chunk_size)
+
+            async def run():
+                return await evaluator.evaluate(engine, payloads)
+
+            asyncio.run(run())  # warm up the pool
+            start = time.perf_counter()
+            results, used = asyncio.run(run())
+            elapsed = time.perf_counter() - start
+            evaluator.shutdown()
+
+            same = [comparable(r.model_dump(mode='json')) for r, _ in results] == expected
+            print(f"  {used:8s} chunk={chunk_size:5d}:            {elapsed * 1000:9.1f} ms "
+                  f"({elapsed / REQUEST_COUNT * 1e6:7.1f} µs/item) {'✅' if same else '❌'}")
+            if not same:
+                return 1
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
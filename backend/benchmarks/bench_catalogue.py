@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: catalogue endpoints built per request vs precomputed with ETags
+Run from the backend directory: python -m benchmarks.bench_catalogue
+"""
+
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.catalogue_cache import CachedBody, CatalogueCache
+from app.main import app
+
+
+PATHS = [
+    "/farms", "/rules", "/rules/wheat", "/rules/wheat/irrigation",
+    "/constants", "/constants/thresholds", "/constants/regions", "/constants/stages",
+    "/scenarios/wheat", "/stats",
+]
+REQUESTS = 200
+
+
+class RebuildingCatalogue(CatalogueCache):
+    """Builds and encodes the payload on every request, as the endpoints did before"""
+
+    def entry(self, version, key, build):
+        return CachedBody(JSONResponse(jsonable_encoder(build())).body, '"rebuilt"')
+
+
+def per_request_ms(client: TestClient, path: str, headers: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get("/api/v1" + path, headers=headers)
+    return (time.perf_counter() - start) / REQUESTS * 1000
+
+
+def main():
+    print("=" * 60)
+    print("CATALOGUE CACHE BENCHMARK")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        cache = app.state.catalogue_cache
+        identity = {'accept-encoding': 'identity'}
+        gzip = {'accept-encoding': 'gzip, deflate'}
+
+        # Conditional requests: the ETag of each representation revalidates to a 304
+        for path in PATHS:
+            for headers in (identity, gzip):
+                first = client.get("/api/v1" + path, headers=headers)
+                again = client.get("/api/v1" + path, headers={**headers, 'if-none-match': first.headers['etag']})
+                if first.status_code != 200 or again.status_code != 304 or again.content:
+                    print(f"❌ {path}: {first.status_code} then {again.status_code}")
+                    return 1
+        print(f"✅ {len(PATHS)} endpoints answer If-None-Match with 304, identity and gzip")
+
+        print(f"{'Endpoint':<26} {'JSON':>8} {'gzip':>8} {'rebuilt':>9} {'cached':>8} {'304':>8}")
+        rebuilding = RebuildingCatalogue(cache.max_age)
+        for path in PATHS:
+            app.state.catalogue_cache = rebuilding
+            rebuilt = per_request_ms(client, path, identity)
+            app.state.catalogue_cache = cache
+            cached = per_request_ms(client, path, identity)
+            etag = client.get("/api/v1" + path, headers=identity).headers['etag']
+            not_modified = per_request_ms(client, path, {**identity, 'if-none-match': etag})
+
+            entry = cache.entry(cache.version, path.strip('/'), lambda: None)
+            print(f"{path:<26} {len(entry.body):7d}B {len(entry.gzip_body or entry.body):7d}B "
+                  f"{rebuilt:7.2f}ms {cached:6.2f}ms {not_modified:6.2f}ms")
+
+        stats = cache.stats()
+        print(f"Stored: {stats['entries']} entries, {stats['bytes'] // 1024} KB JSON, "
+              f"{stats['gzip_bytes'] // 1024} KB as sent gzipped, {stats['builds']} builds")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start from process launch to the first served request,
+with and without a ruleset snapshot
+Run from the backend directory: python -m benchmarks.bench_cold_start
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from app.core.config import settings
+from app.services.rule_compiler import RuleCompiler
+from app.services.rule_loader import RuleLoader
+from app.services.rule_engine import RuleEngine
+from app.services.rule_search import RuleSearchIndex
+from app.services.ruleset_snapshot import snapshot_path
+
+
+LAUNCHES = 5
+ROUNDS = 20
+FIRST_REQUEST = "/api/v1/recommendations/quick?farm_type=wheat&region=aran&temperature=34&humidity=40"
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(snapshot_dir: str) -> float:
+    """Launch uvicorn and poll until the first recommendation is served"""
+    port = free_port()
+    env = dict(os.environ, RULES_SNAPSHOT_DIR=snapshot_dir)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{FIRST_REQUEST}", timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                if process.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving a request")
+                time.sleep(0.002)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    print("=" * 60)
+    print("COLD START BENCHMARK")
+    print("=" * 60)
+
+    # In-process: the part of startup the snapshot replaces
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        settings.RULES_SNAPSHOT_DIR = snapshot_dir
+        if RuleLoader().load_with_snapshot() != "json" or RuleLoader().load_with_snapshot() != "snapshot":
+            print("❌ Snapshot was not written and read back")
+            return 1
+        size = snapshot_path(RuleLoader().content_hash()).stat().st_size
+
+        def load_json():
+            loader = RuleLoader()
+            RuleSearchIndex(loader.load_all_rules())
+            loader.load_constants()
+            loader.load_profiles()
+
+        json_time = best_of(ROUNDS, load_json)
+        snapshot_time = best_of(ROUNDS, lambda: RuleLoader().load_with_snapshot())
+        hash_time = best_of(ROUNDS, lambda: RuleLoader().content_hash())
+        loader = RuleLoader()
+        loader.load_with_snapshot()
+        rules, constants = loader.load_all_rules(), loader.load_constants()
+        compile_time = best_of(ROUNDS, lambda: RuleCompiler().compile_all(rules))
+        compiled = RuleCompiler().compile_all(rules)
+        engine_time = best_of(ROUNDS, lambda: RuleEngine(rules, constants, compiled))
+
+    print(f"Snapshot size:            {size / 1024:8.1f} KB")
+    print(f"  Parse JSON + index:     {json_time * 1000:8.2f} ms")
+    print(f"  Hash + load snapshot:   {snapshot_time * 1000:8.2f} ms (hash alone {hash_time * 1000:.2f} ms)")
+    print(f"  Compile rules (always): {compile_time * 1000:8.2f} ms")
+    print(f"  Build engine (always):  {engine_time * 1000:8.2f} ms")
+
+    # Out of process: launch to first served recommendation
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        time_to_first_request(snapshot_dir)  # writes the snapshot
+        without = [time_to_first_request("") for _ in range(LAUNCHES)]
+        with_snapshot = [time_to_first_request(snapshot_dir) for _ in range(LAUNCHES)]
+
+    print(f"Launch to first request (median of {LAUNCHES}):")
+    print(f"  Without snapshot:       {median(without) * 1000:8.1f} ms")
+    print(f"  With snapshot:          {median(with_snapshot) * 1000:8.1f} ms")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NumPy columnar engine vs the per-request evaluation loop
+Run from the backend directory: python -m benchmarks.bench_columnar
+"""
+
+import random
+import time
+from typing import Dict, List, Any
+
+from app.services.columnar_engine import ColumnarEngine
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+BATCH_SIZES = [1000, 10000, 50000]
+FUZZ_CONTEXTS = 3000
+
+# Values the interpreter handles specially: missing, unconvertible, NaN, lists, bools
+ODD_VALUES = [None, '', 'n/a', '12', float('nan'), [], ['wheat'], True, False, 0, -1e9, 1e9]
+
+
+def comparable(response) -> Dict[str, Any]:
+    """Response without its generation timestamp"""
+    return response.model_dump(exclude={'generated_at'})
+
+
+def fuzz_match_matrix(engine: ColumnarEngine, base_contexts: List[Dict[str, Any]]) -> int:
+    """Perturb context fields with odd values and compare against the interpreter"""
+    rng = random.Random(7)
+    checked = 0
+    for farm_type, farm_rules in engine.farm_rules.items():
+        contexts = []
+        for context in base_contexts:
+            context = dict(context, farm_type=farm_type)
+            for field in rng.sample(sorted(context), k=min(4, len(context))):
+                context[field] = rng.choice(ODD_VALUES)
+            contexts.append(context)
+
+        matrix = engine.match_matrix(farm_rules, contexts)
+        for position, compiled in enumerate(farm_rules):
+            for column, context in enumerate(contexts):
+                expected = engine._evaluate_rule(compiled.rule, context, compiled.category)[0]
+                if bool(matrix[position, column]) != expected:
+                    raise AssertionError(f"{compiled.rule['rule_id']} differs on {context}")
+                checked += 1
+    return checked
+
+
+def main():
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+    constants = loader.load_constants()
+    compiled_rules = loader.load_compiled_rules()
+    engine = RuleEngine(rules, constants, compiled_rules)
+    columnar = ColumnarEngine(rules, constants, compiled_rules)
+
+    print("=" * 60)
+    print("COLUMNAR ENGINE BENCHMARK")
+    print("=" * 60)
+
+    fuzz_requests = generate_requests(rules, FUZZ_CONTEXTS)
+    checked = fuzz_match_matrix(columnar, [engine._build_context(r) for r in fuzz_requests])
+    print(f"✅ {checked} rule/context checks with odd values agree with the interpreter")
+
+    for size in BATCH_SIZES:
+        requests = generate_requests(rules, size)
+
+        start = time.perf_counter()
+        expected = [engine.evaluate(request) for request in requests]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = columnar.evaluate_many(requests)
+        columnar_time = time.perf_counter() - start
+
+        if [comparable(r) for r in actual] != [comparable(r) for r in expected]:
+            print(f"❌ Responses differ at batch size {size}")
+            return 1
+
+        # Matching only: per-context matcher vs one match matrix per farm type
+        contexts = [engine._build_context(request) for request in requests]
+        by_farm: Dict[str, List[Dict[str, Any]]] = {}
+        for request, context in zip(requests, contexts):
+            by_farm.setdefault(request.farm_type.value, []).append(context)
+
+        start = time.perf_counter()
+        for farm_type, farm_contexts in by_farm.items():
+            matcher = engine.matchers[farm_type]
+            for context in farm_contexts:
+                matcher.match(context)
+        match_loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for farm_type, farm_contexts in by_farm.items():
+            columnar.match_matrix(columnar.farm_rules[farm_type], farm_contexts)
+        match_matrix_time = time.perf_counter() - start
+
+        print(f"Batch of {size} farms, identical responses ✅")
+        print(f"  Per-request loop:       {size / loop_time:10.0f} farms/s")
+        print(f"  Columnar engine:        {size / columnar_time:10.0f} farms/s "
+              f"({loop_time / columnar_time:.2f}x)")
+        print(f"  Matching only, loop:    {size / match_loop_time:10.0f} farms/s")
+        print(f"  Matching only, matrix:  {size / match_matrix_time:10.0f} farms/s "
+              f"({match_loop_time / match_matrix_time:.2f}x)")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: interpreted vs compiled rule evaluation on the shipped rules
+Run from the backend directory: python -m benchmarks.bench_compiler
+"""
+
+import time
+from typing import Dict, List, Any
+
+from app.models.schemas import RecommendationAction
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 2000
+ROUNDS = 5
+
+
+def interpreted_matches(engine: RuleEngine, farm_type: str, context: Dict[str, Any]) -> List[RecommendationAction]:
+    """Rule matching as the JSON interpreter (RuleEngine._evaluate_rule) runs it"""
+    matched = []
+    for category, category_data in engine.rules.get(farm_type, {}).items():
+        if category_data and 'rules' in category_data:
+            for rule in category_data['rules']:
+                if engine._is_rule_enabled(rule):
+                    match, action = engine._evaluate_rule(rule, context, category)
+                    if match and action:
+                        matched.append(action)
+    return matched
+
+
+def compiled_matches(engine: RuleEngine, farm_type: str, context: Dict[str, Any]) -> List[RecommendationAction]:
+    """Rule matching with compiled predicates, as RuleEngine.evaluate runs it"""
+    matched = []
+    for category, compiled_rules in engine.compiled_rules.get(farm_type, {}).items():
+        for compiled_rule in compiled_rules:
+            rule = compiled_rule.rule
+            if engine._is_rule_enabled(rule) and compiled_rule.matches(context):
+                matched.append(engine._build_action(rule, context, category))
+    return matched
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+    constants = loader.load_constants()
+
+    start = time.perf_counter()
+    compiled = loader.load_compiled_rules()
+    compile_time = time.perf_counter() - start
+
+    engine = RuleEngine(rules, constants, compiled)
+    requests = generate_requests(rules, REQUEST_COUNT)
+    contexts = [(r.farm_type.value, engine._build_context(r)) for r in requests]
+
+    print("=" * 60)
+    print("RULE COMPILER BENCHMARK")
+    print("=" * 60)
+
+    # Verify identical results
+    total_matches = 0
+    for farm_type, context in contexts:
+        expected = [a.model_dump() for a in interpreted_matches(engine, farm_type, context)]
+        actual = [a.model_dump() for a in compiled_matches(engine, farm_type, context)]
+        if expected != actual:
+            print(f"❌ Mismatch for {farm_type}: {[a['rule_id'] for a in expected]} != {[a['rule_id'] for a in actual]}")
+            return 1
+        total_matches += len(actual)
+    print(f"✅ Identical matches on {len(contexts)} requests ({total_matches} rule matches)")
+
+    interpreted = best_of(ROUNDS, lambda: [interpreted_matches(engine, f, dict(c)) for f, c in contexts])
+    compiled_time = best_of(ROUNDS, lambda: [compiled_matches(engine, f, dict(c)) for f, c in contexts])
+    full = best_of(ROUNDS, lambda: [engine.evaluate(r) for r in requests])
+
+    per_request = lambda t: t / len(contexts) * 1e6
+    print(f"Compile time (all rules):    {compile_time * 1e3:8.2f} ms")
+    print(f"Interpreted match + build:   {per_request(interpreted):8.2f} µs/request")
+    print(f"Compiled match + build:      {per_request(compiled_time):8.2f} µs/request")
+    print(f"Speedup (rule phase):        {interpreted / compiled_time:8.2f}x")
+    print(f"Full evaluate() (compiled):  {per_request(full):8.2f} µs/request")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conditions in JSON order vs reordered from sampled statistics
+Run from the backend directory: python -m benchmarks.bench_condition_order
+"""
+
+import time
+from typing import Any, Dict, List
+
+from app.services.condition_optimizer import ConditionOptimizer
+from app.services.rule_compiler import RuleCompiler
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests, scale_rules
+
+
+REQUEST_COUNT = 3000
+WARMUP_COUNT = 2000
+ROUNDS = 5
+SCALE = 10
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def evaluate_all_items(engine: RuleEngine, conditions: Dict[str, Any], context: Dict[str, Any]) -> bool:
+    """The interpreter before short-circuiting: every item evaluated, then all()/any()"""
+    items = conditions.get('items', []) if conditions else []
+    if not items:
+        return True
+    results = [
+        evaluate_all_items(engine, item, context) if 'operator' in item and 'items' in item
+        else engine._evaluate_single_condition(item, context)
+        for item in items
+    ]
+    return any(results) if conditions.get('operator', 'AND') == 'OR' else all(results)
+
+
+def candidate_positions(matcher, context: Dict[str, Any]) -> List[int]:
+    """Positions of the rules the index tries on the context"""
+    mask = matcher.candidate_mask(context)
+    positions = []
+    while mask:
+        lowest = mask & -mask
+        positions.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return positions
+
+
+def compare(label: str, rules: Dict[str, Dict[str, Any]], constants: Dict[str, Any], requests) -> bool:
+    engine = RuleEngine(rules, constants, RuleCompiler().compile_all(rules))
+    contexts = [(r.farm_type.value, engine._build_context(r)) for r in requests]
+    candidates = [
+        (engine.matchers[farm_type], candidate_positions(engine.matchers[farm_type], context), context)
+        for farm_type, context in contexts
+    ]
+    expected = [engine.matchers[farm_type].match(context) for farm_type, context in contexts]
+
+    def predicates():
+        for matcher, positions, context in candidates:
+            matcher_predicates = matcher.predicates
+            for position in positions:
+                matcher_predicates[position](context)
+
+    before = best_of(ROUNDS, predicates)
+    # Reordered once, explicitly, after the warm-up samples
+    optimizer = ConditionOptimizer(engine.matchers, 1, WARMUP_COUNT + 1)
+    for matcher, positions, context in candidates[:WARMUP_COUNT]:
+        optimizer.observe([matcher.rules[position] for position in positions], context)
+    optimizer.reorder()
+    after = best_of(ROUNDS, predicates)
+
+    actual = [engine.matchers[farm_type].match(context) for farm_type, context in contexts]
+    if actual != expected:
+        print(f"❌ {label}: reordered conditions change matches")
+        return False
+    tried = sum(len(positions) for _, positions, _ in candidates) / len(candidates)
+    reordered = sum(1 for _, _, tree in optimizer.rules if tree.is_reordered())
+    print(f"{label}: {len(optimizer.rules)} rules, {reordered} reordered, identical matches ✅")
+    print(f"  Predicates over {tried:.1f} candidates/request: {before / len(candidates) * 1e6:6.1f} us "
+          f"-> {after / len(candidates) * 1e6:6.1f} us ({before / after:.2f}x)")
+    return True
+
+
+def main():
+    loader = RuleLoader()
+    rules, constants = loader.load_all_rules(), loader.load_constants()
+    requests = generate_requests(rules, REQUEST_COUNT)
+
+    print("=" * 60)
+    print("CONDITION ORDER BENCHMARK")
+    print("=" * 60)
+
+    # Short-circuiting interpreter: same results, fewer conditions evaluated
+    engine = RuleEngine(rules, constants)
+    checks = [
+        (rule, engine._build_context(request))
+        for request in requests
+        for data in rules.get(request.farm_type.value, {}).values()
+        for rule in (data or {}).get('rules', [])
+    ]
+    for rule, context in checks:
+        if engine._evaluate_conditions(rule.get('conditions', {}), context) != \
+                evaluate_all_items(engine, rule.get('conditions', {}), context):
+            print(f"❌ Short-circuit result differs for {rule.get('rule_id')}")
+            return 1
+    print(f"✅ {len(checks)} rule/context checks: short-circuiting interpreter agrees")
+    full = best_of(ROUNDS, lambda: [evaluate_all_items(engine, r.get('conditions', {}), c) for r, c in checks])
+    short = best_of(ROUNDS, lambda: [engine._evaluate_conditions(r.get('conditions', {}), c) for r, c in checks])
+    print(f"  Interpreter per rule: {full / len(checks) * 1e6:.2f} us -> {short / len(checks) * 1e6:.2f} us")
+
+    if not compare("Shipped rules", rules, constants, requests):
+        return 1
+    if not compare(f"Scale x{SCALE} (thresholds)", scale_rules(rules, SCALE, vary='thresholds'), constants, requests):
+        return 1
+
+    # What sampling costs the requests that are sampled
+    engine = RuleEngine(rules, constants, RuleCompiler().compile_all(rules))
+    contexts = [(engine.matchers[r.farm_type.value].candidates(c), c)
+                for r, c in ((r, engine._build_context(r)) for r in requests)]
+    optimizer = ConditionOptimizer(engine.matchers, 1, REQUEST_COUNT * 10)
+    sampled = best_of(1, lambda: [optimizer.observe(candidates, context) for candidates, context in contexts])
+    print(f"Sampled evaluation: {sampled / len(contexts) * 1e6:.1f} us per sampled request")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
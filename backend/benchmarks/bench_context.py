@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: context built from the fields the rules read vs full model_dump()
+Run from the backend directory: python -m benchmarks.bench_context
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict
+
+from app.models.schemas import RecommendationRequest
+from app.services.context_layout import time_of_day
+from app.services.message_template import CONTEXT_SECTIONS
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 5000
+ROUNDS = 5
+PEAK_SAMPLE = 500
+
+# Sections whose None values the previous context builder kept
+KEEPS_NONE = ('weather', 'farm_components')
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def model_dump_context(request: RecommendationRequest) -> Dict[str, Any]:
+    """Context as built before layouts: every field of every section, via model_dump()"""
+    context = {
+        'farm_type': request.farm_type.value,
+        'region': request.region.value,
+        'date': request.request_date.isoformat(),
+    }
+    for section in CONTEXT_SECTIONS:
+        model = getattr(request, section)
+        if model:
+            for key, value in model.model_dump().items():
+                if value is not None or section in KEEPS_NONE:
+                    context[f'{section}.{key}'] = value
+    context['time_of_day'] = time_of_day(datetime.now().hour)
+    context['day_of_week'] = request.request_date.strftime('%A').lower()
+    return context
+
+
+def comparable(response):
+    """Response without its generation timestamp"""
+    return response.model_dump(exclude={'generated_at'})
+
+
+def allocations(build, requests) -> Dict[str, float]:
+    """Blocks and bytes per context kept alive, and mean peak bytes while building one"""
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    contexts = [build(request) for request in requests]
+    kept, _ = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks() - blocks_before
+
+    peaks = []
+    for request in requests[:PEAK_SAMPLE]:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        build(request)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    del contexts
+    return {
+        'blocks': blocks / len(requests),
+        'bytes': kept / len(requests),
+        'peak': sum(peaks) / len(peaks),
+    }
+
+
+def main():
+    loader = RuleLoader()
+    engine = RuleEngine(loader.load_all_rules(), loader.load_constants(), loader.load_compiled_rules())
+    requests = generate_requests(engine.rules, REQUEST_COUNT)
+
+    print("=" * 60)
+    print("CONTEXT CONSTRUCTION BENCHMARK")
+    print("=" * 60)
+
+    for farm_type, layout in sorted(engine.layouts.items()):
+        print(f"  {farm_type:<10} reads {len(layout.keys):3d} of {len(engine.full_layout.keys)} context keys")
+
+    # Same matches and messages from the smaller context
+    for request in requests:
+        full = model_dump_context(request)
+        context = engine._build_context(request)
+        for key, value in context.items():
+            if full.get(key) != value:
+                print(f"❌ {key}: {value!r} != {full.get(key)!r}")
+                return 1
+        if comparable(engine.evaluate_context(request, full)) != comparable(engine.evaluate(request)):
+            print(f"❌ Response differs for {request}")
+            return 1
+    print(f"✅ {len(requests)} responses identical to ones from full model_dump() contexts")
+
+    dump_time = best_of(ROUNDS, lambda: [model_dump_context(r) for r in requests])
+    layout_time = best_of(ROUNDS, lambda: [engine._build_context(r) for r in requests])
+    dump_alloc = allocations(model_dump_context, requests)
+    layout_alloc = allocations(engine._build_context, requests)
+
+    print(f"Per context ({REQUEST_COUNT} requests):")
+    print(f"  model_dump():           {dump_time / REQUEST_COUNT * 1e6:6.1f} us, "
+          f"{dump_alloc['blocks']:5.1f} blocks, {dump_alloc['bytes']:6.0f} B kept, "
+          f"{dump_alloc['peak']:6.0f} B peak")
+    print(f"  Rule field layout:      {layout_time / REQUEST_COUNT * 1e6:6.1f} us, "
+          f"{layout_alloc['blocks']:5.1f} blocks, {layout_alloc['bytes']:6.0f} B kept, "
+          f"{layout_alloc['peak']:6.0f} B peak")
+    print(f"  Speedup:                {dump_time / layout_time:6.2f}x")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
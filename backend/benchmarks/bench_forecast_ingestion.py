@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weather for many points, one request per point vs batched coordinate lists
+Checks the derived rainfall fields against the fixture responses replayed by
+the local stand-in server (benchmarks/weather_standin.py), no network needed.
+Run from the backend directory: python -m benchmarks.bench_forecast_ingestion
+"""
+
+import asyncio
+import random
+import time
+from datetime import date
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.models.schemas import CropContext, FarmType, RecommendationRequest, Region, WeatherData
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from app.services.weather_cache import WeatherCache
+from app.services.weather_service import WeatherService
+from benchmarks.weather_standin import RECORDED, WeatherStandIn
+
+
+POINT_COUNT = 200
+CONCURRENCY = 10
+LATENCY = 0.002
+
+random.seed(24)
+POINTS = [(round(random.uniform(38.5, 41.8), 4), round(random.uniform(45.0, 50.3), 4))
+          for _ in range(POINT_COUNT)]
+
+
+def expected_weather(recorded: Dict[str, Any]) -> Dict[str, Any]:
+    """The rainfall fields computed hour by hour, straight from a fixture response"""
+    now = recorded["current"]["time"]
+    hourly = recorded["hourly"]
+    last_24h = last_7days = forecast = 0.0
+    for hour, mm in zip(hourly["time"], hourly["precipitation"]):
+        mm = mm or 0.0
+        if now - 24 * 3600 < hour <= now:
+            last_24h += mm
+        if now - 7 * 24 * 3600 < hour <= now:
+            last_7days += mm
+        if now < hour <= now + 48 * 3600:
+            forecast += mm
+    return {
+        "rainfall_last_24h": round(last_24h, 1),
+        "rainfall_last_7days": round(last_7days, 1),
+        "rainfall_forecast_48h": forecast >= 1.0,
+        "rainfall_forecast_amount_mm": round(forecast, 1),
+    }
+
+
+def harvest_rules(engine: RuleEngine, weather: Dict[str, Any]) -> set:
+    """Rule ids matched for a mature, dry wheat crop in the given weather"""
+    request = RecommendationRequest(
+        farm_type=FarmType.WHEAT,
+        region=Region.MOUNTAINOUS,
+        request_date=date(2026, 7, 1),
+        weather=WeatherData(**weather),
+        crop_context=CropContext(crop_type='wheat', stage='maturity', grain_moisture=14)
+    )
+    response = engine.evaluate(request)
+    return {
+        action.rule_id
+        for group in (response.critical_alerts, response.high_priority, response.medium_priority,
+                      response.low_priority, response.info)
+        for action in group
+    }
+
+
+async def main_async() -> int:
+    server = WeatherStandIn(latency=LATENCY).start()
+    settings.WEATHER_API_URL = f"{server.base_url}/v1/forecast"
+
+    print("=" * 60)
+    print("FORECAST INGESTION BENCHMARK")
+    print("=" * 60)
+
+    service = WeatherService()
+    try:
+        # Derived fields match the fixture, one point and batched alike
+        points = [(recorded["latitude"], recorded["longitude"]) for recorded in RECORDED]
+        batched = await service.fetch_weather_batch(points)
+        for recorded, batch_weather in zip(RECORDED, batched):
+            single = await service.fetch_point_weather(recorded["latitude"], recorded["longitude"])
+            expected = expected_weather(recorded)
+            actual = {key: single[key] for key in expected}
+            if actual != expected or single != batch_weather:
+                print(f"❌ {recorded['latitude']},{recorded['longitude']}: {actual} != {expected}")
+                return 1
+            print(f"  {recorded['latitude']:6},{recorded['longitude']:6}: last 24h {actual['rainfall_last_24h']:5} mm, "
+                  f"7 days {actual['rainfall_last_7days']:5} mm, next 48h {actual['rainfall_forecast_amount_mm']:5} mm "
+                  f"({'rain' if actual['rainfall_forecast_48h'] else 'dry'})")
+        print(f"✅ Rainfall fields of {len(RECORDED)} fixture locations match the hourly series")
+
+        # The rain-ahead rule now fires from fetched weather
+        loader = RuleLoader()
+        engine = RuleEngine(loader.load_all_rules(), loader.load_constants())
+        storm = batched[-1]
+        current_only = {key: storm[key] for key in ("temperature", "humidity", "wind_speed", "frost_warning")}
+        if 'WHT_HARV_005' not in harvest_rules(engine, storm) or 'WHT_HARV_005' in harvest_rules(engine, current_only):
+            print("❌ WHT_HARV_005 (urgent harvest before rain) should fire only with the forecast fields")
+            return 1
+        print("✅ WHT_HARV_005 fires from fetched weather (never did from current-only weather)")
+
+        # One request per point vs coordinate lists
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def one(point):
+            async with semaphore:
+                await service.fetch_point_weather(*point)
+
+        server.reset()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(point) for point in POINTS))
+        per_point = time.perf_counter() - start
+        print(f"One request per point:  {per_point * 1e3:7.1f} ms for {POINT_COUNT} points, "
+              f"{server.requests} upstream requests")
+
+        server.reset()
+        start = time.perf_counter()
+        await service.fetch_weather_batch(POINTS)
+        batch = time.perf_counter() - start
+        print(f"Batched ({settings.FORECAST_BATCH_SIZE}/request):    {batch * 1e3:7.1f} ms for {POINT_COUNT} points, "
+              f"{server.requests} upstream requests ({per_point / batch:.1f}x)")
+        if server.requests != -(-POINT_COUNT // settings.FORECAST_BATCH_SIZE):
+            print("❌ Batched fetch did not use one request per batch")
+            return 1
+
+        # A batch fills the grid cell cache for later single-point reads
+        cached = WeatherService(client=service.client, cache=WeatherCache(600, settings.WEATHER_GRID_DEGREES))
+        await cached.fetch_weather_batch(POINTS)
+        server.reset()
+        await asyncio.gather(*(cached.fetch_weather_data(*point) for point in POINTS))
+        if server.requests:
+            print(f"❌ {server.requests} upstream requests after the batch filled the cache")
+            return 1
+        print(f"✅ After one batch, {POINT_COUNT} single-point reads hit the grid cell cache")
+    finally:
+        await service.close()
+        server.stop()
+
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: preload time and GC pauses with and without gc.freeze()
+Runs the production server's preload, then the same evaluation workload
+with the long-lived heap frozen and unfrozen.
+Run from the backend directory: python -m benchmarks.bench_gc_pauses
+"""
+
+import gc
+import time
+from collections import deque
+
+from app.core.gc_monitor import GCPauseMonitor
+from app.models.schemas import RecommendationRequest
+from app.serve import preload
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 20000
+FULL_COLLECTIONS = 20
+# Responses kept alive at once, standing in for in-flight requests
+IN_FLIGHT = 256
+
+
+def full_collection_ms() -> float:
+    """Best time of an explicit full collection - the cost of scanning the heap"""
+    best = float('inf')
+    for _ in range(FULL_COLLECTIONS):
+        start = time.perf_counter()
+        gc.collect()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_workload(engine, payloads) -> dict:
+    """Validate, evaluate and serialize each payload, as the POST endpoint does"""
+    in_flight = deque(maxlen=IN_FLIGHT)
+    monitor = GCPauseMonitor(window=REQUEST_COUNT)
+    monitor.start()
+    start = time.perf_counter()
+    for payload in payloads:
+        response = engine.evaluate(RecommendationRequest.model_validate(payload))
+        in_flight.append(response.model_dump(mode='json'))
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    return {'elapsed': elapsed, **monitor.stats()}
+
+
+def report(label: str, full_ms: float, result: dict):
+    print(f"{label}:")
+    print(f"  Full gc.collect():      {full_ms:8.2f} ms")
+    print(f"  {REQUEST_COUNT} evaluations:     {result['elapsed'] * 1000:8.0f} ms")
+    for name, stats in result['generations'].items():
+        print(f"  {name}: {stats['collections']:5d} collections, "
+              f"mean {stats['mean_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, "
+              f"max {stats['max_ms']:.3f} ms, total {stats['total_ms']:.1f} ms")
+
+
+def main():
+    print("=" * 60)
+    print("GC PAUSE BENCHMARK")
+    print("=" * 60)
+
+    app = preload()
+    engine = app.state.engine
+    payloads = [r.model_dump(mode='json') for r in generate_requests(engine.rules, REQUEST_COUNT)]
+    print(f"Long-lived objects frozen at preload: {gc.get_freeze_count()}")
+    run_workload(engine, payloads[:2000])  # warm-up
+
+    # Frozen: what workers forked by python -m app.serve run with
+    frozen = run_workload(engine, payloads)
+    frozen_full = full_collection_ms()
+
+    gc.unfreeze()
+    unfrozen = run_workload(engine, payloads)
+    unfrozen_full = full_collection_ms()
+
+    report("Without gc.freeze()", unfrozen_full, unfrozen)
+    report("With gc.freeze()", frozen_full, frozen)
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: threshold-interval cache keys vs exact context keys
+Run from the backend directory: python -m benchmarks.bench_intervals
+"""
+
+import asyncio
+import random
+import time
+from datetime import date
+from typing import Any, Dict
+
+from pydantic import ValidationError
+
+from app.models.schemas import CropContext, RecommendationRequest, SoilData, WeatherData
+from app.services.response_cache import ResponseCache
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+PROPERTY_REQUESTS = 3000
+PERTURBATIONS = 5
+SLIDER_REQUESTS = 20000
+
+
+def comparable(response):
+    """Response without its generation timestamp"""
+    return response.model_dump(exclude={'generated_at'})
+
+
+def same_interval_value(rng: random.Random, thresholds, value: Any) -> Any:
+    """Another number in the same threshold interval (the value itself on a threshold)"""
+    if value in thresholds:
+        return value
+    low = max((t for t in thresholds if t < value), default=value - 5)
+    high = min((t for t in thresholds if t > value), default=value + 5)
+    if isinstance(value, int):
+        candidates = [n for n in range(int(low) + 1, int(high) + 1) if low < n < high]
+        return rng.choice(candidates) if candidates else value
+    candidate = rng.uniform(low, high)
+    return candidate if low < candidate < high else value
+
+
+def perturb(rng: random.Random, engine: RuleEngine, request: RecommendationRequest) -> RecommendationRequest:
+    """Move every numeric field the rules compare to a random value in the same interval"""
+    payload = request.model_dump(mode='json')
+    canonicalizer = engine.canonicalizers[request.farm_type.value]
+    for field, thresholds in canonicalizer.thresholds.items():
+        section, _, name = field.partition('.')
+        values = payload.get(section)
+        if isinstance(values, dict) and isinstance(values.get(name), (int, float)) \
+                and not isinstance(values.get(name), bool):
+            original = values[name]
+            values[name] = same_interval_value(rng, thresholds, original)
+            try:
+                RecommendationRequest.model_validate(payload)
+            except ValidationError:
+                values[name] = original  # outside the schema's bounds
+    return RecommendationRequest.model_validate(payload)
+
+
+def slider_requests(rng: random.Random, count: int):
+    """What /recommendations/quick receives: slider positions at 0.1 resolution"""
+    stages = ['tillering', 'stem_extension', 'heading', 'grain_filling']
+    for _ in range(count):
+        yield RecommendationRequest(
+            farm_type='wheat',
+            region='aran',
+            request_date=date(2025, 6, 15),
+            weather=WeatherData(temperature=round(rng.uniform(15, 42), 1), humidity=round(rng.uniform(20, 100), 1)),
+            soil=SoilData(soil_moisture=round(rng.uniform(5, 95), 1)),
+            crop_context=CropContext(crop_type='wheat', stage=rng.choice(stages),
+                                     days_since_irrigation=rng.randint(0, 10))
+        )
+
+
+async def main_async():
+    loader = RuleLoader()
+    engine = RuleEngine(loader.load_all_rules(), loader.load_constants(), loader.load_compiled_rules(), version="v1")
+    rng = random.Random(5)
+
+    print("=" * 60)
+    print("THRESHOLD INTERVAL BENCHMARK")
+    print("=" * 60)
+    wheat = engine.canonicalizers['wheat']
+    print(f"wheat: {len(wheat.thresholds)} interval fields, {len(wheat.exact_fields)} exact fields")
+    print(f"  weather.temperature: {' | '.join(wheat.describe('weather.temperature'))}")
+
+    # Property: same intervals -> same matched rules, and the re-rendered cached
+    # response equals a fresh evaluation
+    checked = 0
+    for request in generate_requests(engine.rules, PROPERTY_REQUESTS):
+        cache = ResponseCache(max_entries=10, ttl=300)
+        await cache.get_or_evaluate(engine, request)
+        for _ in range(PERTURBATIONS):
+            other = perturb(rng, engine, request)
+            context, other_context = engine._build_context(request), engine._build_context(other)
+            if engine.match_key(context) != engine.match_key(other_context):
+                print(f"❌ Perturbed request left its intervals: {other}")
+                return 1
+            if comparable(await cache.get_or_evaluate(engine, other)) != comparable(engine.evaluate(other)):
+                print(f"❌ Cached response differs for {other}")
+                return 1
+            checked += 1
+    print(f"✅ {checked} same-interval variants: cached responses identical to RuleEngine.evaluate")
+
+    requests = list(slider_requests(rng, SLIDER_REQUESTS))
+    contexts = [engine._build_context(r) for r in requests]
+    exact_keys = {tuple(sorted((k, str(v)) for k, v in c.items())) for c in contexts}
+    interval_keys = {engine.match_key(c) for c in contexts}
+    print(f"Quick-endpoint slider inputs, {SLIDER_REQUESTS} requests:")
+    print(f"  Distinct exact contexts:    {len(exact_keys):6d} (hit rate {1 - len(exact_keys) / SLIDER_REQUESTS:6.1%})")
+    print(f"  Distinct interval keys:     {len(interval_keys):6d} (hit rate {1 - len(interval_keys) / SLIDER_REQUESTS:6.1%})")
+
+    start = time.perf_counter()
+    for request in requests:
+        engine.evaluate(request)
+    uncached_time = time.perf_counter() - start
+
+    cache = ResponseCache(max_entries=10000, ttl=300)
+    start = time.perf_counter()
+    for request in requests:
+        await cache.get_or_evaluate(engine, request)
+    cached_time = time.perf_counter() - start
+    print(f"  Uncached:                   {SLIDER_REQUESTS / uncached_time:6.0f} req/s")
+    print(f"  Interval-keyed cache:       {SLIDER_REQUESTS / cached_time:6.0f} req/s "
+          f"({uncached_time / cached_time:.2f}x, hit rate {cache.stats()['hit_rate']:.1%})")
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: client IP to location from the geolocation API vs the local range table
+The table is synthetic (random ranges over IPv4 and IPv6); the API is the local stand-in.
+Run from the backend directory: python -m benchmarks.bench_ip_resolver
+"""
+
+import asyncio
+import ipaddress
+import random
+import tempfile
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.ip_resolver import IPLocator, NetworkResolver, RangeTableResolver, write_range_table
+from app.services.weather_service import create_http_client
+from benchmarks.weather_standin import WeatherStandIn
+
+
+RANGE_COUNT = 200000
+LOOKUP_COUNT = 20000
+NETWORK_COUNT = 200
+LATENCY = 0.002
+ROUNDS = 5
+
+CITIES = [
+    ("Bakı", "Bakı", 40.4093, 49.8671), ("Gəncə", "Gəncə", 40.6828, 46.3606),
+    ("Lənkəran", "Lənkəran", 38.7543, 48.8506), ("Şəki", "Şəki", 41.1919, 47.1706),
+    ("Quba", "Quba", 41.3611, 48.5134), ("Sumqayıt", "Abşeron", 40.5897, 49.6686),
+]
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def generate_ranges(count: int) -> List[Tuple[int, int, int, Dict[str, Any]]]:
+    """Non-overlapping (version, first, last, row) ranges with gaps, 90% IPv4"""
+    random.seed(7)
+    ranges = []
+    for version, share, bits in ((4, 0.9, 32), (6, 0.1, 128)):
+        n = int(count * share)
+        step = 2 ** bits // n
+        for i in range(n):
+            first = i * step + random.randrange(step // 4)
+            last = first + random.randrange(1, step // 2)
+            city, region, latitude, longitude = random.choice(CITIES)
+            country = "Azerbaijan" if random.random() < 0.8 else "Georgia"
+            ranges.append((version, first, last, {
+                "start": str(ipaddress.ip_address(first) if version == 4 else ipaddress.IPv6Address(first)),
+                "end": str(ipaddress.ip_address(last) if version == 4 else ipaddress.IPv6Address(last)),
+                "country": country, "region": region, "city": city,
+                "latitude": latitude, "longitude": longitude,
+            }))
+    return ranges
+
+
+def sample_addresses(ranges, count: int) -> List[str]:
+    """Addresses inside ranges, at their edges, and in the gaps between them"""
+    addresses = []
+    for _ in range(count):
+        version, first, last, _ = random.choice(ranges)
+        value = random.choice([first, last, last + 1, first - 1, random.randint(first, last)])
+        addresses.append(str(ipaddress.IPv4Address(value) if version == 4 else ipaddress.IPv6Address(value)))
+    return addresses
+
+
+def reference_lookup(index: Dict[int, Tuple[List[int], List[int], List[Dict]]], address: str) -> Optional[Dict]:
+    """Plain bisect over integer lists per address family"""
+    ip = ipaddress.ip_address(address)
+    firsts, lasts, rows = index[ip.version]
+    i = bisect_right(firsts, int(ip)) - 1
+    if i < 0 or int(ip) > lasts[i]:
+        return None
+    return rows[i]
+
+
+async def main_async() -> int:
+    print("=" * 60)
+    print("IP RESOLVER BENCHMARK")
+    print("=" * 60)
+
+    ranges = generate_ranges(RANGE_COUNT)
+    index = {}
+    for version in (4, 6):
+        family = sorted(r for r in ranges if r[0] == version)
+        index[version] = ([r[1] for r in family], [r[2] for r in family], [r[3] for r in family])
+    addresses = sample_addresses(ranges, LOOKUP_COUNT)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'ip-ranges.bin'
+        start = time.perf_counter()
+        write_range_table(path, (r[3] for r in ranges))
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        table = RangeTableResolver(path)
+        opened = time.perf_counter() - start
+        print(f"Table: {table.ranges} ranges, {len(table.locations)} locations, "
+              f"{path.stat().st_size / 1e6:.1f} MB, built in {built:.2f} s, opened in {opened * 1e3:.2f} ms")
+
+        for address in addresses:
+            expected = reference_lookup(index, address)
+            actual = table.lookup(address)
+            if (expected is None) != (actual is None) or \
+                    (actual is not None and (actual["city"], actual["country"]) != (expected["city"], expected["country"])):
+                print(f"❌ {address}: {actual} != {expected}")
+                return 1
+        print(f"✅ {len(addresses)} addresses (inside, at and between ranges) match a plain bisect, "
+              f"{table.found / table.lookups:.0%} found")
+
+        lookup = best_of(ROUNDS, lambda: [table.lookup(address) for address in addresses])
+        print(f"Range table lookup:      {lookup / len(addresses) * 1e6:8.2f} us/address")
+
+        locator = IPLocator([table], len(addresses))
+        for address in addresses:
+            await locator.resolve(address)
+
+        hit = float('inf')
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for address in addresses:
+                await locator.resolve(address)
+            hit = min(hit, time.perf_counter() - start)
+        print(f"LRU cache hit:           {hit / len(addresses) * 1e6:8.2f} us/address")
+
+        server = WeatherStandIn(latency=LATENCY).start()
+        client = create_http_client()
+        try:
+            network = NetworkResolver(client, f"{server.base_url}/{{ip}}/json/")
+            start = time.perf_counter()
+            for address in addresses[:NETWORK_COUNT]:
+                await network.resolve(address)
+            elapsed = time.perf_counter() - start
+            print(f"Geolocation API:         {elapsed / NETWORK_COUNT * 1e6:8.2f} us/address "
+                  f"(stand-in with {LATENCY * 1e3:.0f} ms latency, pooled client)")
+        finally:
+            await client.aclose()
+            server.stop()
+        table.close()
+
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
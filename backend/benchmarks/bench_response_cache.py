@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response cache hit rate, throughput, coalescing and invalidation
+Run from the backend directory: python -m benchmarks.bench_response_cache
+"""
+
+import asyncio
+import random
+import time
+
+from app.services.response_cache import ResponseCache
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+DISTINCT_CONTEXTS = 500
+REQUEST_COUNT = 20000
+
+
+def comparable(response):
+    """Response without its generation timestamp"""
+    return response.model_dump(exclude={'generated_at'})
+
+
+async def run_cached(cache: ResponseCache, engine: RuleEngine, requests) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        await cache.get_or_evaluate(engine, request)
+    return time.perf_counter() - start
+
+
+async def main_async():
+    loader = RuleLoader()
+    engine = RuleEngine(loader.load_all_rules(), loader.load_constants(), loader.load_compiled_rules(), version="v1")
+
+    print("=" * 60)
+    print("RESPONSE CACHE BENCHMARK")
+    print("=" * 60)
+
+    # Farmers repeat a limited set of contexts, some much more often than others
+    distinct = generate_requests(engine.rules, DISTINCT_CONTEXTS)
+    rng = random.Random(11)
+    weights = [1 / (rank + 1) for rank in range(len(distinct))]
+    requests = rng.choices(distinct, weights=weights, k=REQUEST_COUNT)
+
+    cache = ResponseCache(max_entries=10000, ttl=300)
+    for request in distinct:
+        if comparable(await cache.get_or_evaluate(engine, request)) != comparable(engine.evaluate(request)):
+            print("❌ Cached response differs from RuleEngine.evaluate")
+            return 1
+    print(f"✅ {len(distinct)} cached responses identical to RuleEngine.evaluate")
+
+    start = time.perf_counter()
+    for request in requests:
+        engine.evaluate(request)
+    uncached_time = time.perf_counter() - start
+
+    for max_entries in (10000, 100):
+        cache = ResponseCache(max_entries=max_entries, ttl=300)
+        cached_time = await run_cached(cache, engine, requests)
+        stats = cache.stats()
+        print(f"Cache of {max_entries} entries, {REQUEST_COUNT} requests over {DISTINCT_CONTEXTS} contexts:")
+        print(f"  Hit rate:               {stats['hit_rate']:8.1%} ({stats['evictions']} evictions)")
+        print(f"  Memory:                 {stats['approx_bytes'] / 1024:8.0f} KB serialized "
+              f"({stats['approx_bytes'] / max(stats['entries'], 1):.0f} B/entry)")
+        print(f"  Uncached:               {REQUEST_COUNT / uncached_time:8.0f} req/s")
+        print(f"  Cached:                 {REQUEST_COUNT / cached_time:8.0f} req/s "
+              f"({uncached_time / cached_time:.2f}x)")
+
+    # Hits are copies with their own generated_at
+    cache = ResponseCache(max_entries=100, ttl=300)
+    first = await cache.get_or_evaluate(engine, distinct[0])
+    second = await cache.get_or_evaluate(engine, distinct[0])
+    print(f"Repeated request: {cache.stats()['hits']} hit, own copy: {first is not second}, "
+          f"newer generated_at: {second.generated_at > first.generated_at}")
+
+    # Identical misses in flight together evaluate once
+    cache = ResponseCache(max_entries=100, ttl=300)
+    evaluations = 0
+    evaluate_context = engine.evaluate_context
+
+    def counted(request, context):
+        nonlocal evaluations
+        evaluations += 1
+        return evaluate_context(request, context)
+    engine.evaluate_context = counted
+    burst = await asyncio.gather(*(cache.get_or_evaluate(engine, distinct[1]) for _ in range(50)))
+    del engine.evaluate_context
+    identical = all(comparable(response) == comparable(burst[0]) for response in burst)
+    print(f"50 concurrent identical misses: {evaluations} evaluation, {cache.stats()['coalesced']} coalesced, "
+          f"identical responses: {identical}")
+
+    # A new ruleset version empties the cache
+    engine.version = "v2"
+    await cache.get_or_evaluate(engine, distinct[0])
+    stats = cache.stats()
+    print(f"After a version change: {stats['invalidations']} invalidation, {stats['misses']} misses")
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
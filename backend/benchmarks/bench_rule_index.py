@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: discrimination index vs linear scan over compiled rules
+Run from the backend directory: python -m benchmarks.bench_rule_index
+"""
+
+import time
+from typing import Dict, List, Any
+
+from app.services.rule_compiler import CompiledRule
+from app.services.rule_engine import RuleEngine
+from app.services.rule_index import RuleIndex
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests, scale_rules
+
+
+REQUEST_COUNT = 1000
+ROUNDS = 5
+SCALE_FACTORS = [1, 10, 40]
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def linear_matches(farm_rules: List[CompiledRule], context: Dict[str, Any]) -> List[str]:
+    return [c.rule['rule_id'] for c in farm_rules if c.matches(context)]
+
+
+def indexed_matches(index: RuleIndex, context: Dict[str, Any]) -> List[str]:
+    return [c.rule['rule_id'] for c in index.candidates(context) if c.matches(context)]
+
+
+def main():
+    loader = RuleLoader()
+    base_rules = loader.load_all_rules()
+    constants = loader.load_constants()
+    engine = RuleEngine(base_rules, constants)
+    requests = generate_requests(base_rules, REQUEST_COUNT)
+    contexts = [(r.farm_type.value, engine._build_context(r)) for r in requests]
+
+    print("=" * 60)
+    print("RULE INDEX BENCHMARK")
+    print("=" * 60)
+
+    for factor in SCALE_FACTORS:
+        rules = scale_rules(base_rules, factor) if factor > 1 else base_rules
+        indexes = RuleEngine(rules, constants, evaluation_mode='indexed').matchers
+        flat = {ft: index.rules for ft, index in indexes.items()}
+        total_rules = sum(len(r) for r in flat.values())
+
+        candidates = 0
+        for farm_type, context in contexts:
+            index = indexes[farm_type]
+            if indexed_matches(index, dict(context)) != linear_matches(flat[farm_type], dict(context)):
+                print(f"❌ Mismatch at scale x{factor} for {farm_type}")
+                return 1
+            candidates += len(index.candidates(context))
+
+        linear = best_of(ROUNDS, lambda: [linear_matches(flat[f], dict(c)) for f, c in contexts])
+        indexed = best_of(ROUNDS, lambda: [indexed_matches(indexes[f], dict(c)) for f, c in contexts])
+
+        per_request = lambda t: t / len(contexts) * 1e6
+        print(f"Scale x{factor}: {total_rules} rules, identical matches ✅")
+        print(f"  Avg candidates per request: {candidates / len(contexts):8.1f}")
+        print(f"  Linear scan:                {per_request(linear):8.2f} µs/request")
+        print(f"  Indexed:                    {per_request(indexed):8.2f} µs/request")
+        print(f"  Speedup:                    {linear / indexed:8.2f}x")
+
+    # End-to-end check on the shipped rules: evaluate() vs the JSON interpreter
+    for request, (farm_type, context) in zip(requests, contexts):
+        expected = sorted(
+            rule['rule_id']
+            for category, category_data in base_rules[farm_type].items()
+            for rule in category_data.get('rules', [])
+            if engine._is_rule_enabled(rule) and engine._evaluate_rule(rule, context, category)[0]
+        )
+        response = engine.evaluate(request)
+        groups = [response.critical_alerts, response.high_priority, response.medium_priority,
+                  response.low_priority, response.info]
+        if sorted(a.rule_id for group in groups for a in group) != expected:
+            print(f"❌ evaluate() differs from interpreter for {farm_type}")
+            return 1
+    print("✅ evaluate() agrees with the JSON interpreter on shipped rules")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rule search index vs the previous linear substring scan
+Run from the backend directory: python -m benchmarks.bench_rule_search
+"""
+
+import re
+import time
+from typing import Any, Dict, List
+
+from app.services.rule_loader import RuleLoader
+from app.services.rule_search import RuleSearchIndex, fold
+
+
+QUERIES = [
+    "suvarma", "irrigation", "istilik", "İstilik", "ISTILIK", "təcili", "TƏCILI",
+    "heat stress", "wht_irr", "irr_001", "xəstəlik", "disease", "yem", "don",
+    "irigation", "suvarmma", "fungicde", "zzz",
+]
+ROUNDS = 5
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def linear_scan(rules: Dict[str, Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
+    """The search before the index: a lower() substring match over five fields"""
+    keyword_lower = keyword.lower()
+    results = []
+    for farm_type, categories in rules.items():
+        for category, data in categories.items():
+            if data and 'rules' in data:
+                for rule in data['rules']:
+                    searchable = [
+                        rule.get('name_az', ''),
+                        rule.get('name_en', ''),
+                        rule.get('message_az', ''),
+                        rule.get('message_en', ''),
+                        rule.get('rule_id', '')
+                    ]
+                    if any(keyword_lower in s.lower() for s in searchable):
+                        results.append({'farm_type': farm_type, 'category': category, **rule})
+    return results
+
+
+def word_prefix_scan(rules: Dict[str, Dict[str, Any]], word: str) -> set:
+    """Rule ids where some folded word of the old fields starts with the folded query"""
+    pattern = re.compile(r'(?<![^\W_])' + re.escape(fold(word)))
+    found = set()
+    for categories in rules.values():
+        for data in categories.values():
+            for rule in (data or {}).get('rules', []):
+                fields = ('name_az', 'name_en', 'message_az', 'message_en', 'rule_id')
+                if any(pattern.search(fold(str(rule.get(f) or ''))) for f in fields):
+                    found.add(rule['rule_id'])
+    return found
+
+
+def main():
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+
+    print("=" * 60)
+    print("RULE SEARCH BENCHMARK")
+    print("=" * 60)
+
+    index = RuleSearchIndex(rules)
+    total, _ = index.search("")
+    if total != sum(len((d or {}).get('rules', [])) for c in rules.values() for d in c.values()):
+        print(f"❌ Blank query listed {total} rules")
+        return 1
+
+    # Whatever the old scan found by a word start, the index finds too
+    for query in QUERIES:
+        for word in query.split():
+            expected = word_prefix_scan(rules, word)
+            found = {r['rule_id'] for r in index.search(word)[1]}
+            if not expected <= found:
+                print(f"❌ '{word}' misses {sorted(expected - found)}")
+                return 1
+    print(f"✅ Index finds every word-start match of the old scan ({len(QUERIES)} queries)")
+
+    print(f"{'Query':<14} {'old':>5} {'index':>6} {'old us':>8} {'index us':>9}  top match")
+    for query in QUERIES:
+        old = linear_scan(rules, query)
+        total, top = index.search(query, 0, 1)
+        old_us = best_of(ROUNDS, lambda: linear_scan(rules, query)) * 1e6
+        new_us = best_of(ROUNDS, lambda: index.search(query, 0, 20)) * 1e6
+        print(f"{query:<14} {len(old):5d} {total:6d} {old_us:8.0f} {new_us:9.0f}  "
+              f"{top[0]['rule_id'] if top else '-'}")
+
+    full = best_of(ROUNDS, lambda: RuleSearchIndex(rules).typo_lookup())
+    postings = best_of(ROUNDS, lambda: RuleSearchIndex(rules))
+    index.typo_lookup()
+    incremental = best_of(ROUNDS, lambda: RuleSearchIndex(rules, index).typo_lookup())
+    stats = index.stats()
+    print(f"Index: {stats['rules']} rules, {stats['words']} words, {stats['typo_variants']} typo variants")
+    print(f"Build: {postings * 1000:.1f} ms words, {full * 1000:.1f} ms with typo lookup, "
+          f"{incremental * 1000:.1f} ms reusing the previous index")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
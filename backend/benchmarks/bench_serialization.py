@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FAST_RESPONSES serialization and decoding vs the FastAPI defaults
+Run from the backend directory: python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import dataclasses
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.fast_json import model_response, orjson
+from app.models.schemas import BatchItemResult, BatchRecommendationResponse, RecommendationResponse
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 2000
+ROUNDS = 5
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def response_model_body(field, response) -> bytes:
+    """What FastAPI sends for an endpoint with response_model: validate, serialize, json.dumps"""
+    return JSONResponse(await serialize_response(field=field, response_content=response)).body
+
+
+def main():
+    loader = RuleLoader()
+    rules, constants, compiled = loader.load_all_rules(), loader.load_constants(), loader.load_compiled_rules()
+    engine = RuleEngine(rules, constants, compiled)
+    # Same rules without the validated action templates: every match validates its action
+    unvalidated = {
+        farm_type: {
+            category: [dataclasses.replace(compiled_rule, action=None) for compiled_rule in category_rules]
+            for category, category_rules in categories.items()
+        }
+        for farm_type, categories in compiled.items()
+    }
+    validating_engine = RuleEngine(rules, constants, unvalidated)
+    requests = generate_requests(rules, REQUEST_COUNT)
+    responses = [engine.evaluate(request) for request in requests]
+    batch = BatchRecommendationResponse(
+        total=len(responses), succeeded=len(responses), failed=0, executor='inline', chunk_size=64,
+        results=[BatchItemResult(index=i, ok=True, response=r) for i, r in enumerate(responses)]
+    )
+
+    print("=" * 60)
+    print("SERIALIZATION BENCHMARK")
+    print("=" * 60)
+
+    loop = asyncio.new_event_loop()
+    field = create_response_field(name="Response", type_=RecommendationResponse, mode="serialization")
+    batch_field = create_response_field(name="Response", type_=BatchRecommendationResponse, mode="serialization")
+
+    # Byte-compatible with both default encoders
+    for request, response in zip(requests, responses):
+        fast = model_response(response).body
+        if fast != loop.run_until_complete(response_model_body(field, response)) \
+                or fast != JSONResponse(jsonable_encoder(response)).body:
+            print(f"❌ Serialized bytes differ for {request}")
+            return 1
+        same_rules = validating_engine.evaluate(request).model_copy(update={'generated_at': response.generated_at})
+        if model_response(same_rules).body != fast:
+            print(f"❌ Validated actions serialize differently for {request}")
+            return 1
+    if model_response(batch).body != loop.run_until_complete(response_model_body(batch_field, batch)):
+        print("❌ Batch response bytes differ")
+        return 1
+    print(f"✅ {len(responses)} responses and a batch of them serialize byte-identically")
+
+    sizes = sum(len(model_response(r).body) for r in responses) / len(responses)
+    print(f"Per response ({REQUEST_COUNT} responses, {sizes:.0f} B average):")
+    timings = [
+        ("Evaluate, validated actions", lambda: [validating_engine.evaluate(r) for r in requests]),
+        ("Evaluate, action templates", lambda: [engine.evaluate(r) for r in requests]),
+        ("response_model + json.dumps", lambda: [loop.run_until_complete(response_model_body(field, r)) for r in responses]),
+        ("jsonable_encoder + json.dumps", lambda: [JSONResponse(jsonable_encoder(r)).body for r in responses]),
+        ("model_dump_json (FAST_RESPONSES)", lambda: [model_response(r).body for r in responses]),
+    ]
+    for label, fn in timings:
+        print(f"  {label + ':':<34} {best_of(ROUNDS, fn) / REQUEST_COUNT * 1e6:7.1f} us")
+
+    body = json.dumps({'requests': [r.model_dump(mode='json') for r in requests]}).encode()
+    print(f"Batch body of {REQUEST_COUNT} requests ({len(body) // 1024} KB), per item:")
+    print(f"  {'json.loads:':<34} {best_of(ROUNDS, lambda: json.loads(body)) / REQUEST_COUNT * 1e6:7.1f} us")
+    if orjson is not None:
+        print(f"  {'orjson.loads (FAST_RESPONSES):':<34} "
+              f"{best_of(ROUNDS, lambda: orjson.loads(body)) / REQUEST_COUNT * 1e6:7.1f} us")
+    loop.close()
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
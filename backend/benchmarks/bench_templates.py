@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precompiled message templates vs per-match regex substitution
+Run from the backend directory: python -m benchmarks.bench_templates
+"""
+
+import time
+
+from app.services.rule_compiler import RuleCompiler
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 1000
+ROUNDS = 5
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+    compiler = RuleCompiler()
+    compiled = compiler.compile_all(rules)
+    engine = RuleEngine(rules, loader.load_constants(), compiled)
+    requests = generate_requests(rules, REQUEST_COUNT)
+
+    print("=" * 60)
+    print("MESSAGE TEMPLATE BENCHMARK")
+    print("=" * 60)
+
+    for placeholder in compiler.unknown_placeholders:
+        print(f"⚠️ Unknown placeholder {placeholder}")
+
+    # Render every template of every farm type's rules against every context
+    pairs = []
+    for request in requests:
+        context = engine._build_context(request)
+        for category_rules in compiled[request.farm_type.value].values():
+            for compiled_rule in category_rules:
+                for key in ('message_az', 'message_en'):
+                    template = getattr(compiled_rule, key)
+                    if template is not None:
+                        pairs.append((template, compiled_rule.rule.get(key, ''), context))
+
+    for template, source, context in pairs:
+        if template.render(context) != engine._process_template(source, context):
+            print(f"❌ Rendering differs for {source!r}")
+            return 1
+    print(f"✅ {len(pairs)} renders identical to RuleEngine._process_template")
+
+    regex_time = best_of(ROUNDS, lambda: [engine._process_template(s, c) for _, s, c in pairs])
+    compiled_time = best_of(ROUNDS, lambda: [t.render(c) for t, _, c in pairs])
+    per_render = lambda t: t / len(pairs) * 1e6
+    print(f"  Regex substitution:     {per_render(regex_time):8.3f} µs/message")
+    print(f"  Precompiled template:   {per_render(compiled_time):8.3f} µs/message")
+    print(f"  Speedup:                {regex_time / compiled_time:8.2f}x")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sorted threshold index for numeric conditions
+Run from the backend directory: python -m benchmarks.bench_thresholds
+"""
+
+import time
+from typing import Dict, List, Any
+
+from app.services.rule_compiler import RuleCompiler
+from app.services.rule_engine import RuleEngine
+from app.services.rule_index import RuleIndex, threshold_constraints
+from app.services.rule_loader import RuleLoader
+from app.services.threshold_index import FieldThresholds, ThresholdIndex, THRESHOLD_OPERATORS
+from benchmarks.scenarios import generate_requests, scale_rules
+
+
+REQUEST_COUNT = 1000
+ROUNDS = 5
+SCALE_FACTORS = [(1, 'constants'), (10, 'constants'), (40, 'constants'), (10, 'thresholds'), (40, 'thresholds')]
+
+
+class EqualityOnlyIndex(RuleIndex):
+    """RuleIndex without the numeric threshold stage"""
+
+    def __init__(self, compiled_rules):
+        super().__init__(compiled_rules)
+        self.thresholds = ThresholdIndex([])
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def indexed_matches(index: RuleIndex, context: Dict[str, Any]) -> List[str]:
+    return [c.rule['rule_id'] for c in index.candidates(context) if c.matches(context)]
+
+
+def verify_edge_values(rules: Dict[str, Dict[str, Any]]) -> int:
+    """Check every atom at, just below and just above each threshold against the interpreter"""
+    engine = RuleEngine.__new__(RuleEngine)
+    fields: Dict[str, FieldThresholds] = {}
+    for categories in rules.values():
+        for category_data in categories.values():
+            for rule in category_data.get('rules', []):
+                stack = [rule.get('conditions', {})]
+                while stack:
+                    block = stack.pop()
+                    for item in block.get('items', []):
+                        if 'items' in item:
+                            stack.append(item)
+                        elif item.get('operator') in THRESHOLD_OPERATORS:
+                            try:
+                                threshold = float(item['value'])
+                            except ValueError:
+                                continue
+                            field = item['field']
+                            fields.setdefault(field, FieldThresholds(field)).add(item['operator'], threshold)
+
+    checked = 0
+    for field, field_thresholds in fields.items():
+        field_thresholds.freeze()
+        probes = [None, 'n/a', float('nan'), True, -1e9, 1e9]
+        for _, threshold in field_thresholds.atoms:
+            probes += [threshold, threshold - 0.5, threshold + 0.5, int(threshold), str(threshold)]
+        for value in probes:
+            mask = field_thresholds.satisfied(value)
+            for (op, threshold), bit in field_thresholds.atoms.items():
+                condition = {'field': field, 'operator': op, 'value': threshold}
+                expected = engine._evaluate_single_condition(condition, {field: value})
+                if bool(mask & bit) != expected:
+                    raise AssertionError(f"{field} {op} {threshold} with {value!r}")
+                checked += 1
+    return checked
+
+
+def main():
+    loader = RuleLoader()
+    base_rules = loader.load_all_rules()
+    engine = RuleEngine(base_rules, loader.load_constants())
+    requests = generate_requests(base_rules, REQUEST_COUNT)
+    contexts = [(r.farm_type.value, engine._build_context(r)) for r in requests]
+
+    print("=" * 60)
+    print("THRESHOLD INDEX BENCHMARK")
+    print("=" * 60)
+    print(f"✅ {verify_edge_values(base_rules)} atom/edge-value checks agree with the interpreter")
+
+    for factor, vary in SCALE_FACTORS:
+        rules = scale_rules(base_rules, factor, vary) if factor > 1 else base_rules
+        compiled = RuleCompiler().compile_all(rules)
+        flat = {ft: [c for rs in cats.values() for c in rs] for ft, cats in compiled.items()}
+        equality = {ft: EqualityOnlyIndex(rs) for ft, rs in flat.items()}
+        indexed = {ft: RuleIndex(rs) for ft, rs in flat.items()}
+
+        required_atoms = sum(
+            len(atoms)
+            for rs in flat.values() for c in rs
+            for atoms in threshold_constraints(c.rule.get('conditions', {})).values()
+        )
+        numeric_fields = sum(len(index.thresholds.indexed_fields) for index in indexed.values())
+
+        equality_candidates = threshold_candidates = 0
+        for farm_type, context in contexts:
+            expected = [c.rule['rule_id'] for c in flat[farm_type] if c.matches(context)]
+            if indexed_matches(indexed[farm_type], context) != expected:
+                print(f"❌ Mismatch at scale x{factor} ({vary}) for {farm_type}")
+                return 1
+            equality_candidates += len(equality[farm_type].candidates(context))
+            threshold_candidates += len(indexed[farm_type].candidates(context))
+
+        equality_time = best_of(ROUNDS, lambda: [indexed_matches(equality[f], c) for f, c in contexts])
+        threshold_time = best_of(ROUNDS, lambda: [indexed_matches(indexed[f], c) for f, c in contexts])
+
+        per_request = lambda t: t / len(contexts) * 1e6
+        n = len(contexts)
+        print(f"Scale x{factor} ({vary}): {sum(len(r) for r in flat.values())} rules, {required_atoms} required "
+              f"numeric atoms on {numeric_fields} fields, identical matches ✅")
+        print(f"  Candidates (equality index):        {equality_candidates / n:8.1f} /request")
+        print(f"  Candidates (+ threshold index):     {threshold_candidates / n:8.1f} /request")
+        print(f"  Equality index only:                {per_request(equality_time):8.2f} µs/request")
+        print(f"  Equality + threshold index:         {per_request(threshold_time):8.2f} µs/request")
+        print(f"  Speedup:                            {equality_time / threshold_time:8.2f}x")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
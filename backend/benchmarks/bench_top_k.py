@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: top_k / min_urgency evaluation vs evaluating every rule
+Run from the backend directory: python -m benchmarks.bench_top_k
+"""
+
+import time
+from typing import Dict, List, Tuple
+
+from app.models.schemas import RecommendationAction, RecommendationResponse
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests, scale_rules
+
+
+REQUEST_COUNT = 3000
+ROUNDS = 5
+LIMITS = [(None, None), (3, None), (5, None), (None, 80), (3, 70)]
+# Per-region tuned variants of every rule: many more rules match each request
+SCALE = 10
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def actions(response: RecommendationResponse) -> List[RecommendationAction]:
+    return (response.critical_alerts + response.high_priority + response.medium_priority
+            + response.low_priority + response.info)
+
+
+def expected_top(full: RecommendationResponse, load_order: Dict[Tuple[str, str], int],
+                 top_k, min_urgency) -> List[RecommendationAction]:
+    """The full response's recommendations as the old engine ranked them, cut to the limits"""
+    farm_type = full.farm_type.value
+    ranked = sorted(actions(full), key=lambda a: (-a.urgency_score, load_order[(farm_type, a.rule_id)]))
+    if min_urgency is not None:
+        ranked = [a for a in ranked if a.urgency_score >= min_urgency]
+    return ranked[:top_k]
+
+
+def print_timings(label: str, engines: Dict[str, RuleEngine], requests):
+    matched = sum(engines['index'].evaluate(r).total_recommendations for r in requests) / len(requests)
+    print(f"{label}, per request ({matched:.1f} matching rules on average):")
+    print(f"  {'top_k':>6} {'min_urgency':>12} {'shown':>6} {'index us':>9} {'bitset us':>10}")
+    for top_k, min_urgency in LIMITS:
+        limited = [r.model_copy(update={'top_k': top_k, 'min_urgency': min_urgency}) for r in requests]
+        shown = sum(engines['index'].evaluate(r).total_recommendations for r in limited) / len(requests)
+        timings = [
+            best_of(ROUNDS, lambda: [engine.evaluate(r) for r in limited]) / len(requests) * 1e6
+            for engine in engines.values()
+        ]
+        print(f"  {str(top_k):>6} {str(min_urgency):>12} {shown:6.1f} {timings[0]:9.1f} {timings[1]:10.1f}")
+
+
+def main():
+    loader = RuleLoader()
+    rules, constants, compiled = loader.load_all_rules(), loader.load_constants(), loader.load_compiled_rules()
+    engines = {mode: RuleEngine(rules, constants, compiled, evaluation_mode=mode) for mode in ('index', 'bitset')}
+    requests = generate_requests(rules, REQUEST_COUNT)
+    load_order = {
+        (farm_type, compiled_rule.rule.get('rule_id', '')): position
+        for farm_type, categories in compiled.items()
+        for position, compiled_rule in enumerate(
+            c for category_rules in categories.values() for c in category_rules
+        )
+    }
+
+    print("=" * 60)
+    print("TOP-K EVALUATION BENCHMARK")
+    print("=" * 60)
+
+    # Limited responses hold exactly the most urgent recommendations of the full one
+    for mode, engine in engines.items():
+        for request in requests:
+            full = engine.evaluate(request)
+            for top_k, min_urgency in LIMITS[1:]:
+                limited = engine.evaluate(request.model_copy(update={'top_k': top_k, 'min_urgency': min_urgency}))
+                expected = expected_top(full, load_order, top_k, min_urgency)
+                shown = expected_top(limited, load_order, None, None)
+                if shown != expected or limited.total_recommendations != len(expected):
+                    print(f"❌ {mode}: top_k={top_k} min_urgency={min_urgency} differs for {request}")
+                    return 1
+    print(f"✅ {REQUEST_COUNT} requests x {len(LIMITS) - 1} limits: the most urgent matches, identical actions")
+
+    print_timings("Shipped rules", engines, requests)
+    scaled = scale_rules(rules, SCALE, vary='thresholds')
+    scaled_engines = {mode: RuleEngine(scaled, constants, evaluation_mode=mode) for mode in ('index', 'bitset')}
+    print_timings(f"Scale x{SCALE} (thresholds)", scaled_engines, requests)
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
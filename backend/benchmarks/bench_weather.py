@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weather fetches with a client per request vs a pooled client and grid cache
+Runs against the local stand-in server (benchmarks/weather_standin.py), no network needed.
+Run from the backend directory: python -m benchmarks.bench_weather
+"""
+
+import asyncio
+import random
+import time
+
+from app.core.config import settings
+from app.services.weather_cache import WeatherCache
+from app.services.weather_service import WeatherService
+from benchmarks.weather_standin import WeatherStandIn
+
+
+REQUEST_COUNT = 300
+CONCURRENCY = 10
+BURST = 50
+LATENCY = 0.002
+
+# Request points scattered over Azerbaijan
+random.seed(42)
+POINTS = [(round(random.uniform(38.5, 41.8), 4), round(random.uniform(45.0, 50.3), 4))
+          for _ in range(REQUEST_COUNT)]
+
+
+async def run(fetch_one) -> float:
+    """Fetch every point, CONCURRENCY at a time; returns the elapsed seconds"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def fetch(point):
+        async with semaphore:
+            await fetch_one(*point)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(point) for point in POINTS))
+    return time.perf_counter() - start
+
+
+async def per_request_client(latitude: float, longitude: float):
+    """What /weather/auto did before: a new service (and client) for every request"""
+    service = WeatherService()
+    try:
+        await service.fetch_weather_data(latitude, longitude)
+    finally:
+        await service.close()
+
+
+def report(label: str, elapsed: float, server: WeatherStandIn):
+    print(f"{label:<28} {elapsed / REQUEST_COUNT * 1e3:6.2f} ms/request, "
+          f"{server.requests:4} upstream requests, {server.connections:4} connections")
+
+
+async def main_async() -> int:
+    server = WeatherStandIn(latency=LATENCY).start()
+    settings.WEATHER_API_URL = f"{server.base_url}/v1/forecast"
+    settings.IP_GEOLOCATION_URL = f"{server.base_url}/{{ip}}/json/"
+
+    print("=" * 60)
+    print("WEATHER CLIENT BENCHMARK")
+    print("=" * 60)
+    print(f"{REQUEST_COUNT} requests, {CONCURRENCY} concurrent, {LATENCY * 1e3:.0f} ms stand-in latency")
+
+    try:
+        server.reset()
+        report("Client per request", await run(per_request_client), server)
+
+        pooled = WeatherService()
+        server.reset()
+        report("Pooled client", await run(pooled.fetch_weather_data), server)
+        if server.connections > CONCURRENCY:
+            print(f"❌ Pooled client opened {server.connections} connections")
+            return 1
+        await pooled.close()
+
+        cache = WeatherCache(settings.WEATHER_CACHE_TTL, settings.WEATHER_GRID_DEGREES)
+        cached = WeatherService(cache=cache)
+        server.reset()
+        report("Pooled + grid cache (cold)", await run(cached.fetch_weather_data), server)
+        server.reset()
+        report("Pooled + grid cache (warm)", await run(cached.fetch_weather_data), server)
+        if server.requests:
+            print(f"❌ Warm cache still called the API {server.requests} times")
+            return 1
+        uncached = await WeatherService(client=cached.client).fetch_point_weather(*POINTS[0])
+        if (await cached.fetch_weather_data(*POINTS[0])).keys() != uncached.keys():
+            print("❌ Cached weather has a different shape")
+            return 1
+
+        # Single-flight: a burst of misses for one cell makes one upstream call
+        cache = WeatherCache(settings.WEATHER_CACHE_TTL, settings.WEATHER_GRID_DEGREES)
+        burst = WeatherService(client=cached.client, cache=cache)
+        server.reset()
+        results = await asyncio.gather(*(
+            burst.fetch_weather_data(40.41 + i * 1e-4, 49.86 + i * 1e-4) for i in range(BURST)
+        ))
+        if server.requests != 1 or any(result is not results[0] for result in results):
+            print(f"❌ {BURST} concurrent misses made {server.requests} upstream requests")
+            return 1
+        print(f"✅ {BURST} concurrent misses for one cell: 1 upstream request "
+              f"({cache.coalesced} coalesced)")
+        await cached.close()
+    finally:
+        server.stop()
+
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rolling weather aggregates from the per-cell history vs recomputing them per query
+Synthetic hourly series are written the way forecast fetches write them
+(7 past days every 6 hours, with outages and missing values) and every
+aggregate is checked against a plain recomputation from the hours written.
+Run from the backend directory: python -m benchmarks.bench_weather_history
+"""
+
+import asyncio
+import math
+import random
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.schemas import CropContext, FarmType, RecommendationRequest, Region, SoilData, WeatherData
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from app.services.weather_history import (
+    DAY, HISTORY_FIELDS, HOUR, MONTH, VARIABLES, WEEK, WeatherHistory
+)
+from app.services.weather_service import WeatherService
+from benchmarks.weather_standin import RECORDED, WeatherStandIn
+
+
+DAYS = 30
+CELLS = 50
+SIMULATED_DAYS = 45
+FETCH_EVERY = 6
+PAST_HOURS = 7 * DAY
+GRID = 0.1
+HOT, HUMID = 30.0, 80.0
+QUERIES = 20000
+ROUNDS = 5
+
+START_HOUR = 1780315200 // HOUR - SIMULATED_DAYS * DAY
+
+# A rule reading the history, added to the wheat rules for the context check
+HISTORY_RULE = {
+    "rule_id": "WHT_HIST_001",
+    "name_az": "Uzunmüddətli istilik",
+    "name_en": "Prolonged heat",
+    "priority": "high",
+    "enabled": True,
+    "conditions": {
+        "operator": "AND",
+        "items": [
+            {"field": "weather.consecutive_hot_hours", "operator": ">=", "value": 6},
+            {"field": "weather.temperature_max_7days", "operator": ">", "value": 35}
+        ]
+    },
+    "action": {"type": "irrigate", "urgency": "high", "urgency_score": 80},
+    "message_az": "{consecutive_hot_hours} saatdır isti davam edir",
+    "message_en": "Heat has lasted {consecutive_hot_hours} hours"
+}
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cell_point(i: int) -> tuple:
+    """A point inside the i-th cell (cells on a 0.1 degree grid over Azerbaijan)"""
+    return round(38.55 + (i // 10) * GRID, 2), round(45.05 + (i % 10) * GRID * 3, 2)
+
+
+def synthetic_truth(i: int) -> Dict[int, List[Optional[float]]]:
+    """hour -> [temperature, humidity, precipitation, wind], 2% of values unknown"""
+    rng = random.Random(i)
+    base = rng.uniform(12, 28)
+    truth = {}
+    for hour in range(START_HOUR, START_HOUR + SIMULATED_DAYS * DAY):
+        daily = math.cos(2 * math.pi * ((hour + 4) % 24 - 15) / 24)
+        values = [
+            round(base + 8 * daily + rng.uniform(-2, 2), 1),
+            float(round(min(100, max(10, 65 - 20 * daily + rng.uniform(-15, 15))))),
+            round(rng.expovariate(1.5), 1) if rng.random() < 0.08 else 0.0,
+            round(max(0.0, 10 + 5 * daily + rng.uniform(-4, 4)), 1),
+        ]
+        truth[hour] = [None if rng.random() < 0.02 else value for value in values]
+    return truth
+
+
+def fetch_schedule(i: int) -> List[int]:
+    """Hours the cell is fetched at: every cell is different (outages, late starts)"""
+    hours = list(range(START_HOUR + PAST_HOURS, START_HOUR + SIMULATED_DAYS * DAY, FETCH_EVERY))
+    kind = i % 5
+    if kind == 1:
+        # A 9-day outage, longer than the 7 days a fetch looks back
+        hours = [h for h in hours if not START_HOUR + 20 * DAY <= h < START_HOUR + 29 * DAY]
+    elif kind == 2:
+        # First fetched 10 days ago: not enough history for 30 days
+        hours = [h for h in hours if h >= START_HOUR + 35 * DAY]
+    elif kind == 3:
+        # A 3-day outage, healed by the next fetch's past days
+        hours = [h for h in hours if not START_HOUR + 40 * DAY <= h < START_HOUR + 43 * DAY]
+    return hours
+
+
+def response(truth: Dict[int, list], now_hour: int) -> Dict[str, Any]:
+    """One location of an Open-Meteo response: past days, then 2 forecast days that must be skipped"""
+    hours = list(range(now_hour - PAST_HOURS + 1, now_hour + 2 * DAY + 1))
+    hourly: Dict[str, Any] = {"time": [hour * HOUR for hour in hours]}
+    for v, variable in enumerate(VARIABLES):
+        hourly[variable] = [truth[hour][v] if hour <= now_hour else 99.0 for hour in hours]
+    return {"current": {"time": now_hour * HOUR + 900}, "hourly": hourly}
+
+
+def reference(written: Dict[int, list], capacity: int) -> Dict[str, Any]:
+    """The aggregates recomputed hour by hour from the hours written to a cell"""
+    latest = max(written)
+    covered = 0
+    while covered < capacity and latest - covered in written:
+        covered += 1
+    series = [written[latest - back] for back in range(covered)]
+
+    def extreme(v: int, hours: int, reduce) -> Optional[float]:
+        if covered < hours:
+            return None
+        known = [values[v] for values in series[:hours] if values[v] is not None]
+        return round(reduce(known), 1) if known else None
+
+    def run(v: int, threshold: float) -> int:
+        length = 0
+        for values in series:
+            if values[v] is None or values[v] < threshold:
+                break
+            length += 1
+        return length
+
+    return {
+        'rainfall_last_30days': (
+            round(sum(values[2] or 0.0 for values in series[:MONTH]), 1) if covered >= MONTH else None
+        ),
+        'temperature_max_24h': extreme(0, DAY, max),
+        'temperature_min_24h': extreme(0, DAY, min),
+        'temperature_max_7days': extreme(0, WEEK, max),
+        'temperature_min_7days': extreme(0, WEEK, min),
+        'wind_speed_max_24h': extreme(3, DAY, max),
+        'consecutive_hot_hours': run(0, HOT),
+        'consecutive_humid_hours': run(1, HUMID),
+    }
+
+
+def same(actual: Dict[str, Any], expected: Dict[str, Any]) -> bool:
+    for field in HISTORY_FIELDS:
+        a, e = actual[field], expected[field]
+        if (a is None) != (e is None) or (a is not None and abs(a - e) > 0.051):
+            return False
+    return True
+
+
+def has_rule(engine: RuleEngine, weather: Dict[str, Any], rule_id: str) -> bool:
+    request = RecommendationRequest(
+        farm_type=FarmType.WHEAT,
+        region=Region.ARAN,
+        request_date=date(2026, 6, 1),
+        weather=WeatherData(**weather),
+        soil=SoilData(soil_moisture=40),
+        crop_context=CropContext(crop_type='wheat', stage='grain_filling')
+    )
+    response = engine.evaluate(request)
+    return any(
+        action.rule_id == rule_id
+        for group in (response.critical_alerts, response.high_priority, response.medium_priority,
+                      response.low_priority, response.info)
+        for action in group
+    )
+
+
+async def service_check() -> int:
+    """Fetched weather carries the history aggregates, and rules read them from the context"""
+    server = WeatherStandIn().start()
+    settings.WEATHER_API_URL = f"{server.base_url}/v1/forecast"
+    history = WeatherHistory(None, DAYS, GRID, hot_temperature=HOT, humid_percent=HUMID)
+    service = WeatherService(history=history)
+    try:
+        points = [(recorded["latitude"], recorded["longitude"]) for recorded in RECORDED]
+        fetched = await service.fetch_weather_batch(points)
+    finally:
+        await service.close()
+        server.stop()
+
+    now = RECORDED[0]["current"]["time"]
+    for (latitude, longitude), weather in zip(points, fetched):
+        summary = history.summary(latitude, longitude, now=now)
+        if summary is None or any(weather[field] != summary[field] for field in HISTORY_FIELDS):
+            print(f"❌ Fetched weather for {latitude},{longitude} lacks the history aggregates")
+            return 1
+    dry = fetched[0]
+    print(f"✅ Fetched weather carries the aggregates (hot week: {dry['consecutive_hot_hours']} hot hours "
+          f"in a row, 7-day max {dry['temperature_max_7days']} °C)")
+
+    loader = RuleLoader()
+    rules = loader.load_all_rules()
+    rules['wheat'] = {**rules['wheat'], 'history': {'rules': [HISTORY_RULE]}}
+    engine = RuleEngine(rules, loader.load_constants())
+    context = engine._build_context(RecommendationRequest(
+        farm_type=FarmType.WHEAT, region=Region.ARAN, weather=WeatherData(**dry)
+    ))
+    if context.get('weather.consecutive_hot_hours') != dry['consecutive_hot_hours']:
+        print("❌ weather.consecutive_hot_hours missing from the evaluation context")
+        return 1
+    if not has_rule(engine, dry, 'WHT_HIST_001') or has_rule(engine, fetched[2], 'WHT_HIST_001'):
+        print("❌ A rule on weather.consecutive_hot_hours should match the hot week only")
+        return 1
+    print("✅ weather.* history fields reach _build_context; a rule on them matches the hot week only")
+    return 0
+
+
+def main() -> int:
+    print("=" * 60)
+    print("WEATHER HISTORY BENCHMARK")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'weather-history.bin'
+        history = WeatherHistory(path, DAYS, GRID, hot_temperature=HOT, humid_percent=HUMID)
+        print(f"History: {DAYS} days x {len(VARIABLES)} variables per cell, "
+              f"{history.max_cells} cells, {history.size / 1e6:.1f} MB file")
+
+        # Write as fetches would, then check every cell against a recomputation
+        points = [cell_point(i) for i in range(CELLS)]
+        written: List[Dict[int, list]] = []
+        records = 0
+        record_time = 0.0
+        for i, (latitude, longitude) in enumerate(points):
+            truth = synthetic_truth(i)
+            cell_written: Dict[int, list] = {}
+            for now_hour in fetch_schedule(i):
+                data = response(truth, now_hour)
+                start = time.perf_counter()
+                history.record(latitude, longitude, data)
+                record_time += time.perf_counter() - start
+                records += 1
+                for hour in range(now_hour - PAST_HOURS + 1, now_hour + 1):
+                    cell_written[hour] = truth[hour]
+            written.append(cell_written)
+        print(f"Record: {record_time / records * 1e6:.1f} us per fetched location "
+              f"({records} fetches of {PAST_HOURS} past hours)")
+
+        # Just after the last fetch
+        now = (START_HOUR + SIMULATED_DAYS * DAY - FETCH_EVERY) * HOUR + 900
+        for i, ((latitude, longitude), cell_written) in enumerate(zip(points, written)):
+            actual = history.summary(latitude, longitude, now=now)
+            expected = reference(cell_written, history.capacity)
+            if actual is None or not same(actual, expected):
+                print(f"❌ Cell {i}: {actual} != {expected}")
+                return 1
+        kinds = [history.summary(*points[i], now=now) for i in range(3)]
+        print(f"✅ {CELLS} cells match a recomputation from the hours written (30-day rainfall: "
+              f"{kinds[0]['rainfall_last_30days']} mm, after a 9-day outage {kinds[1]['rainfall_last_30days']}, "
+              f"10 days of history {kinds[2]['rainfall_last_30days']})")
+
+        # Query cost: a lookup vs computing the windows per query
+        queries = [points[random.randrange(CELLS)] for _ in range(QUERIES)]
+        lookup = best_of(ROUNDS, lambda: [history.summary(latitude, longitude, now=now)
+                                          for latitude, longitude in queries])
+        rows = [history._rows[next(iter(history._rows))]] * 2000
+        numpy_windows = best_of(ROUNDS, lambda: [history._aggregate(row) for row in rows])
+        python_windows = best_of(1, lambda: [reference(written[0], history.capacity) for _ in range(200)])
+        print(f"Aggregates per query, precomputed lookup: {lookup / QUERIES * 1e6:8.2f} us")
+        print(f"Aggregates per query, NumPy windows:      {numpy_windows / len(rows) * 1e6:8.2f} us")
+        print(f"Aggregates per query, hour by hour:       {python_windows / 200 * 1e6:8.2f} us")
+
+        # Persistence: the same aggregates after a restart
+        before = {point: history.summary(*point, now=now) for point in points}
+        history.close()
+        start = time.perf_counter()
+        reopened = WeatherHistory(path, DAYS, GRID, hot_temperature=HOT, humid_percent=HUMID)
+        opened = time.perf_counter() - start
+        after = {point: reopened.summary(*point, now=now) for point in points}
+        if after != before or reopened.path != path:
+            print("❌ Aggregates differ after reopening the history file")
+            return 1
+        blocks = path.stat().st_blocks * 512
+        print(f"✅ Reopened in {opened * 1e3:.1f} ms with the same aggregates for {CELLS} cells "
+              f"({blocks / 1e6:.1f} MB of the file allocated)")
+
+        second = WeatherHistory(path, DAYS, GRID)
+        if second.path is not None:
+            print("❌ A second process may not map the same history file")
+            return 1
+        second.close()
+        reopened.close()
+        resized = WeatherHistory(path, 14, GRID)
+        if resized.stats()["cells"] != 0:
+            print("❌ A history file of another layout should be started anew")
+            return 1
+        resized.close()
+        print("✅ Locked against a second writer; another layout starts a new file")
+
+    result = asyncio.run(service_check())
+    print("=" * 60)
+    return result
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weather per request vs the background regional snapshot
+Runs against the local stand-in server (benchmarks/weather_standin.py), no network needed.
+Run from the backend directory: python -m benchmarks.bench_weather_refresher
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services.weather_refresher import RegionWeatherRefresher, region_points
+from app.services.weather_service import WeatherService
+from benchmarks.weather_standin import WeatherStandIn
+
+
+REQUEST_COUNT = 200
+LATENCY = 0.002
+INTERVAL = 0.5
+MAX_STALENESS = 1.5
+
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def main_async() -> int:
+    server = WeatherStandIn(latency=LATENCY).start()
+    settings.WEATHER_API_URL = f"{server.base_url}/v1/forecast"
+    app = SimpleNamespace(state=SimpleNamespace(weather_service=WeatherService()))
+    points = region_points(Path(settings.WEATHER_POINTS_PATH))
+
+    print("=" * 60)
+    print("REGIONAL WEATHER REFRESHER BENCHMARK")
+    print("=" * 60)
+    print(f"{len(points)} regions, {sum(len(p) for p in points.values())} representative points, "
+          f"{LATENCY * 1e3:.0f} ms stand-in latency")
+
+    refresher = RegionWeatherRefresher(app, INTERVAL, MAX_STALENESS, 0.1)
+    try:
+        # Per request: every request fetches its location's weather
+        service = app.state.weather_service
+        server.reset()
+        start = time.perf_counter()
+        for _ in range(REQUEST_COUNT):
+            await service.fetch_weather_data(*points['aran'][0][1:])
+        live = time.perf_counter() - start
+        print(f"Weather per request:  {live / REQUEST_COUNT * 1e6:9.1f} us, {server.requests} upstream requests")
+
+        refresher.start()
+        if not await wait_for(lambda: all(refresher._snapshots.get(region) for region in points)):
+            print("❌ Regions were not refreshed at startup")
+            return 1
+        server.reset()
+        start = time.perf_counter()
+        for _ in range(REQUEST_COUNT):
+            refresher.get('aran')
+        snapshot = time.perf_counter() - start
+        print(f"Regional snapshot:    {snapshot / REQUEST_COUNT * 1e6:9.1f} us, {server.requests} upstream requests")
+
+        # A slow API: the refresh runs late and reads get the stale snapshot meanwhile
+        server.latency = INTERVAL * 1.5
+        await asyncio.sleep(INTERVAL * 1.5)
+        stale_reads = [refresher.get(region) for region in points]
+        if any(read is None for read in stale_reads) or refresher.stale < len(points):
+            print("❌ Stale snapshots were not served while refreshing")
+            return 1
+        print(f"✅ Slow API: stale snapshots served ({refresher.stale} reads), "
+              f"refresh lag {refresher.stats()['max_refresh_lag_seconds']} s")
+
+        # An outage: snapshots age past the bound and are no longer served
+        server.latency = LATENCY
+        server.failing = True
+        if not await wait_for(lambda: refresher.get('aran') is None, MAX_STALENESS * 3):
+            print("❌ Snapshot still served past the staleness bound")
+            return 1
+        stats = refresher.stats()
+        print(f"✅ Outage: snapshot dropped after {MAX_STALENESS} s, "
+              f"{stats['failures']} failed refreshes, max lag {stats['max_refresh_lag_seconds']} s")
+
+        server.failing = False
+        if not await wait_for(lambda: refresher.get('aran') is not None, INTERVAL * 3):
+            print("❌ Snapshot not restored after the outage")
+            return 1
+        print("✅ Recovered: snapshot served again after the next refresh")
+    finally:
+        await refresher.stop()
+        await app.state.weather_service.close()
+        server.stop()
+
+    print("=" * 60)
+    return 0
+
+
+def main():
+    return asyncio.run(main_async())
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-worker memory of uvicorn workers vs the preloaded server
+Starts `uvicorn --workers N` (every worker imports the app and loads its own
+ruleset) and `python -m app.serve --workers N` (loaded once in the gunicorn
+master, gc.freeze(), then forked) with 1, 4 and 16 workers and reads RSS/PSS
+from /proc (Linux)
+Run from the backend directory: python -m benchmarks.bench_worker_memory
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+
+WORKER_COUNTS = [1, 4, 16]
+STARTUP_TIMEOUT = 300
+WARMUP_REQUESTS = 200
+WARMUP_PATHS = [
+    "/api/v1/recommendations/quick?farm_type=wheat&region=aran&temperature=34&humidity=40",
+    "/api/v1/constants",
+    "/api/v1/rules",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def worker_pids(pid: int, workers: int, server: str) -> List[int]:
+    """The worker processes serving requests (not the multiprocessing resource tracker)"""
+    if server == 'uvicorn' and workers == 1:
+        return [pid]  # a single worker is served by the uvicorn process itself
+    pids = []
+    for child in children(pid):
+        with open(f"/proc/{child}/cmdline", 'rb') as f:
+            cmdline = f.read()
+        if b'resource_tracker' not in cmdline:
+            pids.append(child)
+    return pids
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Rss, Pss and Private totals for a process"""
+    totals = {'Rss': 0, 'Pss': 0, 'Private': 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            fields = line.split()
+            key = fields[0].rstrip(':')
+            if key in ('Rss', 'Pss'):
+                totals[key] += int(fields[1])
+            elif key in ('Private_Clean', 'Private_Dirty'):
+                totals['Private'] += int(fields[1])
+    return totals
+
+
+def command(server: str, workers: int, port: int) -> List[str]:
+    if server == 'uvicorn':
+        return [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port),
+                '--workers', str(workers), '--log-level', 'warning']
+    return [sys.executable, '-m', 'app.serve', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--max-requests', '0']
+
+
+def wait_ready(process: subprocess.Popen, port: int, workers: int, server: str):
+    """Until /health answers and every worker has been forked"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+                response.read()
+            if len(worker_pids(process.pid, workers, server)) >= workers:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{workers} {server} workers did not start in {STARTUP_TIMEOUT}s")
+
+
+def measure(workers: int, server: str) -> Dict[str, float]:
+    port = free_port()
+    process = subprocess.Popen(
+        command(server, workers, port),
+        env=dict(os.environ, PYTHONUNBUFFERED='1'),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(process, port, workers, server)
+        # Let every worker finish its lifespan startup
+        time.sleep(1.0)
+
+        for i in range(WARMUP_REQUESTS):
+            path = WARMUP_PATHS[i % len(WARMUP_PATHS)]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=30) as response:
+                response.read()
+
+        pids = worker_pids(process.pid, workers, server)
+        usage = [memory_kb(pid) for pid in pids]
+        return {
+            'workers': len(pids),
+            'rss': sum(u['Rss'] for u in usage) / len(pids) / 1024,
+            'pss': sum(u['Pss'] for u in usage) / len(pids) / 1024,
+            'private': sum(u['Private'] for u in usage) / len(pids) / 1024,
+            'total_pss': sum(u['Pss'] for u in usage) / 1024,
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("❌ Needs Linux /proc/<pid>/smaps_rollup")
+        return 1
+
+    print("=" * 60)
+    print("WORKER MEMORY BENCHMARK")
+    print("=" * 60)
+    print(f"{'workers':>7} {'server':>8} {'RSS/w':>8} {'PSS/w':>8} {'priv/w':>8} {'PSS total':>10}")
+
+    for workers in WORKER_COUNTS:
+        for server in ('uvicorn', 'serve'):
+            result = measure(workers, server)
+            print(f"{result['workers']:>7} {server:>8} "
+                  f"{result['rss']:7.1f}M {result['pss']:7.1f}M {result['private']:7.1f}M "
+                  f"{result['total_pss']:9.1f}M")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,262 @@
+"""
+Synthetic request generator for benchmarks
+Samples farm contexts from the vocabulary used by the shipped rules so that
+a realistic share of rules match.
+"""
+
+import copy
+import random
+from typing import Dict, List, Any, Set
+
+from app.models.schemas import AnimalType, RecommendationRequest, Region
+
+
+NUMERIC_RANGES = {
+    'weather.temperature': (-10, 45),
+    'weather.humidity': (10, 100),
+    'weather.rainfall_last_24h': (0, 40),
+    'weather.rainfall_last_7days': (0, 120),
+    'weather.rainfall_forecast_amount_mm': (0, 50),
+    'weather.wind_speed': (0, 60),
+    'soil.soil_moisture': (5, 95),
+    'soil.soil_temperature': (-5, 35),
+    'soil.ph': (4.5, 9),
+    'crop_context.days_in_stage': (0, 60),
+    'crop_context.days_since_irrigation': (0, 20),
+    'crop_context.days_since_fertilization': (0, 60),
+    'crop_context.days_until_harvest': (0, 60),
+    'crop_context.grain_moisture': (8, 30),
+    'crop_context.aphid_count_per_head': (0, 30),
+    'crop_context.tree_age_years': (1, 40),
+    'crop_context.days_after_harvest': (0, 60),
+    'greenhouse_context.inside_temperature': (5, 45),
+    'greenhouse_context.inside_humidity': (30, 100),
+    'livestock_context.count': (1, 500),
+    'livestock_context.barn_hygiene_score': (1, 10),
+    'livestock_context.days_since_vet_check': (0, 120),
+    'livestock_context.days_since_deworming': (0, 200),
+    'livestock_context.days_until_expected_birth': (0, 60),
+    'livestock_context.age_days': (1, 400),
+}
+
+INTEGER_FIELDS = {
+    'crop_context.days_in_stage', 'crop_context.days_since_irrigation',
+    'crop_context.days_since_fertilization', 'crop_context.days_until_harvest',
+    'crop_context.aphid_count_per_head', 'crop_context.tree_age_years',
+    'crop_context.days_after_harvest', 'livestock_context.count',
+    'livestock_context.barn_hygiene_score', 'livestock_context.days_since_vet_check',
+    'livestock_context.days_since_deworming', 'livestock_context.days_until_expected_birth',
+    'livestock_context.age_days',
+}
+
+BOOLEAN_FIELDS = [
+    'weather.rainfall_forecast_48h', 'weather.frost_warning',
+    'crop_context.grain_shattering', 'crop_context.nitrogen_deficiency_signs',
+    'crop_context.calcium_deficiency_signs', 'crop_context.seed_treated',
+    'crop_context.diseased_branches_present',
+]
+
+STRING_DEFAULTS = {
+    'crop_context.growing_type': ['open_field', 'greenhouse'],
+    'livestock_context.vaccination_status': ['current', 'due', 'overdue'],
+    'livestock_context.ventilation_quality': ['good', 'adequate', 'poor'],
+    'livestock_context.water_availability': ['adequate', 'limited'],
+    'greenhouse_context.ventilation_status': ['open', 'closed', 'auto'],
+    'resource_context.water_availability': ['adequate', 'limited', 'scarce'],
+    'resource_context.labor_availability': ['adequate', 'limited'],
+    'resource_context.financial_status': ['normal', 'tight'],
+}
+
+FARM_SECTIONS = {
+    'wheat': ['weather', 'soil', 'crop_context'],
+    'orchard': ['weather', 'soil', 'crop_context'],
+    'vegetable': ['weather', 'soil', 'crop_context', 'greenhouse_context'],
+    'livestock': ['weather', 'livestock_context'],
+    'mixed': ['weather', 'soil', 'crop_context', 'livestock_context', 'resource_context', 'farm_components'],
+}
+
+ANIMAL_TYPES = [a.value for a in AnimalType]
+
+
+def _collect_vocabulary(farm_rules: Dict[str, Any]) -> Dict[str, Set[Any]]:
+    """Collect the string values each field is compared against"""
+    vocab: Dict[str, Set[Any]] = {}
+
+    def walk(conditions: Dict[str, Any]):
+        for item in conditions.get('items', []):
+            if 'operator' in item and 'items' in item:
+                walk(item)
+                continue
+            value = item.get('value')
+            values = value if isinstance(value, list) else [value]
+            for v in values:
+                if isinstance(v, str):
+                    vocab.setdefault(item.get('field', ''), set()).add(v)
+
+    for category_data in farm_rules.values():
+        if category_data and 'rules' in category_data:
+            for rule in category_data['rules']:
+                walk(rule.get('conditions', {}))
+                for target in rule.get('applicable_to') or []:
+                    field = 'livestock_context.animal_type' if target in ANIMAL_TYPES else 'crop_context.crop_type'
+                    vocab.setdefault(field, set()).add(target)
+
+    return vocab
+
+
+def _sample_string(rng: random.Random, field: str, vocab: Dict[str, Set[Any]]) -> str:
+    choices = sorted(vocab.get(field, set()) | set(STRING_DEFAULTS.get(field, [])))
+    if not choices:
+        return 'other'
+    # Occasionally pick a value no rule mentions
+    if rng.random() < 0.1:
+        return 'other'
+    return rng.choice(choices)
+
+
+def _sample_numeric(rng: random.Random, field: str) -> float:
+    low, high = NUMERIC_RANGES[field]
+    if field in INTEGER_FIELDS:
+        return rng.randint(int(low), int(high))
+    return round(rng.uniform(low, high), 1)
+
+
+def generate_request_payloads(
+    rules: Dict[str, Dict[str, Any]],
+    count: int,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """Generate `count` raw request payloads spread over all farm types"""
+    rng = random.Random(seed)
+    vocab_by_farm = {farm_type: _collect_vocabulary(farm_rules) for farm_type, farm_rules in rules.items()}
+    farm_types = sorted(FARM_SECTIONS)
+    regions = [r.value for r in Region]
+
+    payloads = []
+    for i in range(count):
+        farm_type = farm_types[i % len(farm_types)]
+        vocab = vocab_by_farm.get(farm_type, {})
+        sections: Dict[str, Dict[str, Any]] = {name: {} for name in FARM_SECTIONS[farm_type]}
+
+        for field in NUMERIC_RANGES:
+            section, key = field.split('.', 1)
+            if section in sections:
+                sections[section][key] = _sample_numeric(rng, field)
+
+        for field in BOOLEAN_FIELDS:
+            section, key = field.split('.', 1)
+            if section in sections:
+                sections[section][key] = rng.random() < 0.3
+
+        for field in sorted(set(vocab) | set(STRING_DEFAULTS)):
+            if '.' not in field:
+                continue
+            section, key = field.split('.', 1)
+            if section in sections and section != 'farm_components':
+                sections[section][key] = _sample_string(rng, field, vocab)
+
+        if 'crop_context' in sections:
+            sections['crop_context'].setdefault('crop_type', 'other')
+            sections['crop_context'].setdefault('stage', 'other')
+        if 'livestock_context' in sections:
+            animal_type = sections['livestock_context'].get('animal_type')
+            if animal_type not in ANIMAL_TYPES:
+                sections['livestock_context']['animal_type'] = rng.choice(ANIMAL_TYPES)
+        if 'farm_components' in sections:
+            crops = sorted(vocab.get('farm_components.crop_types', set()) | {'wheat', 'tomato', 'apple'})
+            animals = sorted(vocab.get('farm_components.livestock_types', set()) | {'cattle', 'sheep'})
+            sections['farm_components'] = {
+                'crop_types': rng.sample(crops, rng.randint(0, 2)),
+                'livestock_types': rng.sample(animals, rng.randint(0, 2)),
+            }
+
+        payloads.append({
+            'farm_type': farm_type,
+            'region': rng.choice(regions),
+            'request_date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            **sections,
+        })
+
+    return payloads
+
+
+def generate_requests(
+    rules: Dict[str, Dict[str, Any]],
+    count: int,
+    seed: int = 42
+) -> List[RecommendationRequest]:
+    """Generate validated RecommendationRequest objects"""
+    return [
+        RecommendationRequest.model_validate(payload)
+        for payload in generate_request_payloads(rules, count, seed)
+    ]
+
+
+def _suffix_constants(conditions: Dict[str, Any], suffix: str) -> bool:
+    """Suffix string ==/IN constants in place; returns True if any were changed"""
+    changed = False
+    for item in conditions.get('items', []):
+        if 'operator' in item and 'items' in item:
+            changed = _suffix_constants(item, suffix) or changed
+            continue
+        value = item.get('value')
+        if item.get('operator') == '==' and isinstance(value, str):
+            item['value'] = value + suffix
+            changed = True
+        elif item.get('operator') == 'IN' and isinstance(value, list):
+            item['value'] = [v + suffix if isinstance(v, str) else v for v in value]
+            changed = True
+    return changed
+
+
+def _shift_thresholds(conditions: Dict[str, Any], shift: float) -> bool:
+    """Shift numeric comparison thresholds in place; returns True if any were changed"""
+    changed = False
+    for item in conditions.get('items', []):
+        if 'operator' in item and 'items' in item:
+            changed = _shift_thresholds(item, shift) or changed
+            continue
+        value = item.get('value')
+        if item.get('operator') in ('>', '>=', '<', '<=') and isinstance(value, (int, float)):
+            item['value'] = value + shift
+            changed = True
+    return changed
+
+
+def scale_rules(
+    rules: Dict[str, Dict[str, Any]],
+    factor: int,
+    vary: str = 'constants'
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Grow the ruleset `factor` times by adding variants of every rule.
+    vary='constants': variants for crops, stages and regions that the
+    generated contexts never use - a per-crop/per-region corpus.
+    vary='thresholds': variants with numeric thresholds shifted by a few
+    units - per-region tuning of the same rule.
+    """
+    scaled = copy.deepcopy(rules)
+    for farm_type, categories in scaled.items():
+        for category_data in categories.values():
+            if not category_data or 'rules' not in category_data:
+                continue
+            originals = category_data['rules']
+            variants = []
+            for k in range(1, factor):
+                suffix = f"__v{k}"
+                for rule in originals:
+                    variant = copy.deepcopy(rule)
+                    variant['rule_id'] = rule.get('rule_id', '') + suffix
+                    conditions = variant.setdefault('conditions', {'operator': 'AND', 'items': []})
+                    if vary == 'thresholds':
+                        _shift_thresholds(conditions, (k % 2 * 2 - 1) * (k + 1) // 2)
+                    elif not _suffix_constants(conditions, suffix):
+                        variant['conditions'] = {
+                            'operator': 'AND',
+                            'items': [{'field': 'region', 'operator': '==', 'value': 'region' + suffix}, conditions],
+                        }
+                    if vary == 'constants' and isinstance(variant.get('applicable_to'), list):
+                        variant['applicable_to'] = [t + suffix for t in variant['applicable_to']]
+                    variants.append(variant)
+            category_data['rules'] = originals + variants
+    return scaled
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Open-Meteo and ipapi.co APIs
+Forecast requests (one point or coordinate lists) are answered from the
+Open-Meteo responses in fixtures/open_meteo_forecast.json, replaying the
+location nearest to each point, after an optional delay standing in for the
+network round trip. Counts requests and TCP connections, so keep-alive reuse,
+batching and caching show up.
+Run standalone: python -m benchmarks.weather_standin [port]
+then point WEATHER_API_URL / IP_GEOLOCATION_URL at the printed URLs.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURE_PATH = Path(__file__).parent / 'fixtures' / 'open_meteo_forecast.json'
+
+# Open-Meteo responses replayed for the nearest requested point
+RECORDED = json.loads(FIXTURE_PATH.read_text(encoding='utf-8'))['locations']
+
+
+def nearest_recorded(latitude: float, longitude: float) -> Dict[str, Any]:
+    """The fixture location closest to a point"""
+    return min(RECORDED, key=lambda r: (r["latitude"] - latitude) ** 2 + (r["longitude"] - longitude) ** 2)
+
+
+def forecast_response(latitude: float, longitude: float, hourly: Optional[str]) -> Dict[str, Any]:
+    """The nearest fixture location, with only the hourly variables asked for"""
+    recorded = nearest_recorded(latitude, longitude)
+    body = {**recorded, "latitude": latitude, "longitude": longitude}
+    body.pop("hourly", None)
+    body.pop("hourly_units", None)
+    if hourly:
+        names = ["time"] + hourly.split(',')
+        body["hourly"] = {name: recorded["hourly"][name] for name in names if name in recorded["hourly"]}
+        body["hourly_units"] = {name: recorded["hourly_units"][name] for name in body["hourly"]}
+    return body
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: with Nagle on, keep-alive
+    # responses would wait ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+    server: 'WeatherStandIn'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.paths[url.path] = self.server.paths.get(url.path, 0) + 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.failing:
+            self.send_error(503)
+            return
+
+        if url.path == '/v1/forecast':
+            # Coordinate lists get a list of locations, a single point one object
+            points = list(zip(query['latitude'].split(','), query['longitude'].split(',')))
+            body = [forecast_response(float(lat), float(lon), query.get('hourly')) for lat, lon in points]
+            if len(body) == 1:
+                body = body[0]
+        elif url.path.endswith('/json/'):
+            # ipapi.co/{ip}/json/
+            body = {**self.server.location, "ip": url.path.strip('/').split('/')[0]}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WeatherStandIn(ThreadingHTTPServer):
+    """The stand-in server, run on a background thread"""
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.latency = latency
+        # Answer every request with 503, as an API outage
+        self.failing = False
+        self.lock = threading.Lock()
+        self.location = {
+            "city": "Ganja", "region": "Ganja", "country_name": "Azerbaijan",
+            "latitude": 40.6828, "longitude": 46.3606,
+        }
+        self.reset()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self):
+        self.requests = 0
+        self.connections = 0
+        self.paths: Dict[str, int] = {}
+
+    def start(self) -> 'WeatherStandIn':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    server = WeatherStandIn(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"WEATHER_API_URL={server.base_url}/v1/forecast")
+    print(f"IP_GEOLOCATION_URL={server.base_url}/{{ip}}/json/")
+    server.serve_forever()
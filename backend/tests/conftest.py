@@ -0,0 +1,80 @@
+"""
+Shared fixtures: the shipped ruleset and synthetic requests sampled from
+the rules' own vocabulary (benchmarks/scenarios.py), so a realistic share
+of rules match. Run from the backend directory: python -m pytest
+"""
+
+import shutil
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.schemas import RecommendationRequest
+from app.services.rule_engine import RuleEngine
+from app.services.rule_loader import RuleLoader
+from benchmarks.scenarios import generate_requests
+
+
+REQUEST_COUNT = 300
+
+
+@pytest.fixture(scope="session")
+def ruleset():
+    loader = RuleLoader()
+    rules, constants = loader.load_all_rules(), loader.load_constants()
+    assert not loader.validate_rules()
+    return rules, constants
+
+
+@pytest.fixture(scope="session")
+def rules(ruleset) -> Dict[str, Dict[str, Any]]:
+    return ruleset[0]
+
+
+@pytest.fixture(scope="session")
+def constants(ruleset) -> Dict[str, Any]:
+    return ruleset[1]
+
+
+@pytest.fixture(scope="session")
+def requests(rules) -> List[RecommendationRequest]:
+    return generate_requests(rules, REQUEST_COUNT)
+
+
+@pytest.fixture(scope="session")
+def engine(rules, constants) -> RuleEngine:
+    return RuleEngine(rules, constants, evaluation_mode='indexed')
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    """A copy of the data files the settings point at, free to edit, without snapshots"""
+    data = tmp_path / "data"
+    shutil.copytree(settings.DATA_PATH, data)
+    monkeypatch.setattr(settings, 'DATA_PATH', str(data))
+    monkeypatch.setattr(settings, 'CONSTANTS_PATH', str(data / "constants"))
+    monkeypatch.setattr(settings, 'PROFILES_PATH', str(data / "profiles"))
+    monkeypatch.setattr(settings, 'RULES_PATH', str(data / "rules"))
+    monkeypatch.setattr(settings, 'RULES_SNAPSHOT_DIR', "")
+    return data
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """The app with its lifespan run, writing ruleset snapshots to a temporary directory"""
+    from app.main import app
+
+    snapshot_dir = settings.RULES_SNAPSHOT_DIR
+    settings.RULES_SNAPSHOT_DIR = str(tmp_path_factory.mktemp("snapshots"))
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        settings.RULES_SNAPSHOT_DIR = snapshot_dir
+
+
+def comparable(response) -> Dict[str, Any]:
+    """A response without the time it was generated at"""
+    return response.model_dump(exclude={'generated_at'})
@@ -0,0 +1,59 @@
+"""
+POST /recommendations/batch and BatchEvaluator: the size limit, per-item
+validation errors, and results in request order whatever the chunking.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.batch_evaluator import BatchEvaluator
+from tests.conftest import comparable
+
+
+@pytest.fixture(scope="module")
+def items(requests):
+    return [request.model_dump(mode='json') for request in requests[:40]]
+
+
+def test_batch_over_the_limit_is_rejected(client, items, monkeypatch):
+    monkeypatch.setattr(settings, 'BATCH_MAX_ITEMS', 5)
+    response = client.post("/api/v1/recommendations/batch", json={"requests": items[:6]})
+    assert response.status_code == 413
+    assert "max 5" in response.json()["detail"]
+
+    response = client.post("/api/v1/recommendations/batch", json={"requests": items[:5]})
+    assert response.status_code == 200
+    assert response.json()["total"] == 5
+
+
+def test_invalid_items_fail_only_their_own_slot(client, items):
+    batch = [items[0], {**items[1], "farm_type": "spaceship"}, {"region": "aran"}, items[2]]
+    response = client.post("/api/v1/recommendations/batch", json={"requests": batch, "chunk_size": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 2, 2)
+
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["ok"] for result in results] == [True, False, False, True]
+    assert "farm_type" in results[1]["error"]
+    assert "farm_type: Field required" in results[2]["error"]
+    assert results[1]["response"] is None
+    assert results[3]["response"]["farm_type"] == items[2]["farm_type"]
+
+
+@pytest.mark.parametrize("executor", ["inline", "thread", "process", "columnar"])
+def test_results_keep_request_order_across_chunks(engine, requests, items, executor):
+    evaluator = BatchEvaluator(executor=executor, workers=2, chunk_size=7)
+    try:
+        results, used = asyncio.run(evaluator.evaluate(engine, items))
+    finally:
+        evaluator.shutdown()
+
+    assert used == executor
+    assert len(results) == len(items)
+    for request, (response, error) in zip(requests, results):
+        assert error is None
+        assert comparable(response) == comparable(engine.evaluate(request))
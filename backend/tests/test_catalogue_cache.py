@@ -0,0 +1,108 @@
+"""
+Catalogue endpoints served from precomputed bytes: the same JSON as a
+freshly encoded response, gzip when accepted, and 304 for a matching ETag.
+"""
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.api.catalogue_cache import CatalogueCache, GZIP_MIN_BYTES, accepts_gzip, if_none_match
+
+
+CATALOGUE = ["/api/v1/rules", "/api/v1/rules/wheat", "/api/v1/rules/wheat/irrigation", "/api/v1/constants",
+             "/api/v1/constants/regions", "/api/v1/scenarios/wheat", "/api/v1/stats", "/api/v1/farms"]
+
+
+def get(client, path, **headers):
+    return client.get(path, headers={"Accept-Encoding": "identity", **headers})
+
+
+@pytest.mark.parametrize("path", CATALOGUE)
+def test_body_is_the_encoded_payload_with_an_etag(client, path):
+    response = get(client, path)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"].startswith('"')
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    # Repeated requests are answered from the same bytes
+    assert get(client, path).content == response.content
+
+
+def test_body_matches_the_loaded_data(client):
+    response = get(client, "/api/v1/rules/wheat/irrigation")
+    assert response.json() == jsonable_encoder(client.app.state.rules["wheat"]["irrigation"])
+    assert get(client, "/api/v1/rules/wheat/nonexistent").status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/api/v1/rules", "/api/v1/constants"])
+def test_gzip_when_accepted(client, path):
+    plain = get(client, path)
+    compressed = get(client, path, **{"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    # httpx inflates the body: the same JSON bytes
+    assert compressed.content == plain.content
+
+
+def test_gzip_refused_with_q_zero(client):
+    response = get(client, "/api/v1/rules", **{"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_matching_etag_is_not_modified(client, encoding):
+    first = get(client, "/api/v1/rules", **{"Accept-Encoding": encoding})
+    etag = first.headers["etag"]
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = get(client, "/api/v1/rules", **{"Accept-Encoding": encoding, "If-None-Match": header})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert "cache-control" in response.headers
+
+    stale = get(client, "/api/v1/rules", **{"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_either_representation_etag_revalidates(client):
+    plain = get(client, "/api/v1/rules").headers["etag"]
+    compressed = get(client, "/api/v1/rules", **{"Accept-Encoding": "gzip"}).headers["etag"]
+    assert get(client, "/api/v1/rules", **{"Accept-Encoding": "gzip", "If-None-Match": plain}).status_code == 304
+    assert get(client, "/api/v1/rules", **{"If-None-Match": compressed}).status_code == 304
+
+
+def test_accept_encoding_parsing():
+    assert accepts_gzip("gzip")
+    assert accepts_gzip("br, GZIP;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip;q=x")
+    assert not accepts_gzip("identity, br")
+    assert not accepts_gzip("")
+
+
+def test_if_none_match_parsing():
+    assert if_none_match('"a"', '"a"', None)
+    assert if_none_match('W/"b", "c"', '"a"', '"b"')
+    assert if_none_match('*', '"a"')
+    assert not if_none_match('"a-gzip"', '"a"', None)
+
+
+def test_small_payloads_are_not_gzipped():
+    cache = CatalogueCache(max_age=60)
+    entry = cache.entry("v1", "small", lambda: {"ok": True})
+    assert len(entry.body) < GZIP_MIN_BYTES
+    assert entry.gzip_body is None and entry.gzip_etag is None
+
+
+def test_a_new_version_rebuilds_with_a_new_etag():
+    cache = CatalogueCache(max_age=60)
+    payload = {"rules": ["x" * GZIP_MIN_BYTES]}
+    first = cache.entry("v1", "rules", lambda: payload)
+    assert cache.entry("v1", "rules", lambda: {"unused": True}) is first
+    payload["rules"].append("y")
+    second = cache.entry("v2", "rules", lambda: payload)
+    assert second.etag != first.etag and second.gzip_etag != first.gzip_etag
+    assert cache.stats()["builds"] == 2 and cache.stats()["hits"] == 1
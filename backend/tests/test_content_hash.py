@@ -0,0 +1,58 @@
+"""
+The ruleset version (RuleLoader.content_hash) and the reload watcher's
+file_signature cover exactly the files the loader reads: other JSON under
+DATA_PATH, such as the regional weather points, never bumps the version.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.services.rule_loader import RuleLoader
+from app.services.rule_reloader import file_signature
+
+
+def version():
+    loader = RuleLoader()
+    return loader.content_hash(), file_signature(loader.data_files())
+
+
+def touch(path: Path, text: str):
+    path.write_text(text, encoding='utf-8')
+
+
+def test_data_files_are_the_loaded_files(data_path):
+    loader = RuleLoader()
+    files = set(loader.data_files())
+    assert files == {path for path in data_path.rglob('*.json') if path.parent.name != 'weather'}
+
+
+def test_version_is_stable(data_path):
+    assert version() == version()
+
+
+def test_weather_points_and_stray_json_do_not_change_the_version(data_path):
+    before = version()
+    points = data_path / "weather" / "region_points.json"
+    touch(points, points.read_text(encoding='utf-8') + "\n")
+    touch(data_path / "notes.json", "{}")
+    touch(data_path / "rules" / "wheat" / "draft.json", "{}")
+    assert version() == before
+
+
+@pytest.mark.parametrize("relative", ["rules/wheat/irrigation.json", "constants/thresholds.json", "profiles/mixed_profile.json"])
+def test_editing_a_ruleset_file_changes_the_version(data_path, relative):
+    content_hash, signature = version()
+    path = data_path / relative
+    touch(path, path.read_text(encoding='utf-8') + "\n")
+    new_hash, new_signature = version()
+    assert new_hash != content_hash
+    assert new_signature != signature
+
+
+def test_removing_a_ruleset_file_changes_the_version(data_path):
+    content_hash, signature = version()
+    (data_path / "rules" / "mixed" / "integration.json").unlink()
+    new_hash, new_signature = version()
+    assert new_hash != content_hash
+    assert new_signature != signature
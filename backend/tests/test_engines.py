@@ -0,0 +1,78 @@
+"""
+Every evaluation path against the JSON interpreter (RuleEngine._evaluate_rule):
+compiled predicates, the candidate index, the atom bitset and the columnar
+engine must match the same rules and render the same messages.
+"""
+
+from typing import List
+
+import pytest
+
+from app.services.columnar_engine import ColumnarEngine
+from app.services.rule_engine import RuleEngine
+from tests.conftest import comparable
+
+
+def interpreted(engine: RuleEngine, request) -> List[str]:
+    """Ids of the enabled rules the interpreter matches, in rank order, on a full context"""
+    context = engine.full_layout.build(request)
+    return [
+        compiled_rule.rule['rule_id']
+        for compiled_rule in engine.farm_rules.get(request.farm_type.value, [])
+        if engine._evaluate_rule(compiled_rule.rule, context, compiled_rule.category)[0]
+    ]
+
+
+def test_requests_match_some_rules(engine, requests):
+    matched = sum(1 for request in requests if interpreted(engine, request))
+    assert matched > len(requests) // 2
+
+
+def test_compiled_predicates_match_interpreter(engine, requests):
+    for request in requests:
+        context = engine._build_context(request)
+        compiled = [
+            compiled_rule.rule['rule_id']
+            for compiled_rule in engine.farm_rules.get(request.farm_type.value, [])
+            if compiled_rule.matches(context)
+        ]
+        assert compiled == interpreted(engine, request)
+
+
+@pytest.mark.parametrize("mode", ["indexed", "bitset"])
+def test_matcher_matches_interpreter(rules, constants, requests, mode):
+    engine = RuleEngine(rules, constants, evaluation_mode=mode)
+    for request in requests:
+        matcher = engine.matchers[request.farm_type.value]
+        matched = [compiled_rule.rule['rule_id'] for compiled_rule in matcher.match(engine._build_context(request))]
+        assert matched == interpreted(engine, request)
+
+
+def test_bitset_responses_match_indexed(rules, constants, engine, requests):
+    bitset = RuleEngine(rules, constants, evaluation_mode='bitset')
+    for request in requests:
+        assert comparable(bitset.evaluate(request)) == comparable(engine.evaluate(request))
+
+
+def test_columnar_responses_match_indexed(rules, constants, engine, requests):
+    columnar = ColumnarEngine(rules, constants)
+    responses = columnar.evaluate_many(requests)
+    assert len(responses) == len(requests)
+    for request, response in zip(requests, responses):
+        assert comparable(response) == comparable(engine.evaluate(request))
+
+
+def test_message_templates_match_interpreter(engine, requests):
+    for request in requests:
+        context = engine._build_context(request)
+        full_context = engine.full_layout.build(request)
+        response = engine.evaluate(request)
+        for group in ('critical_alerts', 'high_priority', 'medium_priority', 'low_priority', 'info'):
+            for action in getattr(response, group):
+                compiled_rule = engine.compiled_by_id[(request.farm_type.value, action.rule_id)]
+                # No compiled rule: messages go through the regex substitution
+                expected = engine._build_action(compiled_rule.rule, full_context, compiled_rule.category)
+                assert (action.message_az, action.message_en) == (expected.message_az, expected.message_en)
+                assert action == engine._build_action(
+                    compiled_rule.rule, context, compiled_rule.category, compiled_rule
+                )
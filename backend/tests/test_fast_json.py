@@ -0,0 +1,95 @@
+"""
+FAST_RESPONSES: bodies written by pydantic-core are byte for byte what
+FastAPI's response_model path and jsonable_encoder send, and orjson request
+decoding answers malformed bodies like the standard decoder.
+"""
+
+import asyncio
+import dataclasses
+import re
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+
+from app.api.fast_json import FastJSONRoute, model_response
+from app.core.config import settings
+from app.models.schemas import BatchItemResult, BatchRecommendationResponse, RecommendationResponse
+from app.services.rule_engine import RuleEngine
+
+
+def response_model_body(model_type, response) -> bytes:
+    """What FastAPI sends for an endpoint with this response_model"""
+    field = create_response_field(name="Response", type_=model_type, mode="serialization")
+    return JSONResponse(asyncio.run(serialize_response(field=field, response_content=response))).body
+
+
+def without_time(body: bytes) -> bytes:
+    return re.sub(rb'"generated_at":"[^"]*"', b'"generated_at":""', body)
+
+
+def test_responses_match_both_default_encoders(engine, requests):
+    for request in requests[:100]:
+        response = engine.evaluate(request)
+        fast = model_response(response).body
+        assert fast == response_model_body(RecommendationResponse, response)
+        assert fast == JSONResponse(jsonable_encoder(response)).body
+    # Azerbaijani text is written as UTF-8, not \u escapes
+    assert b"\\u" not in fast
+
+
+def test_batch_response_matches(engine, requests):
+    responses = [engine.evaluate(request) for request in requests[:20]]
+    batch = BatchRecommendationResponse(
+        total=21, succeeded=20, failed=1, executor='inline', chunk_size=64,
+        results=[BatchItemResult(index=i, ok=True, response=r) for i, r in enumerate(responses)]
+        + [BatchItemResult(index=20, ok=False, error="farm_type: Field required")]
+    )
+    assert model_response(batch).body == response_model_body(BatchRecommendationResponse, batch)
+
+
+def test_validated_action_templates_serialize_like_fresh_actions(rules, constants, engine, requests):
+    # Same rules without the actions validated at compile time
+    validating = RuleEngine(rules, constants, {
+        farm_type: {
+            category: [dataclasses.replace(compiled_rule, action=None) for compiled_rule in category_rules]
+            for category, category_rules in categories.items()
+        }
+        for farm_type, categories in engine.compiled_rules.items()
+    })
+    for request in requests[:100]:
+        response = engine.evaluate(request)
+        fresh = validating.evaluate(request).model_copy(update={'generated_at': response.generated_at})
+        assert model_response(fresh).body == model_response(response).body
+
+
+def test_endpoint_bytes_are_the_same_with_the_flag(client, requests, monkeypatch):
+    body = requests[0].model_dump(mode='json')
+    default = client.post("/api/v1/recommendations", json=body)
+    monkeypatch.setattr(settings, 'FAST_RESPONSES', True)
+    fast = client.post("/api/v1/recommendations", json=body)
+    assert fast.status_code == default.status_code == 200
+    assert without_time(fast.content) == without_time(default.content)
+    assert fast.headers["content-type"] == default.headers["content-type"]
+
+
+def test_orjson_decoding_keeps_422_for_bad_bodies():
+    pytest.importorskip("orjson")
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.post("/echo")
+    async def echo(data: dict):
+        return data
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.post("/echo", json={"ad": "Gəncə", "n": [1, 2.5]}).json() == {"ad": "Gəncə", "n": [1, 2.5]}
+    for bad in (b"{not json", b'{"x": NaN}', b'{"x": Infinity}'):
+        response = client.post("/echo", content=bad, headers={"Content-Type": "application/json"})
+        assert response.status_code == 422
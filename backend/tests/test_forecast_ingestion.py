@@ -0,0 +1,99 @@
+"""
+Forecast ingestion: hourly precipitation reduced to the rainfall fields at
+the window edges and the 1 mm / 48 h threshold, and batched requests that
+keep the points in order.
+"""
+
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.services.forecast_ingestion import FORECAST_HOURS, HOUR, RAIN_EXPECTED_MM, ForecastIngestion, derive_weather
+
+
+NOW = 1_750_000_000 - 1_750_000_000 % HOUR
+
+
+def location(rain, now=NOW, temperature=21.6, **current):
+    """A response location with rain = {hours from now: mm}, every other hour dry"""
+    times = [now + hour * HOUR for hour in range(-7 * 24 + 1, 3 * 24 + 1)]
+    return {
+        "current": {"time": now, "temperature_2m": temperature, "relative_humidity_2m": 64.4,
+                    "wind_speed_10m": 12.5, **current},
+        "hourly": {"time": times, "precipitation": [rain.get((t - now) // HOUR, 0.0) for t in times]},
+    }
+
+
+def test_current_values_are_rounded():
+    weather = derive_weather(location({}))
+    assert (weather["temperature"], weather["humidity"], weather["wind_speed"]) == (22, 64, 12)
+    assert weather["frost_warning"] is False
+    assert derive_weather(location({}, temperature=-0.4))["frost_warning"] is True
+
+
+@pytest.mark.parametrize("amount, expected", [
+    (0.0, False), (RAIN_EXPECTED_MM - 0.1, False), (RAIN_EXPECTED_MM, True), (12.0, True),
+])
+def test_rain_is_expected_from_1_mm_in_48_hours(amount, expected):
+    weather = derive_weather(location({FORECAST_HOURS: amount}))
+    assert weather["rainfall_forecast_48h"] is expected
+    assert weather["rainfall_forecast_amount_mm"] == amount
+
+
+def test_forecast_window_is_the_48_hours_after_now():
+    # The current hour is past; hour 48 is the last forecast hour, hour 49 is beyond it
+    weather = derive_weather(location({0: 5.0, 1: 0.4, FORECAST_HOURS: 0.4, FORECAST_HOURS + 1: 9.0}))
+    assert weather["rainfall_forecast_amount_mm"] == 0.8
+    assert weather["rainfall_forecast_48h"] is False
+    assert weather["rainfall_last_24h"] == 5.0
+
+
+def test_past_windows_end_at_now():
+    weather = derive_weather(location({0: 1.0, -23: 2.0, -24: 4.0, -7 * 24 + 1: 8.0, 2: 16.0}))
+    assert weather["rainfall_last_24h"] == 3.0
+    assert weather["rainfall_last_7days"] == 15.0
+
+
+def test_now_between_hours_and_missing_values():
+    data = location({-1: 1.0, 0: 2.0, 1: 4.0})
+    data["hourly"]["precipitation"] = [None if value == 4.0 else value for value in data["hourly"]["precipitation"]]
+    data["current"]["time"] = NOW + HOUR // 2
+    weather = derive_weather(data)
+    assert weather["rainfall_last_24h"] == 3.0
+    assert weather["rainfall_forecast_amount_mm"] == 0.0
+
+
+def test_batches_keep_point_order():
+    points = [(40.0 + i / 100, 47.0 + i / 100) for i in range(7)]
+    requests = []
+
+    def handler(request):
+        params = parse_qs(request.url.query.decode())
+        latitudes = params["latitude"][0].split(",")
+        requests.append(len(latitudes))
+        body = [location({}, temperature=float(latitude) * 100) for latitude in latitudes]
+        return httpx.Response(200, json=body if len(body) > 1 else body[0])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            ingestion = ForecastIngestion(client, "http://forecast.test", batch_size=3)
+            return ingestion, await ingestion.fetch(points)
+
+    ingestion, weather = asyncio.run(run())
+    assert sorted(requests) == [1, 3, 3]
+    assert [w["temperature"] for w in weather] == [round(latitude * 100) for latitude, _ in points]
+    assert ingestion.stats()["requests"] == 3 and ingestion.stats()["points"] == 7
+
+
+def test_a_short_response_fails_the_batch():
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[location({})]))
+        async with httpx.AsyncClient(transport=transport) as client:
+            ingestion = ForecastIngestion(client, "http://forecast.test", batch_size=5)
+            with pytest.raises(ValueError):
+                await ingestion.fetch([(40.0, 47.0), (41.0, 48.0)])
+            return ingestion
+
+    assert asyncio.run(run()).errors == 1
@@ -0,0 +1,205 @@
+"""
+Client location: the memory-mapped range table, the per-address cache in
+front of the resolvers, WeatherService.locate_client's Baku fallback, and
+X-Forwarded-For only honoured from trusted proxies.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.core.config import settings
+from app.services.ip_resolver import (
+    SPARSE_STEP, IPLocator, NetworkResolver, RangeTableResolver, address_key, is_public, write_range_table,
+)
+from app.services.weather_service import WeatherService
+
+
+GANJA = {"country": "Azerbaijan", "region": "Gəncə", "city": "Gəncə", "latitude": "40.68", "longitude": "46.36"}
+TBILISI = {"country": "Georgia", "region": "Tbilisi", "city": "Tbilisi", "latitude": "41.72", "longitude": "44.79"}
+
+
+def row(start, end, place):
+    return {"start": start, "end": end, **place}
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "ip-ranges.bin"
+    rows = [row("5.191.0.0", "5.191.255.255", GANJA), row("31.146.0.0", "31.146.255.255", TBILISI),
+            row("2a02:2c40::", "2a02:2c40:ffff:ffff:ffff:ffff:ffff:ffff", GANJA)]
+    # Enough ranges for several sparse blocks, with gaps between them
+    rows += [row(f"100.{i}.0.0", f"100.{i}.0.255", TBILISI if i % 2 else GANJA) for i in range(3 * SPARSE_STEP)]
+    write_range_table(path, rows)
+    resolver = RangeTableResolver(path)
+    yield resolver
+    resolver.close()
+
+
+class Counting:
+    """A resolver answering from a dict, counting lookups"""
+    name = "counting"
+
+    def __init__(self, locations, error=None):
+        self.locations = locations
+        self.error = error
+        self.calls = 0
+
+    async def resolve(self, address):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.locations.get(address)
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {"resolver": self.name, "calls": self.calls}
+
+
+def test_address_keys_order_both_families():
+    assert address_key("1.2.3.4") == address_key("::ffff:1.2.3.4")
+    assert address_key("1.2.3.4") < address_key("1.2.3.5") < address_key("2a02::1")
+    assert address_key("not an ip") is None
+
+
+def test_only_public_addresses_are_located():
+    assert is_public("5.191.10.1")
+    for address in ("10.0.0.1", "192.168.1.1", "127.0.0.1", "::1", "fe80::1", "", None, "junk"):
+        assert not is_public(address)
+
+
+def test_range_table_finds_range_edges(table):
+    assert table.lookup("5.191.0.0")["city"] == "Gəncə"
+    assert table.lookup("5.191.255.255")["city"] == "Gəncə"
+    assert table.lookup("31.146.7.7")["country"] == "Georgia"
+    assert table.lookup("2a02:2c40::17")["city"] == "Gəncə"
+    for address in ("5.190.255.255", "5.192.0.0", "1.1.1.1", "255.255.255.255", "bogus"):
+        assert table.lookup(address) is None
+
+
+def test_range_table_across_sparse_blocks(table):
+    for i in range(3 * SPARSE_STEP):
+        expected = "Tbilisi" if i % 2 else "Gəncə"
+        assert table.lookup(f"100.{i}.0.128")["city"] == expected
+        # Between two ranges
+        assert table.lookup(f"100.{i}.1.0") is None
+    # Every address of a location shares one dict
+    assert table.lookup("100.0.0.1") is table.lookup("5.191.1.1")
+
+
+def test_range_table_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError):
+        write_range_table(tmp_path / "t.bin", [row("5.191.0.0", "5.191.1.255", GANJA),
+                                               row("5.191.1.0", "5.191.2.255", GANJA)])
+    with pytest.raises(ValueError):
+        write_range_table(tmp_path / "t.bin", [row("5.191.2.0", "5.191.1.0", GANJA)])
+    (tmp_path / "junk.bin").write_bytes(b"not a table at all, really")
+    with pytest.raises(ValueError):
+        RangeTableResolver(tmp_path / "junk.bin")
+
+
+def test_locator_caches_found_and_unknown_addresses():
+    first, second = Counting({}), Counting({"5.191.1.1": {"city": "Gəncə"}})
+    locator = IPLocator([first, second], cache_size=2)
+
+    async def run():
+        assert (await locator.resolve("5.191.1.1"))["city"] == "Gəncə"
+        assert (await locator.resolve("5.191.1.1"))["city"] == "Gəncə"
+        assert await locator.resolve("8.8.8.8") is None
+        assert await locator.resolve("8.8.8.8") is None
+        assert await locator.resolve("192.168.0.2") is None
+    asyncio.run(run())
+
+    assert (first.calls, second.calls) == (2, 2)
+    stats = locator.stats()
+    assert (stats["hits"], stats["misses"], stats["unresolvable"]) == (2, 2, 1)
+
+
+def test_locator_does_not_cache_errors():
+    failing = Counting({}, error=httpx.ConnectError("down"))
+    locator = IPLocator([failing], cache_size=10)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await locator.resolve("5.191.1.1")
+    asyncio.run(run())
+    assert failing.calls == 2
+
+
+def test_network_resolver_maps_the_api_answer():
+    def handler(request):
+        assert request.url.path == "/5.191.1.1/json/"
+        return httpx.Response(200, json={"country_name": "Azerbaijan", "city": "Gəncə", "region": "Gəncə",
+                                         "latitude": 40.68, "longitude": 46.36})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await NetworkResolver(client, "http://geo.test/{ip}/json/").resolve("5.191.1.1")
+
+    assert asyncio.run(run()) == {"latitude": 40.68, "longitude": 46.36, "city": "Gəncə",
+                                  "country": "Azerbaijan", "region": "Gəncə"}
+
+
+@pytest.mark.parametrize("address, city, fallback", [
+    ("5.191.3.4", "Gəncə", False),     # in the table, in Azerbaijan
+    ("31.146.3.4", "Bakı", True),      # outside Azerbaijan
+    ("8.8.8.8", "Bakı", True),         # unknown
+    ("10.1.2.3", "Bakı", True),        # private
+    (None, "Bakı", True),
+])
+def test_locate_client_falls_back_to_baku(table, address, city, fallback):
+    async def run():
+        service = WeatherService(resolvers=[table])
+        try:
+            return await service.locate_client(address)
+        finally:
+            await service.client.aclose()
+
+    location, used_fallback = asyncio.run(run())
+    assert (location["city"], used_fallback) == (city, fallback)
+
+
+def connected_from(app, peer):
+    """The app as seen by a connection from `peer` (TestClient leaves the client unset)"""
+    async def asgi(scope, receive, send):
+        scope["client"] = (peer, 50000)
+        await app(scope, receive, send)
+    return asgi
+
+
+@pytest.mark.parametrize("peer, trusted, forwarded, expected", [
+    # A client that is not a trusted proxy cannot claim another address
+    ("203.0.113.7", settings.FORWARDED_ALLOW_IPS, "5.191.3.4", "203.0.113.7"),
+    ("127.0.0.1", settings.FORWARDED_ALLOW_IPS, "5.191.3.4", "5.191.3.4"),
+    # The nearest untrusted hop wins, not whatever the client put first
+    ("127.0.0.1", "127.0.0.1", "9.9.9.9, 5.191.3.4", "5.191.3.4"),
+    ("127.0.0.1", "127.0.0.1", "5.191.3.4, 10.0.0.9", "10.0.0.9"),
+    ("127.0.0.1", "127.0.0.1,10.0.0.9", "5.191.3.4, 10.0.0.9", "5.191.3.4"),
+])
+def test_weather_auto_locates_the_forwarded_client_only_behind_trusted_proxies(
+    client, monkeypatch, peer, trusted, forwarded, expected
+):
+    located = []
+    service = client.app.state.weather_service
+
+    async def locate_client(client_ip):
+        located.append(client_ip)
+        return {"latitude": 40.68, "longitude": 46.36, "city": "Gəncə", "country": "Azerbaijan", "region": ""}, False
+
+    async def fetch_weather_data(latitude, longitude):
+        return {"temperature": 20, "humidity": 50, "rainfall_last_24h": 0.0, "rainfall_last_7days": 0.0,
+                "rainfall_forecast_48h": False, "rainfall_forecast_amount_mm": 0.0, "wind_speed": 5,
+                "frost_warning": False}
+
+    monkeypatch.setattr(service, "locate_client", locate_client)
+    monkeypatch.setattr(service, "fetch_weather_data", fetch_weather_data)
+    proxied = TestClient(connected_from(ProxyHeadersMiddleware(client.app, trusted_hosts=trusted), peer))
+    response = proxied.get("/api/v1/weather/auto", headers={"X-Forwarded-For": forwarded})
+    assert response.status_code == 200
+    assert located == [expected]
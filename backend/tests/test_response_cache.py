@@ -0,0 +1,203 @@
+"""
+Cache keys reduced to rule threshold intervals (context_intervals), and
+the response cache built on them: equal keys must mean equal responses.
+"""
+
+import asyncio
+import time
+
+from app.services.context_intervals import IntervalCanonicalizer
+from app.services.response_cache import ResponseCache
+from app.services.rule_engine import RuleEngine
+from app.services.rule_compiler import RuleCompiler
+from tests.conftest import comparable
+
+
+def canonicalizer(*conditions):
+    compiler = RuleCompiler()
+    return IntervalCanonicalizer([
+        compiler.compile_rule({'rule_id': f'R{i}', 'conditions': {'operator': 'AND', 'items': items}}, 'test')
+        for i, items in enumerate(conditions)
+    ])
+
+
+def key(canon, **values):
+    return canon.key({field.replace('__', '.'): value for field, value in values.items()})
+
+
+def test_values_between_thresholds_share_a_key():
+    canon = canonicalizer(
+        [{'field': 'weather.temperature', 'operator': '>', 'value': 25}],
+        [{'field': 'weather.temperature', 'operator': '>=', 'value': 32}],
+    )
+    assert canon.thresholds == {'weather.temperature': [25.0, 32.0]}
+    assert key(canon, weather__temperature=27.3) == key(canon, weather__temperature=29.8)
+    assert key(canon, weather__temperature=-5) == key(canon, weather__temperature=24.9)
+    assert key(canon, weather__temperature=33) == key(canon, weather__temperature=60)
+
+
+def test_thresholds_are_intervals_of_their_own():
+    canon = canonicalizer([{'field': 'weather.temperature', 'operator': '>', 'value': 25}])
+    below, at, above = (key(canon, weather__temperature=t) for t in (24.9, 25, 25.1))
+    assert len({below, at, above}) == 3
+    assert key(canon, weather__temperature=25) == key(canon, weather__temperature=25.0)
+
+
+def test_missing_and_non_numeric_values_are_kept_apart():
+    canon = canonicalizer([{'field': 'weather.temperature', 'operator': '<', 'value': 5}])
+    keys = [key(canon), key(canon, weather__temperature=1), key(canon, weather__temperature='1'),
+            key(canon, weather__temperature=True), key(canon, weather__temperature=float('nan'))]
+    assert len(set(keys)) == len(keys)
+
+
+def test_fields_compared_any_other_way_stay_exact():
+    canon = canonicalizer(
+        [{'field': 'soil.soil_moisture', 'operator': '<', 'value': 30}],
+        [{'field': 'soil.soil_moisture', 'operator': 'IN', 'value': [10, 20]}],
+        [{'field': 'crop_context.stage', 'operator': '==', 'value': 'heading'}],
+    )
+    assert 'soil.soil_moisture' not in canon.thresholds
+    assert key(canon, soil__soil_moisture=11) != key(canon, soil__soil_moisture=12)
+    assert key(canon, crop_context__stage='heading') != key(canon, crop_context__stage='tillering')
+
+
+def test_fields_no_rule_reads_are_left_out():
+    canon = canonicalizer([{'field': 'weather.temperature', 'operator': '>', 'value': 25}])
+    assert key(canon, weather__temperature=30) == key(canon, weather__temperature=30, weather__humidity=10)
+
+
+def test_equal_keys_get_the_response_of_a_fresh_evaluation(engine, requests):
+    async def run():
+        cache = ResponseCache(max_entries=1000, ttl=300)
+        for request in requests:
+            await cache.get_or_evaluate(engine, request)
+        # Every cached answer, hit or miss, is what the engine gives on its own
+        for request in requests:
+            assert comparable(await cache.get_or_evaluate(engine, request)) == comparable(engine.evaluate(request))
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.hits >= len(requests)
+
+
+def test_hits_are_copies_with_their_own_time(engine, requests):
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        first = await cache.get_or_evaluate(engine, requests[0])
+        first.critical_alerts.clear()
+        second = await cache.get_or_evaluate(engine, requests[0])
+        return cache, first, second
+
+    cache, first, second = asyncio.run(run())
+    assert cache.hits == 1
+    assert second is not first
+    assert second.generated_at > first.generated_at
+    # Changing a returned response does not change the cached one
+    assert comparable(second) == comparable(engine.evaluate(requests[0]))
+
+
+def test_a_new_ruleset_version_empties_the_cache(rules, constants, requests):
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        await cache.get_or_evaluate(RuleEngine(rules, constants, version='v1'), requests[0])
+        await cache.get_or_evaluate(RuleEngine(rules, constants, version='v2'), requests[0])
+        return cache
+
+    cache = asyncio.run(run())
+    assert (cache.misses, cache.hits, cache.invalidations) == (2, 0, 1)
+
+
+def slow_engine(rules, constants, version='v1', error=None):
+    """An engine whose evaluations take long enough to overlap, counting them"""
+    engine = RuleEngine(rules, constants, version=version)
+    engine.evaluations = 0
+    evaluate_context = engine.evaluate_context
+
+    def slow(request, context):
+        engine.evaluations += 1
+        time.sleep(0.05)
+        if error is not None:
+            raise error
+        return evaluate_context(request, context)
+    engine.evaluate_context = slow
+    return engine
+
+
+def test_identical_misses_in_flight_evaluate_once(rules, constants, engine, requests):
+    slow = slow_engine(rules, constants)
+
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        responses = await asyncio.gather(*(cache.get_or_evaluate(slow, requests[0]) for _ in range(5)))
+        return cache, responses
+
+    cache, responses = asyncio.run(run())
+    assert slow.evaluations == 1
+    assert (cache.misses, cache.coalesced, cache.hits) == (1, 4, 0)
+    assert cache.stats()["in_flight"] == 0
+    assert len({id(response) for response in responses}) == 5
+    for response in responses:
+        assert comparable(response) == comparable(engine.evaluate(requests[0]))
+
+
+def test_different_misses_are_not_coalesced(rules, constants, requests):
+    slow = slow_engine(rules, constants)
+    distinct = {slow.match_key(slow._build_context(request)): request for request in requests}
+    batch = list(distinct.values())[:4]
+
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        await asyncio.gather(*(cache.get_or_evaluate(slow, request) for request in batch))
+        return cache
+
+    cache = asyncio.run(run())
+    assert slow.evaluations == len(batch)
+    assert (cache.misses, cache.coalesced) == (len(batch), 0)
+
+
+def test_a_failed_evaluation_reaches_every_waiter(rules, constants, requests):
+    slow = slow_engine(rules, constants, error=ValueError("boom"))
+
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        outcomes = await asyncio.gather(
+            *(cache.get_or_evaluate(slow, requests[0]) for _ in range(3)), return_exceptions=True
+        )
+        return cache, outcomes
+
+    cache, outcomes = asyncio.run(run())
+    assert slow.evaluations == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert cache.stats()["entries"] == cache.stats()["in_flight"] == 0
+
+
+def test_a_cancelled_first_request_does_not_cancel_the_waiters(rules, constants, requests):
+    slow = slow_engine(rules, constants)
+
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        first = asyncio.ensure_future(cache.get_or_evaluate(slow, requests[0]))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_evaluate(slow, requests[0]))
+        await asyncio.sleep(0)
+        first.cancel()
+        return cache, await second
+
+    cache, response = asyncio.run(run())
+    assert response.farm_type == requests[0].farm_type
+    assert slow.evaluations == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_misses_never_wait_for_another_ruleset_version(rules, constants, requests):
+    old, new = slow_engine(rules, constants, 'v1'), slow_engine(rules, constants, 'v2')
+
+    async def run():
+        cache = ResponseCache(max_entries=10, ttl=300)
+        await asyncio.gather(cache.get_or_evaluate(old, requests[0]), cache.get_or_evaluate(new, requests[0]))
+        return cache
+
+    cache = asyncio.run(run())
+    assert (old.evaluations, new.evaluations) == (1, 1)
+    assert cache.coalesced == 0
+    assert cache.version == 'v2' and cache.stats()["entries"] == 1
@@ -0,0 +1,108 @@
+"""
+Hot reload: the engine is swapped only for a changed, valid ruleset; a
+worker forked from an older preloaded ruleset catches up; the admin reload
+signals the app.serve master so every worker is replaced.
+"""
+
+import asyncio
+import signal
+from types import SimpleNamespace
+
+import pytest
+from starlette.datastructures import State
+
+from app.main import load_ruleset
+from app.services import rule_reloader
+from app.services.rule_reloader import RuleReloader, rebuild_preloaded
+
+
+@pytest.fixture
+def app(data_path):
+    app = SimpleNamespace(state=State())
+    load_ruleset(app)
+    return app
+
+
+@pytest.fixture
+def signals(monkeypatch):
+    sent = []
+    monkeypatch.setattr(rule_reloader.os, 'kill', lambda pid, sig: sent.append((pid, sig)))
+    return sent
+
+
+def edit(data_path, relative="rules/wheat/irrigation.json", text=None):
+    path = data_path / relative
+    path.write_text(text if text is not None else path.read_text(encoding='utf-8') + "\n", encoding='utf-8')
+
+
+def reload(app, **kwargs):
+    return asyncio.run(RuleReloader(app).reload(**kwargs))
+
+
+def test_unchanged_files_keep_the_engine(app):
+    engine = app.state.engine
+    assert reload(app) == {"status": "unchanged", "version": engine.version}
+    assert app.state.engine is engine
+
+
+def test_edited_files_swap_the_engine(app, data_path):
+    engine = app.state.engine
+    edit(data_path)
+    result = reload(app)
+    assert result["status"] == "reloaded"
+    assert result["previous_version"] == engine.version
+    assert app.state.engine.version == result["version"] != engine.version
+    assert app.state.rules is app.state.rule_loader.load_all_rules()
+
+
+def test_invalid_files_keep_the_previous_engine(app, data_path):
+    engine = app.state.engine
+    reloader = RuleReloader(app)
+    edit(data_path, text="{not json")
+    result = asyncio.run(reloader.reload())
+    assert result["status"] == "failed"
+    assert app.state.engine is engine
+    assert reloader.failed_count == 1
+    # Not retried until the files change again
+    assert asyncio.run(reloader.reload())["status"] == "unchanged"
+
+
+def test_worker_of_an_older_preload_catches_up(app, data_path):
+    # The master loaded before the edit; a worker forked later starts from its state
+    edit(data_path)
+    assert reload(app)["status"] == "reloaded"
+
+
+def test_admin_reload_signals_the_master(app, data_path, signals):
+    app.state.master_pid = 4242
+    edit(data_path)
+    result = reload(app, broadcast=True)
+    assert result["workers"] == "restarting"
+    assert signals == [(4242, signal.SIGHUP)]
+
+    # Nothing changed: no restart unless forced
+    assert reload(app, broadcast=True)["workers"] == "this worker only"
+    assert reload(app, force=True, broadcast=True)["workers"] == "restarting"
+    assert len(signals) == 2
+
+
+def test_reload_without_a_master_reaches_this_worker_only(app, data_path, signals):
+    edit(data_path)
+    assert reload(app, broadcast=True)["workers"] == "this worker only"
+    assert reload(app)["status"] == "unchanged"
+    assert signals == []
+
+
+def test_master_rebuild_installs_a_valid_ruleset(app, data_path):
+    edit(data_path)
+    version = rebuild_preloaded(app)
+    assert version is not None and app.state.engine.version == version
+    # Workers forked from the rebuilt master start current
+    assert reload(app)["status"] == "unchanged"
+
+
+def test_master_rebuild_keeps_its_ruleset_on_failure(app, data_path):
+    engine = app.state.engine
+    edit(data_path, text="{not json")
+    assert rebuild_preloaded(app) is None
+    assert app.state.engine is engine
@@ -0,0 +1,68 @@
+"""
+Rule search folding (rule_search.fold): Azerbaijani dotted and dotless i,
+ə and the other diacritics, case, rule id parts and typos.
+"""
+
+import pytest
+
+from app.services.rule_search import RuleSearchIndex, fold, tokenize
+
+
+@pytest.fixture(scope="module")
+def index(rules):
+    return RuleSearchIndex(rules)
+
+
+def ids(index, query):
+    return [rule['rule_id'] for rule in index.search(query)[1]]
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("İstilik", "istilik"),
+    ("ISTILIK", "istilik"),
+    ("ıstılık", "istilik"),
+    ("TƏCİLİ", "tecili"),
+    ("Şəki-Zaqatala", "seki-zaqatala"),
+    ("gübrələmə", "gubreleme"),
+    ("Çiçəkləmə", "cicekleme"),
+    ("Ağcabədi", "agcabedi"),
+    ("Göyçay", "goycay"),
+])
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+def test_rule_ids_yield_their_parts():
+    tokens = tokenize("WHT_IRR_001")
+    assert {"wht_irr_001", "wht", "irr", "001", "irr_001"} <= set(tokens)
+
+
+@pytest.mark.parametrize("variants", [
+    ("təcili", "TƏCİLİ", "tecili", "Tecili"),
+    ("istilik", "İstilik", "ISTILIK", "ıstılık"),
+    ("suvarma", "SUVARMA", "Suvarma"),
+])
+def test_folded_variants_find_the_same_rules(index, variants):
+    results = [ids(index, query) for query in variants]
+    assert results[0]
+    assert all(result == results[0] for result in results)
+
+
+def test_rule_id_tail_finds_the_rule(index):
+    assert ids(index, "irr_001")[0] == "WHT_IRR_001"
+    assert ids(index, "wht_irr_001") == ["WHT_IRR_001"]
+
+
+def test_typos_and_prefixes_still_match(index):
+    exact = ids(index, "suvarma")
+    assert ids(index, "suvarna")[0] == exact[0]
+    assert set(ids(index, "suvar")) >= set(exact)
+
+
+def test_every_query_word_must_match(index):
+    assert ids(index, "suvarma zzzzqqq") == []
+
+
+def test_blank_query_lists_every_rule(index, rules):
+    total, _ = index.search("  ")
+    assert total == sum(len((data or {}).get('rules', [])) for farm in rules.values() for data in farm.values())
@@ -0,0 +1,77 @@
+"""
+Ruleset snapshots: a second load with unchanged files comes from the
+snapshot and equals the parsed JSON, older snapshots are removed, and a
+snapshot anyone could have written is never unpickled.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.rule_loader import RuleLoader
+from app.services.ruleset_snapshot import snapshot_path
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "ruleset"
+    monkeypatch.setattr(settings, 'RULES_SNAPSHOT_DIR', str(directory))
+    return directory
+
+
+def load():
+    loader = RuleLoader()
+    return loader, loader.load_with_snapshot()
+
+
+def test_default_directory_is_outside_the_source_tree():
+    backend = Path(__file__).resolve().parents[1]
+    assert backend not in Path(settings.RULES_SNAPSHOT_DIR).resolve().parents
+
+
+def test_second_load_comes_from_the_snapshot(snapshot_dir):
+    parsed, source = load()
+    assert source == "json"
+    path = snapshot_path(parsed.content_hash())
+    assert path.exists() and path.parent == snapshot_dir
+
+    loaded, source = load()
+    assert source == "snapshot"
+    assert loaded.load_all_rules() == parsed.load_all_rules()
+    assert loaded.load_constants() == parsed.load_constants()
+    assert loaded.load_profiles() == parsed.load_profiles()
+    assert loaded.build_search_index().search('irr_001')[0] > 0
+
+
+def test_snapshots_of_older_content_are_removed(snapshot_dir):
+    stale = snapshot_dir / "ruleset-0000000000000000.pickle"
+    snapshot_dir.mkdir()
+    stale.write_bytes(b"stale")
+    parsed, _ = load()
+    assert not stale.exists()
+    assert list(snapshot_dir.glob('ruleset-*.pickle')) == [snapshot_path(parsed.content_hash())]
+
+
+def test_unreadable_snapshot_falls_back_to_json(snapshot_dir):
+    parsed, _ = load()
+    snapshot_path(parsed.content_hash()).write_bytes(b"not a pickle")
+    _, source = load()
+    assert source == "json"
+
+
+@pytest.mark.parametrize("target", ["file", "directory"])
+def test_world_writable_snapshot_is_ignored(snapshot_dir, target):
+    parsed, _ = load()
+    path = snapshot_path(parsed.content_hash())
+    writable = path if target == "file" else snapshot_dir
+    os.chmod(writable, os.stat(writable).st_mode | 0o002)
+    _, source = load()
+    assert source == "json"
+
+
+def test_empty_directory_setting_disables_snapshots(monkeypatch):
+    monkeypatch.setattr(settings, 'RULES_SNAPSHOT_DIR', "")
+    assert load()[1] == "json"
+    assert load()[1] == "json"
@@ -0,0 +1,70 @@
+"""
+Numeric thresholds in the candidate index and the atom bitset: comparisons
+whose value is NaN, infinite or not a number are left to the rule's own
+predicate and must match exactly like the compiled rule.
+"""
+
+import math
+
+import pytest
+
+from app.services.bitset_matcher import BitsetMatcher
+from app.services.rule_compiler import RuleCompiler
+from app.services.rule_index import RuleIndex
+from app.services.threshold_index import FieldThresholds, numeric_threshold
+
+
+FIELD = 'weather.temperature'
+
+VALUES = ['nan', 'NaN', float('nan'), 'inf', '-inf', float('inf'), 'warm', 30, '35', 25.5]
+
+CONTEXT_VALUES = [None, -1e9, 0, 25.5, 30, 30.0, 31, 35, 1e9, float('nan'), float('inf'), float('-inf'), 'hot']
+
+
+def compiled_rules():
+    compiler = RuleCompiler()
+    return [
+        compiler.compile_rule({
+            'rule_id': f'R{i}',
+            'conditions': {'operator': 'AND', 'items': [{'field': FIELD, 'operator': op, 'value': value}]},
+        }, 'test')
+        for i, (op, value) in enumerate((op, value) for value in VALUES for op in ('>', '>=', '<', '<='))
+    ]
+
+
+def expected(rules, context):
+    return [rule.rule['rule_id'] for rule in rules if rule.matches(context)]
+
+
+def test_numeric_threshold_rejects_non_finite():
+    assert numeric_threshold('32') == 32.0
+    assert numeric_threshold(32) == 32.0
+    for value in ('nan', float('nan'), 'inf', float('-inf'), 'warm', None, [1]):
+        assert numeric_threshold(value) is None
+
+
+def test_field_thresholds_stay_sorted_without_nan():
+    field = FieldThresholds(FIELD)
+    for value in VALUES:
+        threshold = numeric_threshold(value)
+        if threshold is not None:
+            field.add('>', threshold)
+    field.freeze()
+    assert all(not math.isnan(threshold) for threshold in field._thresholds)
+    assert field._thresholds == sorted(field._thresholds)
+
+
+@pytest.mark.parametrize("value", CONTEXT_VALUES)
+def test_rule_index_matches_predicates(value):
+    rules = compiled_rules()
+    index = RuleIndex(rules)
+    context = {FIELD: value}
+    assert [rule.rule['rule_id'] for rule in index.match(context)] == expected(rules, context)
+
+
+@pytest.mark.parametrize("value", CONTEXT_VALUES)
+def test_bitset_matches_predicates(value):
+    rules = compiled_rules()
+    matcher = BitsetMatcher(rules)
+    context = {FIELD: value}
+    assert [rule.rule['rule_id'] for rule in matcher.match(context)] == expected(rules, context)
@@ -0,0 +1,55 @@
+"""
+top_k / min_urgency: the limited response must be the head of the full
+ranking (urgency descending, ties in load order), whichever engine stops early.
+"""
+
+from typing import List
+
+import pytest
+
+from app.services.columnar_engine import ColumnarEngine
+from app.services.rule_engine import RuleEngine
+
+
+GROUPS = ('critical_alerts', 'high_priority', 'medium_priority', 'low_priority', 'info')
+
+
+def ranked(response) -> List[tuple]:
+    return [(action.rule_id, action.urgency_score) for group in GROUPS for action in getattr(response, group)]
+
+
+@pytest.fixture(scope="module", params=["indexed", "bitset", "columnar"])
+def limited_engine(request, rules, constants):
+    if request.param == "columnar":
+        return ColumnarEngine(rules, constants)
+    return RuleEngine(rules, constants, evaluation_mode=request.param)
+
+
+def test_ranking_is_by_urgency(engine, requests):
+    for request in requests:
+        scores = [score for _, score in ranked(engine.evaluate(request))]
+        assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 10])
+def test_top_k_is_the_head_of_the_ranking(engine, limited_engine, requests, top_k):
+    for request in requests:
+        full = ranked(engine.evaluate(request))
+        limited = limited_engine.evaluate(request.model_copy(update={'top_k': top_k}))
+        assert ranked(limited) == full[:top_k]
+        assert limited.total_recommendations == min(top_k, len(full))
+
+
+@pytest.mark.parametrize("min_urgency", [0, 50, 80, 100])
+def test_min_urgency_keeps_rules_at_or_above(engine, limited_engine, requests, min_urgency):
+    for request in requests:
+        full = ranked(engine.evaluate(request))
+        limited = limited_engine.evaluate(request.model_copy(update={'min_urgency': min_urgency}))
+        assert ranked(limited) == [(rule_id, score) for rule_id, score in full if score >= min_urgency]
+
+
+def test_top_k_and_min_urgency_together(engine, limited_engine, requests):
+    for request in requests:
+        full = ranked(engine.evaluate(request))
+        limited = limited_engine.evaluate(request.model_copy(update={'top_k': 2, 'min_urgency': 60}))
+        assert ranked(limited) == [entry for entry in full if entry[1] >= 60][:2]
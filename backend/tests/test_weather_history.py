@@ -0,0 +1,198 @@
+"""
+Weather history: ring slots wrapping around, gaps and missing values in the
+windowed aggregates, the lag cut-off for current aggregates, a mapped file
+reopened, and the aggregates reaching rules and /weather/auto.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import routes
+from app.models.schemas import RecommendationRequest
+from app.services.columnar_engine import ColumnarEngine
+from app.services.rule_engine import RuleEngine
+from app.services.weather_history import DAY, HISTORY_FIELDS, HOUR, MAX_LAG_HOURS, WeatherHistory
+
+
+START = 1_750_000_000 // HOUR
+POINT = (40.41, 49.87)
+
+
+def fetch(first_hour, temperature, humidity=None, precipitation=None, wind=None, now_hour=None):
+    """An Open-Meteo location with hourly series from first_hour, now at the last hour by default"""
+    count = len(temperature)
+    return {
+        "current": {"time": (now_hour if now_hour is not None else first_hour + count - 1) * HOUR},
+        "hourly": {
+            "time": [(first_hour + i) * HOUR for i in range(count)],
+            "temperature_2m": temperature,
+            "relative_humidity_2m": humidity or [50.0] * count,
+            "precipitation": precipitation or [0.0] * count,
+            "wind_speed_10m": wind or [5.0] * count,
+        },
+    }
+
+
+@pytest.fixture
+def history():
+    history = WeatherHistory(None, days=2, grid_degrees=0.1)
+    yield history
+    history.close()
+
+
+def test_ring_wraps_around(history):
+    temperatures = [float(i) for i in range(100)]
+    for first in range(0, 100, 25):
+        summary = history.record(*POINT, fetch(START + first, temperatures[first:first + 25]))
+    # Only the last 48 hours are kept, each in its own slot
+    assert sorted(history._hours[0]) == list(range(START + 52, START + 100))
+    assert summary["temperature_max_24h"] == 99.0
+    assert summary["temperature_min_24h"] == 76.0
+    # 70 hours at 30 °C or more, but a run cannot reach back past the ring
+    assert summary["consecutive_hot_hours"] == 2 * DAY
+    # Windows longer than the ring are never covered
+    assert summary["temperature_max_7days"] is None
+    assert summary["rainfall_last_30days"] is None
+
+
+def test_refetched_hours_overwrite_themselves(history):
+    history.record(*POINT, fetch(START, [20.0] * 30))
+    summary = history.record(*POINT, fetch(START + 10, [25.0] * 20))
+    assert (summary["temperature_max_24h"], summary["temperature_min_24h"]) == (25.0, 20.0)
+    assert history.stats()["hours_stored"] == 30
+
+
+def test_gap_limits_windows_and_runs(history):
+    history.record(*POINT, fetch(START, [35.0] * 30))
+    # 5 hours never fetched, then 20 known ones
+    summary = history.record(*POINT, fetch(START + 35, [35.0] * 20))
+    assert summary["temperature_max_24h"] is None
+    assert summary["consecutive_hot_hours"] == 20
+    summary = history.record(*POINT, fetch(START + 55, [31.0] * 4))
+    assert summary["temperature_max_24h"] == 35.0
+    assert summary["consecutive_hot_hours"] == 24
+
+
+def test_missing_values_are_skipped_and_end_runs(history):
+    temperature = [33.0] * 24
+    temperature[-3] = None
+    summary = history.record(*POINT, fetch(START, temperature, wind=[None] * 24))
+    assert summary["temperature_max_24h"] == 33.0
+    assert summary["consecutive_hot_hours"] == 2
+    # An unknown wind at every hour leaves no extreme; the window is still known
+    assert summary["wind_speed_max_24h"] is None
+
+
+def test_rain_over_30_days_counts_missing_hours_dry():
+    history = WeatherHistory(None, days=30, grid_degrees=0.1)
+    precipitation = [0.5] * (30 * DAY)
+    precipitation[0] = precipitation[100] = None
+    summary = history.record(*POINT, fetch(START, [10.0] * (30 * DAY), precipitation=precipitation))
+    assert summary["rainfall_last_30days"] == 0.5 * (30 * DAY - 2)
+    assert summary["temperature_max_7days"] == 10.0
+    history.close()
+
+
+def test_forecast_hours_are_not_history(history):
+    summary = history.record(*POINT, fetch(START, [10.0] * 24 + [40.0] * 24, now_hour=START + 23))
+    assert summary["temperature_max_24h"] == 10.0
+    assert int(history._latest[0]) == START + 23
+    # Nothing past: the cell's aggregates as they were
+    assert history.record(*POINT, fetch(START + 30, [50.0], now_hour=START + 29)) == summary
+
+
+def test_summary_only_while_current(history):
+    assert history.summary(*POINT) is None
+    history.record(*POINT, fetch(START, [20.0] * 24))
+    latest = START + 23
+    assert history.summary(*POINT, now=(latest + MAX_LAG_HOURS) * HOUR + HOUR - 1) is not None
+    assert history.summary(*POINT, now=(latest + MAX_LAG_HOURS + 1) * HOUR) is None
+    # A point elsewhere in the cell shares it; the next cell does not
+    assert history.summary(POINT[0] + 0.01, POINT[1], now=latest * HOUR) is not None
+    assert history.summary(POINT[0] + 0.1, POINT[1], now=latest * HOUR) is None
+    assert (history.stats()["reads"], history.stats()["lagging"]) == (2, 1)
+
+
+def test_full_history_reuses_the_oldest_cell():
+    history = WeatherHistory(None, days=1, grid_degrees=0.1, max_cells=2)
+    history.record(0.0, 0.0, fetch(START, [1.0]))
+    history.record(1.0, 0.0, fetch(START + 5, [2.0]))
+    history.record(2.0, 0.0, fetch(START + 6, [3.0]))
+    assert history.summary(0.0, 0.0, now=(START + 6) * HOUR) is None
+    assert history.summary(1.0, 0.0, now=(START + 6) * HOUR) is not None
+    assert history.stats()["evictions"] == 1
+    history.close()
+
+
+def test_mapped_file_is_kept_across_reopens(tmp_path):
+    path = tmp_path / "history.bin"
+    history = WeatherHistory(path, days=2, grid_degrees=0.1)
+    summary = history.record(*POINT, fetch(START, [float(i % 40) for i in range(40)]))
+    # One writer: a second process (or instance) keeps its history in memory
+    other = WeatherHistory(path, days=2, grid_degrees=0.1)
+    assert other.path is None
+    other.close()
+    history.close()
+
+    reopened = WeatherHistory(path, days=2, grid_degrees=0.1)
+    assert reopened.path == path
+    assert reopened.summary(*POINT, now=(START + 39) * HOUR) == summary
+    reopened.close()
+
+    # Another layout starts anew
+    resized = WeatherHistory(path, days=3, grid_degrees=0.1)
+    assert resized.summary(*POINT, now=(START + 39) * HOUR) is None
+    assert resized.stats()["cells"] == 0
+    resized.close()
+
+
+@pytest.mark.parametrize("mode", ["indexed", "bitset", "columnar"])
+@pytest.mark.parametrize("hot_hours, expected", [(None, False), (5, False), (6, True), (30, True)])
+def test_heat_stress_rule_reads_hot_hours(rules, constants, mode, hot_hours, expected):
+    engine = ColumnarEngine(rules, constants) if mode == "columnar" else RuleEngine(
+        rules, constants, evaluation_mode=mode
+    )
+    request = RecommendationRequest(
+        farm_type="livestock",
+        region="aran",
+        weather={"temperature": 32, "humidity": 50, "consecutive_hot_hours": hot_hours},
+        livestock_context={"animal_type": "cattle", "barn_hygiene_score": 8},
+    )
+    response = engine.evaluate(request)
+    rule_ids = {
+        action.rule_id
+        for group in ("critical_alerts", "high_priority", "medium_priority", "low_priority", "info")
+        for action in getattr(response, group)
+    }
+    assert ("LVS_DIS_006" in rule_ids) is expected
+
+
+def test_weather_auto_prefers_the_located_cell(client, monkeypatch):
+    service = client.app.state.weather_service
+    history = WeatherHistory(None, days=2, grid_degrees=0.1)
+    now_hour = int(time.time()) // HOUR
+    point = history.record(*POINT, fetch(now_hour - 29, [32.0] * 30))
+    regional = {"temperature": 20, "humidity": 50, "rainfall_last_24h": 0.0, "rainfall_last_7days": 0.0,
+                "rainfall_forecast_48h": False, "rainfall_forecast_amount_mm": 0.0, "wind_speed": 5,
+                "frost_warning": False, **dict.fromkeys(HISTORY_FIELDS), "consecutive_hot_hours": 3}
+    snapshot = SimpleNamespace(weather=regional, age=lambda: 60)
+    latitude = POINT[0]
+
+    async def locate_client(client_ip):
+        return {"latitude": latitude, "longitude": POINT[1], "city": "Bakı", "country": "Azerbaijan",
+                "region": ""}, False
+
+    monkeypatch.setattr(service, "history", history)
+    monkeypatch.setattr(service, "locate_client", locate_client)
+    monkeypatch.setattr(routes, "_region_weather", lambda request, region: snapshot)
+    body = client.get("/api/v1/weather/auto").json()
+    assert body["weather_source"] == "region"
+    assert {field: body[field] for field in HISTORY_FIELDS} == point
+    assert body["consecutive_hot_hours"] == 30
+
+    # No history kept for the located cell: the region's averages
+    latitude = POINT[0] + 1
+    assert client.get("/api/v1/weather/auto").json()["consecutive_hot_hours"] == 3
+    history.close()
@@ -0,0 +1,150 @@
+"""
+Regional weather snapshots (weather_refresher): fresh, stale, expired and
+missing reads, stale-while-revalidate and its retry throttle.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.schemas import WeatherData
+from app.services import weather_refresher
+from app.services.weather_refresher import RegionSnapshot, RegionWeatherRefresher, combine, region_points
+
+
+INTERVAL = 600
+MAX_STALENESS = 1800
+
+READING = {
+    "temperature": 30.0, "humidity": 40.0, "rainfall_last_24h": 0.0, "rainfall_last_7days": 2.0,
+    "rainfall_forecast_48h": False, "rainfall_forecast_amount_mm": 0.0, "wind_speed": 10.0,
+    "frost_warning": False,
+}
+
+
+@pytest.fixture
+def points_path(tmp_path):
+    path = tmp_path / "region_points.json"
+    path.write_text(json.dumps({"regions": {
+        "aran": [{"name": "A", "latitude": 40.3, "longitude": 48.1}, {"name": "B", "latitude": 40.0, "longitude": 48.4}],
+        "lankaran": [{"name": "C", "latitude": 38.7, "longitude": 48.8}],
+    }}))
+    return path
+
+
+@pytest.fixture
+def refresher(points_path):
+    return RegionWeatherRefresher(SimpleNamespace(state=SimpleNamespace()), INTERVAL, MAX_STALENESS, 0.1, points_path)
+
+
+def snapshot(age: float) -> RegionSnapshot:
+    weather = combine([READING])
+    return RegionSnapshot(weather, WeatherData(**weather), {"A": READING}, time.monotonic() - age, datetime.now())
+
+
+def reads(refresher):
+    return refresher.fresh, refresher.stale, refresher.expired, refresher.missing
+
+
+def test_region_points_are_read_from_the_points_file(points_path):
+    points = region_points(points_path)
+    assert points == {"aran": [("A", 40.3, 48.1), ("B", 40.0, 48.4)], "lankaran": [("C", 38.7, 48.8)]}
+    assert region_points(points_path.parent / "missing.json") == {}
+
+
+def test_fresh_snapshot_is_served(refresher):
+    refresher._snapshots["aran"] = snapshot(INTERVAL / 2)
+    assert refresher.get("aran") is refresher._snapshots["aran"]
+    assert reads(refresher) == (1, 0, 0, 0)
+
+
+def test_stale_snapshot_is_still_served(refresher):
+    refresher._snapshots["aran"] = snapshot(INTERVAL + 1)
+    assert refresher.get("aran") is refresher._snapshots["aran"]
+    assert reads(refresher) == (0, 1, 0, 0)
+
+
+def test_expired_snapshot_is_not_served(refresher):
+    refresher._snapshots["aran"] = snapshot(MAX_STALENESS + 1)
+    assert refresher.get("aran") is None
+    assert reads(refresher) == (0, 0, 1, 0)
+
+
+def test_missing_snapshot(refresher):
+    assert refresher.get("aran") is None
+    assert reads(refresher) == (0, 0, 0, 1)
+
+
+def test_max_staleness_is_never_below_the_interval(points_path):
+    refresher = RegionWeatherRefresher(SimpleNamespace(state=SimpleNamespace()), 600, 60, 0.1, points_path)
+    assert refresher.max_staleness == 600
+
+
+def test_no_revalidation_without_the_background_task(refresher):
+    refresher._snapshots["aran"] = snapshot(INTERVAL + 1)
+    refresher.get("aran")
+    refresher.get("lankaran")
+    assert refresher.revalidations == 0
+
+
+def test_stale_and_missing_reads_revalidate_once_per_retry_window(refresher, monkeypatch):
+    refreshed = []
+
+    async def refresh_regions(regions):
+        refreshed.append(list(regions))
+        now = time.monotonic()
+        for region in regions:
+            refresher._metrics.setdefault(region, {})['last_attempt'] = now
+        return True
+
+    monkeypatch.setattr(refresher, "refresh_regions", refresh_regions)
+
+    async def run():
+        refresher._task = asyncio.create_task(asyncio.sleep(3600))
+        try:
+            refresher._snapshots["aran"] = snapshot(INTERVAL + 1)
+            refresher._snapshots["lankaran"] = snapshot(INTERVAL / 2)
+            refresher.get("aran")
+            # Already refreshing: no second refresh for the same region
+            refresher.get("aran")
+            refresher.get("lankaran")
+            await asyncio.sleep(0)
+            # Refreshed less than RETRY_AFTER ago: not again
+            refresher.get("aran")
+            await asyncio.sleep(0)
+        finally:
+            refresher._task.cancel()
+
+    asyncio.run(run())
+    assert refreshed == [["aran"]]
+    assert refresher.revalidations == 1
+
+
+def test_failed_region_is_retried_after_the_retry_window(refresher, monkeypatch):
+    async def run():
+        refresher._task = asyncio.create_task(asyncio.sleep(3600))
+        try:
+            refresher._metrics["aran"] = {'last_attempt': time.monotonic() - weather_refresher.RETRY_AFTER - 1}
+            monkeypatch.setattr(refresher, "refresh_regions", lambda regions: asyncio.sleep(0))
+            refresher.get("aran")
+            await asyncio.sleep(0)
+        finally:
+            refresher._task.cancel()
+
+    asyncio.run(run())
+    assert refresher.revalidations == 1
+
+
+def test_combine_averages_points():
+    hot = {**READING, "temperature": 34.0, "frost_warning": True, "consecutive_hot_hours": 5}
+    cool = {**READING, "temperature": 26.0, "consecutive_hot_hours": 2}
+    weather = combine([hot, cool])
+    assert weather["temperature"] == 30.0
+    assert weather["frost_warning"] is True
+    # Runs: the longest at any point; other history fields None unless every point has them
+    assert weather["consecutive_hot_hours"] == 5
+    assert weather["rainfall_last_30days"] is None
@@ -12,6 +12,7 @@ import DailySchedule from '@/components/DailySchedule';
 import {
   getRecommendations,
   autoFetchWeather,
+  WEATHER_HISTORY_FIELDS,
   REGIONS,
   CROP_STAGES,
   ANIMAL_TYPES,
@@ -98,11 +99,12 @@ export default function RecommendationsPage() {
         temperature: result.temperature,
         humidity: result.humidity,
         rainfall_last_24h: result.rainfall_last_24h,
-        rainfall_last_7days: 0,
-        rainfall_forecast_48h: false,
-        rainfall_forecast_amount_mm: 0,
+        rainfall_last_7days: result.rainfall_last_7days,
+        rainfall_forecast_48h: result.rainfall_forecast_48h,
+        rainfall_forecast_amount_mm: result.rainfall_forecast_amount_mm,
         wind_speed: result.wind_speed,
         frost_warning: result.frost_warning,
+        ...Object.fromEntries(WEATHER_HISTORY_FIELDS.map((field) => [field, result[field]])),
       });
 
       // Update region based on detected location (backend provides mapped region)
@@ -136,10 +138,16 @@ export default function RecommendationsPage() {
         }
       }
 
+      // History aggregates describe the detected location, not manually entered weather
+      const sentWeather: WeatherData = { ...weather };
+      if (!autoMode) {
+        WEATHER_HISTORY_FIELDS.forEach((field) => delete sentWeather[field]);
+      }
+
       const request: RecommendationRequest = {
         farm_type: farmType,
         region: region,
-        weather: weather,
+        weather: sentWeather,
         soil: farmType !== 'livestock' ? soil : undefined,
         crop_context: ['wheat', 'orchard', 'vegetable'].includes(farmType) ? cropContext : undefined,
         livestock_context: farmType === 'livestock' ? livestockContext : undefined,
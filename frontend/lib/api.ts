@@ -18,6 +18,15 @@ export interface WeatherData {
   rainfall_forecast_amount_mm?: number;
   wind_speed?: number;
   frost_warning?: boolean;
+  // History aggregates: used as sent; autofill copies them from /weather/auto
+  rainfall_last_30days?: number | null;
+  temperature_max_24h?: number | null;
+  temperature_min_24h?: number | null;
+  temperature_max_7days?: number | null;
+  temperature_min_7days?: number | null;
+  wind_speed_max_24h?: number | null;
+  consecutive_hot_hours?: number | null;
+  consecutive_humid_hours?: number | null;
   time_of_day?: string;
 }
 
@@ -178,8 +187,20 @@ export interface AutoWeatherResult {
   temperature: number;
   humidity: number;
   rainfall_last_24h: number;
+  rainfall_last_7days: number;
+  rainfall_forecast_48h: boolean;
+  rainfall_forecast_amount_mm: number;
   wind_speed: number;
   frost_warning: boolean;
+  // Weather history aggregates (null until the server's history covers them)
+  rainfall_last_30days: number | null;
+  temperature_max_24h: number | null;
+  temperature_min_24h: number | null;
+  temperature_max_7days: number | null;
+  temperature_min_7days: number | null;
+  wind_speed_max_24h: number | null;
+  consecutive_hot_hours: number | null;
+  consecutive_humid_hours: number | null;
   location: {
     city: string;
     country: string;
@@ -189,8 +210,22 @@ export interface AutoWeatherResult {
   };
   region: string;
   fallback: boolean; // True if VPN/foreign IP detected, fallback to Baku used
+  weather_source: 'region' | 'location'; // Regional background snapshot or the location's own weather
+  weather_age_seconds: number;
 }
 
+// AutoWeatherResult fields that only hold for the detected location's weather
+export const WEATHER_HISTORY_FIELDS = [
+  'rainfall_last_30days',
+  'temperature_max_24h',
+  'temperature_min_24h',
+  'temperature_max_7days',
+  'temperature_min_7days',
+  'wind_speed_max_24h',
+  'consecutive_hot_hours',
+  'consecutive_humid_hours',
+] as const;
+
 export async function autoFetchWeather(): Promise<AutoWeatherResult> {
   const response = await fetch(`${API_BASE_URL}/api/v1/weather/auto`);
   if (!response.ok) {